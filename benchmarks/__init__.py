@@ -0,0 +1,8 @@
+"""
+Benchmarks for gedcompy.
+
+:py:mod:`benchmarks.synthetic` generates realistic GEDCOM files of any size,
+and :py:mod:`benchmarks.run` times the main gedcompy operations on them.
+
+Run with ``python -m benchmarks --help``.
+"""
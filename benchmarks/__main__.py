@@ -0,0 +1,6 @@
+"""Allow running the benchmarks with ``python -m benchmarks``."""
+import sys
+
+from .run import main
+
+sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+Time the main gedcompy operations on a synthetic GEDCOM file.
+
+Each operation is run ``--repeat`` times and the best wall clock time is
+reported. Peak memory is measured in a separate run with :py:mod:`tracemalloc`
+(so that tracing doesn't skew the timings), and is not available on Python 2.
+
+    $ python -m benchmarks --individuals 100000
+"""
+from __future__ import print_function
+
+import argparse
+import collections
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+import gedcom
+
+from . import synthetic
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+def _consume(iterator):
+    for _ in iterator:
+        pass
+
+
+class BenchmarkContext(object):
+
+    """Shared state (synthetic text, files on disk, parsed file) for one benchmark run."""
+
+    def __init__(self, directory, **options):
+        """
+        Generate the synthetic file, and write it to `directory`.
+
+        :param str directory: Scratch directory for files created by the benchmarks
+        :param **options: Passed to :py:func:`benchmarks.synthetic.generate_lines`
+        """
+        self.directory = directory
+        self.text = synthetic.generate_string(**options)
+        self.filename = os.path.join(directory, "synthetic.ged")
+        with open(self.filename, "wb") as fp:
+            fp.write(self.text.encode("utf8"))
+        self.gedcomfile = gedcom.parse_string(self.text)
+        self.individuals = list(self.gedcomfile.individuals)
+        self._saves = 0
+
+    def new_filename(self):
+        """Return a filename in the scratch directory that doesn't exist yet."""
+        self._saves += 1
+        return os.path.join(self.directory, "saved-{0}.ged".format(self._saves))
+
+
+def bench_parse_string(context):
+    gedcom.parse_string(context.text)
+
+
+def bench_parse_filename(context):
+    gedcom.parse_filename(context.filename)
+
+
+def bench_gedcom_lines(context):
+    _consume(context.gedcomfile.gedcom_lines())
+
+
+def bench_save(context):
+    filename = context.new_filename()
+    context.gedcomfile.save(filename)
+    os.remove(filename)
+
+
+def bench_parents(context):
+    for person in context.individuals:
+        person.parents
+
+
+def bench_father(context):
+    for person in context.individuals:
+        person.father
+
+
+def bench_mother(context):
+    for person in context.individuals:
+        person.mother
+
+
+def bench_name(context):
+    for person in context.individuals:
+        person.name
+
+
+BENCHMARKS = collections.OrderedDict([
+    ('parse_string', bench_parse_string),
+    ('parse_filename', bench_parse_filename),
+    ('gedcom_lines', bench_gedcom_lines),
+    ('save', bench_save),
+    ('parents', bench_parents),
+    ('father', bench_father),
+    ('mother', bench_mother),
+    ('name', bench_name),
+])
+
+
+def measure(func, context, repeat=3, memory=True):
+    """
+    Time (and optionally trace memory of) one benchmark function.
+
+    :param func: Benchmark function, called with `context`
+    :param BenchmarkContext context: Shared state for this run
+    :param int repeat: How often to run `func`, the best time is returned
+    :param bool memory: Whether to measure peak memory
+    :returns: ``(best_seconds, peak_bytes)``, ``peak_bytes`` is None if not measured
+    :rtype: tuple
+    """
+    times = []
+    for _ in range(repeat):
+        start = timeit.default_timer()
+        func(context)
+        times.append(timeit.default_timer() - start)
+
+    peak = None
+    if memory and tracemalloc is not None:
+        tracemalloc.start()
+        try:
+            func(context)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return min(times), peak
+
+
+def run(names=None, repeat=3, memory=True, **options):
+    """
+    Run these benchmarks on a freshly generated synthetic file.
+
+    :param list names: Benchmark names (keys of :py:data:`BENCHMARKS`), default all
+    :param int repeat: How often to run each benchmark
+    :param bool memory: Whether to measure peak memory
+    :param **options: Passed to :py:func:`benchmarks.synthetic.generate_lines`
+    :returns: list of ``(name, best_seconds, peak_bytes)``
+    :rtype: list
+    """
+    names = names or list(BENCHMARKS)
+    directory = tempfile.mkdtemp(prefix="gedcompy-bench-")
+    try:
+        context = BenchmarkContext(directory, **options)
+        return [(name,) + measure(BENCHMARKS[name], context, repeat=repeat, memory=memory) for name in names]
+    finally:
+        shutil.rmtree(directory)
+
+
+def format_results(results):
+    """Return the results of :py:func:`run` as a text table."""
+    lines = ["{0:<16} {1:>12} {2:>14}".format("operation", "seconds", "peak memory")]
+    for name, seconds, peak in results:
+        peak_text = "n/a" if peak is None else "{0:.1f} MiB".format(peak / (1024.0 * 1024.0))
+        lines.append("{0:<16} {1:>12.4f} {2:>14}".format(name, seconds, peak_text))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """Command line entry point, see ``python -m benchmarks --help``."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark gedcompy on a synthetic GEDCOM file.")
+    parser.add_argument("--individuals", type=int, default=10000, help="number of INDI records (default: %(default)s)")
+    parser.add_argument("--families", type=int, default=None, help="maximum number of FAM records (default: individuals / 3)")
+    parser.add_argument("--events", type=int, default=3, help="events per individual (default: %(default)s)")
+    parser.add_argument("--notes", type=int, default=None, help="number of NOTE records (default: individuals / 10)")
+    parser.add_argument("--sources", type=int, default=None, help="number of SOUR records (default: individuals / 100 + 1)")
+    parser.add_argument("--nesting-depth", type=int, default=4, help="deepest level of source citations (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per operation, best is reported (default: %(default)s)")
+    parser.add_argument("--no-memory", action="store_true", help="don't measure peak memory")
+    parser.add_argument("operations", nargs="*", metavar="operation", help="operations to run (default: all of {0})".format(", ".join(BENCHMARKS)))
+    args = parser.parse_args(argv)
+    for name in args.operations:
+        if name not in BENCHMARKS:
+            parser.error("unknown operation {0!r}".format(name))
+
+    results = run(
+        names=args.operations, repeat=args.repeat, memory=not args.no_memory,
+        individuals=args.individuals, families=args.families, events=args.events, notes=args.notes,
+        sources=args.sources, nesting_depth=args.nesting_depth, seed=args.seed)
+    print(format_results(results))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
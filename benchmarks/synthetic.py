@@ -0,0 +1,230 @@
+"""
+Generate synthetic, but realistic, GEDCOM files of a configurable size.
+
+The generated tree is internally consistent: every FAMC/FAMS/HUSB/WIFE/CHIL
+pointer resolves, and the FAMC/CHIL and FAMS/HUSB/WIFE links agree with each
+other. Output is deterministic for a given ``seed``.
+
+    >>> from benchmarks import synthetic
+    >>> text = synthetic.generate_string(individuals=1000)
+"""
+import collections
+import random
+
+import six
+
+MONTHS = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+
+MALE_NAMES = ['John', 'William', 'Thomas', 'James', 'George', 'Robert', 'Henry', 'Edward', 'Charles', 'Joseph', 'Samuel', 'Richard', 'Patrick', 'Hugh', 'Arthur']
+FEMALE_NAMES = ['Mary', 'Elizabeth', 'Sarah', 'Ann', 'Jane', 'Margaret', 'Catherine', 'Ellen', 'Alice', 'Martha', 'Emma', 'Bridget', 'Susan', 'Hannah', 'Grace']
+SURNAMES = ['Smith', 'Jones', 'Taylor', 'Brown', 'Williams', 'Wilson', 'Johnson', 'Davies', 'Robinson', 'Wright', 'Thompson', 'Evans', 'Walker', 'White', 'Roberts',
+            'Green', 'Hall', 'Wood', 'Jackson', 'Clarke', 'Murphy', 'Kelly', 'Byrne', 'Walsh', 'Ryan', 'Cox', 'Para', 'McCann', 'Doyle', 'Lynch']
+TOWNS = ['Leeds', 'York', 'Whitby', 'Halifax', 'Bradford', 'Dublin', 'Cork', 'Galway', 'Limerick', 'Sligo', 'Bristol', 'Bath', 'Exeter', 'Truro', 'Plymouth']
+COUNTIES = {
+    'Leeds': 'Yorkshire', 'York': 'Yorkshire', 'Whitby': 'Yorkshire', 'Halifax': 'Yorkshire', 'Bradford': 'Yorkshire',
+    'Dublin': 'Dublin', 'Cork': 'Cork', 'Galway': 'Galway', 'Limerick': 'Limerick', 'Sligo': 'Sligo',
+    'Bristol': 'Gloucestershire', 'Bath': 'Somerset', 'Exeter': 'Devon', 'Truro': 'Cornwall', 'Plymouth': 'Devon',
+}
+COUNTRIES = {'Yorkshire': 'England', 'Gloucestershire': 'England', 'Somerset': 'England', 'Devon': 'England', 'Cornwall': 'England'}
+OTHER_EVENTS = ['BAPM', 'RESI', 'OCCU', 'CENS', 'BURI', 'EMIG']
+WORDS = ['register', 'parish', 'entry', 'witness', 'recorded', 'baptised', 'farmer', 'labourer', 'spinster', 'widow', 'church', 'notes', 'family', 'letter']
+
+
+def _place(rng):
+    town = rng.choice(TOWNS)
+    county = COUNTIES[town]
+    return "{0}, {1}, {2}".format(town, county, COUNTRIES.get(county, 'Ireland'))
+
+
+def _date(rng, year):
+    return "{0} {1} {2}".format(rng.randint(1, 28), rng.choice(MONTHS), year)
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def build_tree(individuals=1000, families=None, max_children=6, seed=0):
+    """
+    Build the shape of a random family tree, without any GEDCOM text.
+
+    People are created generation by generation: every person can marry an
+    "outsider" spouse and have children, who in turn go to the back of the
+    queue. Founders are added whenever the queue runs dry.
+
+    :param int individuals: Number of people in the tree
+    :param int families: Maximum number of families (default: ``individuals // 3``)
+    :param int max_children: Maximum number of children per family
+    :param int seed: Seed for the random number generator
+    :returns: ``(sexes, birth_years, families)``, where ``families`` is a list of ``(husband, wife, children)`` person indexes
+    :rtype: tuple
+    """
+    if families is None:
+        families = individuals // 3
+    rng = random.Random(seed)
+    sexes = []
+    birth_years = []
+    family_list = []
+    queue = collections.deque()
+
+    def new_person(sex, year):
+        sexes.append(sex)
+        birth_years.append(year)
+        return len(sexes) - 1
+
+    while len(sexes) < individuals:
+        if len(family_list) >= families:
+            new_person(rng.choice('MF'), rng.randint(1700, 1900))
+            continue
+        if not queue:
+            queue.append(new_person(rng.choice('MF'), rng.randint(1700, 1750)))
+            if len(sexes) >= individuals:
+                break
+        person = queue.popleft()
+        spouse = new_person('F' if sexes[person] == 'M' else 'M', birth_years[person] + rng.randint(-5, 5))
+        husband, wife = (person, spouse) if sexes[person] == 'M' else (spouse, person)
+        children = []
+        for _ in range(min(rng.randint(0, max_children), individuals - len(sexes))):
+            child = new_person(rng.choice('MF'), max(birth_years[husband], birth_years[wife]) + rng.randint(20, 40))
+            children.append(child)
+            queue.append(child)
+        family_list.append((husband, wife, children))
+
+    return sexes, birth_years, family_list
+
+
+def generate_lines(individuals=1000, families=None, events=3, notes=None, sources=None, nesting_depth=4, max_children=6, seed=0):
+    """
+    Iterator over the lines of a synthetic GEDCOM file.
+
+    :param int individuals: Number of INDI records
+    :param int families: Maximum number of FAM records (default: ``individuals // 3``)
+    :param int events: Number of events (BIRT, DEAT, RESI, ...) per individual
+    :param int notes: Number of NOTE records, referenced from individuals (default: ``individuals // 10``)
+    :param int sources: Number of SOUR records, cited from events (default: ``individuals // 100 + 1``)
+    :param int nesting_depth: Deepest level used by source citations (2 or less disables citations)
+    :param int max_children: Maximum number of children per family
+    :param int seed: Seed for the random number generator
+    :rtype: iterator over string
+    """
+    if notes is None:
+        notes = individuals // 10
+    if sources is None:
+        sources = individuals // 100 + 1
+    sexes, birth_years, family_list = build_tree(individuals=individuals, families=families, max_children=max_children, seed=seed)
+    rng = random.Random(seed + 1)
+
+    famc = {}
+    fams = collections.defaultdict(list)
+    for num, (husband, wife, children) in enumerate(family_list, 1):
+        fams[husband].append(num)
+        fams[wife].append(num)
+        for child in children:
+            famc[child] = num
+
+    surnames = [None] * len(sexes)
+    for husband, wife, children in family_list:
+        for person in (husband, wife):
+            if surnames[person] is None:
+                surnames[person] = rng.choice(SURNAMES)
+        for child in children:
+            surnames[child] = surnames[husband]
+
+    def citation(level):
+        if sources == 0 or nesting_depth <= level:
+            return
+        yield "{0} SOUR @S{1}@".format(level, rng.randint(1, sources))
+        yield "{0} PAGE Folio {1}".format(level + 1, rng.randint(1, 400))
+        yield "{0} DATA".format(level + 1)
+        if nesting_depth >= level + 2:
+            yield "{0} TEXT {1}".format(level + 2, _sentence(rng, 6))
+        for nested_level in range(level + 3, nesting_depth + 1):
+            yield "{0} _NEST {1}".format(nested_level, _sentence(rng, 2))
+
+    def event(tag, year):
+        yield "1 " + tag
+        yield "2 DATE " + _date(rng, year)
+        yield "2 PLAC " + _place(rng)
+        for line in citation(2):
+            yield line
+
+    yield "0 HEAD"
+    yield "1 SOUR gedcompy-benchmarks"
+    yield "1 GEDC"
+    yield "2 VERS 5.5"
+    yield "2 FORM LINEAGE-LINKED"
+    yield "1 CHAR UTF-8"
+
+    for num in range(1, sources + 1):
+        yield "0 @S{0}@ SOUR".format(num)
+        yield "1 TITL Parish register of {0}".format(rng.choice(TOWNS))
+        yield "1 AUTH " + rng.choice(SURNAMES)
+
+    for num in range(1, notes + 1):
+        yield "0 @N{0}@ NOTE {1}".format(num, _sentence(rng, 8))
+        for _ in range(rng.randint(0, 3)):
+            yield "1 CONT " + _sentence(rng, 8)
+        if rng.random() < 0.3:
+            yield "1 CONC " + _sentence(rng, 4)
+
+    for person, sex in enumerate(sexes):
+        given = rng.choice(MALE_NAMES if sex == 'M' else FEMALE_NAMES)
+        surname = surnames[person] or rng.choice(SURNAMES)
+        yield "0 @I{0}@ INDI".format(person + 1)
+        yield "1 NAME {0} /{1}/".format(given, surname)
+        yield "2 GIVN " + given
+        yield "2 SURN " + surname
+        yield "1 SEX " + sex
+        year = birth_years[person]
+        if events >= 1:
+            for line in event('BIRT', year):
+                yield line
+        for _ in range(max(events - 2, 0)):
+            for line in event(rng.choice(OTHER_EVENTS), year + rng.randint(1, 60)):
+                yield line
+        if events >= 2:
+            for line in event('DEAT', year + rng.randint(1, 90)):
+                yield line
+        if person in famc:
+            yield "1 FAMC @F{0}@".format(famc[person])
+        for family_num in fams.get(person, ()):
+            yield "1 FAMS @F{0}@".format(family_num)
+        if notes and rng.random() < 0.2:
+            yield "1 NOTE @N{0}@".format(rng.randint(1, notes))
+
+    for num, (husband, wife, children) in enumerate(family_list, 1):
+        yield "0 @F{0}@ FAM".format(num)
+        yield "1 HUSB @I{0}@".format(husband + 1)
+        yield "1 WIFE @I{0}@".format(wife + 1)
+        for line in event('MARR', max(birth_years[husband], birth_years[wife]) + rng.randint(18, 30)):
+            yield line
+        for child in children:
+            yield "1 CHIL @I{0}@".format(child + 1)
+
+    yield "0 TRLR"
+
+
+def generate_string(**options):
+    """
+    Return a synthetic GEDCOM file as a string.
+
+    :param **options: Passed to :py:func:`generate_lines`
+    :rtype: string
+    """
+    return "\n".join(generate_lines(**options)) + "\n"
+
+
+def write(fileout, **options):
+    """
+    Write a synthetic GEDCOM file to this filename or (binary) file-like object.
+
+    :param fileout: Filename or open file-like object
+    :param **options: Passed to :py:func:`generate_lines`
+    """
+    if isinstance(fileout, six.string_types):
+        with open(fileout, "wb") as fp:
+            return write(fp, **options)
+
+    for line in generate_lines(**options):
+        fileout.write(line.encode("utf8"))
+        fileout.write("\n".encode("utf8"))
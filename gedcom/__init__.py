@@ -4,24 +4,185 @@ Library for reading and writing GEDCOM files.
 https://en.wikipedia.org/wiki/GEDCOM
 """
 import re
+import collections
+import hashlib
+import io
+import locale
 import numbers
 import os.path
+import sys
+import tempfile
 import six
 
 from ._version import __version__
+from .pedigree import Pedigree, PedigreeCycleError
 
 line_format = re.compile("^(?P<level>[0-9]+) ((?P<id>@[a-zA-Z0-9]+@) )?(?P<tag>[_A-Z0-9]+)( (?P<value>.*))?$")
+pointer_format = re.compile("^@[a-zA-Z0-9]+@$")
+
+#: Tags whose value (if it looks like ``@...@``) is a pointer to another record, and the tag of the record it should point to.
+POINTER_TAGS = {'FAMC': 'FAM', 'FAMS': 'FAM', 'HUSB': 'INDI', 'WIFE': 'INDI', 'CHIL': 'INDI', 'SOUR': 'SOUR', 'NOTE': 'NOTE', 'OBJE': 'OBJE'}
+
+#: Tags of individual events (GEDCOM 5.5 INDIVIDUAL_EVENT_STRUCTURE, plus RESI).
+INDIVIDUAL_EVENT_TAGS = frozenset(['BIRT', 'CHR', 'DEAT', 'BURI', 'CREM', 'ADOP', 'BAPM', 'BARM', 'BASM', 'BLES', 'CHRA', 'CONF', 'FCOM', 'ORDN',
+                                   'NATU', 'EMIG', 'IMMI', 'CENS', 'PROB', 'WILL', 'GRAD', 'RETI', 'RESI', 'EVEN'])
+
+#: Tags of family events (GEDCOM 5.5 FAMILY_EVENT_STRUCTURE).
+FAMILY_EVENT_TAGS = frozenset(['ANUL', 'CENS', 'DIV', 'DIVF', 'ENGA', 'MARR', 'MARB', 'MARC', 'MARL', 'MARS', 'RESI', 'EVEN'])
+
+#: A problem found by :py:meth:`GedcomFile.validate`.
+#:
+#: ``code`` is one of ``'duplicate-id'``, ``'bad-level'``, ``'dangling-pointer'``, ``'wrong-target'``,
+#: ``'missing-chil'``, ``'missing-famc'``, ``'missing-spouse'``, ``'missing-fams'`` or ``'ancestor-cycle'``.
+#: ``record`` is the level 0 element the problem is in, ``element`` the element itself.
+ValidationIssue = collections.namedtuple('ValidationIssue', ['code', 'record', 'element', 'message'])
+
+
+class Records(object):
+
+    """
+    Read-only, live, view of the records (level 0 elements) with one tag in a :py:class:`GedcomFile`.
+
+    Returned by :py:meth:`GedcomFile.records` (and :py:attr:`GedcomFile.individuals`, etc.).
+    It supports ``len()``, iteration in file order, indexing by position,
+    and lookup by id/pointer (``gedcomfile.individuals['@I1@']``). Changes
+    to the file (through :py:meth:`GedcomFile.add_element`) show up in it.
+    """
+
+    def __init__(self, gedcom_file, tag, records):
+        """
+        Create the view.
+
+        :param GedcomFile gedcom_file: File the records are in
+        :param str tag: Tag of the records
+        :param records: list (or tuple) of the records, that the file keeps up to date
+        """
+        self.gedcom_file = gedcom_file
+        self.tag = tag
+        self._records = records
+
+    def __len__(self):
+        """Return the number of records."""
+        return len(self._records)
+
+    def __iter__(self):
+        """Iterate over the records, in file order."""
+        return iter(self._records)
+
+    def __contains__(self, record):
+        """Return True iff this record (or id/pointer) is one of these records."""
+        if isinstance(record, six.string_types):
+            found = self.gedcom_file.pointers.get(record)
+            return found is not None and found.tag == self.tag and found.level == 0
+        return any(r is record for r in self._records)
+
+    def __getitem__(self, key):
+        """
+        Return the record at this position, or with this id/pointer.
+
+        :param key: int (or slice), or id/pointer (e.g. '@I1@')
+        :raises KeyError: if no record with this tag has this id/pointer
+        """
+        if isinstance(key, six.string_types):
+            if key not in self:
+                raise KeyError(key)
+            return self.gedcom_file.pointers[key]
+        return self._records[key]
+
+    def __repr__(self):
+        """Interal string represation of this object, for debugging purposes."""
+        return "Records({0!r}, {1} records)".format(self.tag, len(self))
+
+
+class RelationshipIndex(object):
+
+    """
+    The family links of all individuals and families in a :py:class:`GedcomFile`, in both directions.
+
+    Returned by :py:meth:`GedcomFile.relationship_index`, and used by
+    :py:attr:`Individual.children`, :py:attr:`Individual.spouses`, etc. A
+    link counts if either side has it (FAMC or CHIL, FAMS or HUSB/WIFE).
+    Each attribute maps an id/pointer to a list of ids/pointers, in the
+    order the links are in the file (with families read first, so
+    children are in CHIL order):
+
+    * :py:attr:`child_families`: individual to the families they are a child in
+    * :py:attr:`spouse_families`: individual to the families they are a partner in
+    * :py:attr:`children`: family to its children
+    * :py:attr:`partners`: family to its partners
+    """
+
+    def __init__(self, gedcom_file):
+        """
+        Build the index of this file.
+
+        :param GedcomFile gedcom_file: File to read the links from
+        """
+        self.child_families = {}
+        self.spouse_families = {}
+        self.children = {}
+        self.partners = {}
+        for tag in ('FAM', 'INDI'):
+            for record in gedcom_file.records(tag):
+                self.add_record(record)
+
+    def add_record(self, record):
+        """Add the links of this record (INDI or FAM), e.g. when it is added to the file."""
+        if record.tag in ('INDI', 'FAM'):
+            for element in _readable_children(record):
+                self.add(record, element)
+
+    def add(self, record, element):
+        """
+        Add the link made by this child element of a record, if it is one (e.g. FAMC of an INDI, CHIL of a FAM).
+
+        :param Element record: INDI or FAM record
+        :param Element element: Child element of `record`
+        """
+        if not element.value or not record.id:
+            return
+        if record.tag == 'INDI':
+            if element.tag == 'FAMC':
+                self._link(self.child_families, self.children, record.id, element.value)
+            elif element.tag == 'FAMS':
+                self._link(self.spouse_families, self.partners, record.id, element.value)
+        elif record.tag == 'FAM':
+            if element.tag == 'CHIL':
+                self._link(self.child_families, self.children, element.value, record.id)
+            elif element.tag in ('HUSB', 'WIFE'):
+                self._link(self.spouse_families, self.partners, element.value, record.id)
+
+    @staticmethod
+    def _link(individual_links, family_links, individual_id, family_id):
+        families = individual_links.setdefault(individual_id, [])
+        if family_id not in families:
+            families.append(family_id)
+        individuals = family_links.setdefault(family_id, [])
+        if individual_id not in individuals:
+            individuals.append(individual_id)
 
 
 class GedcomFile(object):
 
     """ Represents a GEDCOM file.  """
 
-    def __init__(self):
-        """Instanciate a GEDCOM object."""
+    #: Tags whose values are interned by default, see :py:meth:`intern`.
+    INTERNED_VALUE_TAGS = frozenset(['SEX', 'PLAC', 'TYPE', 'GIVN', 'SURN', 'CHAR', 'VERS', 'FORM', 'LANG', 'PEDI', 'STAT', 'QUAY', 'RELA', 'CAUS', 'AGE'])
+
+    def __init__(self, interned_value_tags=None):
+        """
+        Instanciate a GEDCOM object.
+
+        :param interned_value_tags: *optional* tags whose values are interned (default :py:attr:`INTERNED_VALUE_TAGS`)
+        """
         self.root_elements = []
         self.pointers = {}
         self.next_free_id = 1
+        self.interned_value_tags = self.INTERNED_VALUE_TAGS if interned_value_tags is None else frozenset(interned_value_tags)
+        self._intern_tables = {'tags': {}, 'xrefs': {}, 'values': {}}
+        self._source = None
+        self._by_tag = {}
+        self._relationships = None
 
     def __repr__(self):
         """String represenation of GEDCOM. For internal debugging purposes only."""
@@ -38,6 +199,168 @@ class GedcomFile(object):
         """
         return self.pointers[key]
 
+    def intern(self, kind, string):
+        """
+        Return the one copy of this string that is shared by all elements in this file.
+
+        The parser stores every tag, every id/pointer (``xrefs``) and the
+        values of tags in :py:attr:`interned_value_tags` (e.g. SEX, PLAC) only
+        once per file, which saves memory, and makes tag comparisons mostly
+        identity checks. Unlike :py:func:`sys.intern`, the tables are freed
+        with the file. See :py:meth:`interning_report` for the savings.
+
+        :param str kind: ``'tags'``, ``'xrefs'`` or ``'values'``
+        :param str string: String to intern (None is returned as is)
+        :rtype: str
+        """
+        if string is None:
+            return None
+        return self._intern_tables[kind].setdefault(string, string)
+
+    def interning_report(self):
+        """
+        Return how much memory string interning saves in this file.
+
+        For each kind of interned string (``tags``, ``xrefs``, ``values``)
+        it counts the ``references`` from elements, the ``distinct`` values
+        and ``objects`` actually in memory, and estimates the ``bytes`` those
+        use, the ``bytes_without_interning`` (one object per reference) and
+        the ``bytes_saved`` (net of the intern table itself).
+
+        :rtype: dict of dicts
+        """
+        kinds = ('tags', 'xrefs', 'values')
+        references = dict((kind, []) for kind in kinds)
+        stack = list(self.root_elements)
+        while stack:
+            element = stack.pop()
+            stack.extend(element.child_elements)
+            references['tags'].append(element.tag)
+            if element.id:
+                references['xrefs'].append(element.id)
+            if element.value:
+                if pointer_format.match(element.value):
+                    references['xrefs'].append(element.value)
+                elif element.tag in self.interned_value_tags:
+                    references['values'].append(element.value)
+
+        report = {}
+        for kind in kinds:
+            objects = dict((id(string), string) for string in references[kind])
+            used = sum(sys.getsizeof(string) for string in objects.values())
+            without = sum(sys.getsizeof(string) for string in references[kind])
+            table = sys.getsizeof(self._intern_tables.get(kind, {}))
+            report[kind] = {
+                'references': len(references[kind]), 'distinct': len(set(references[kind])), 'objects': len(objects),
+                'bytes': used, 'bytes_without_interning': without, 'bytes_saved': without - used - table,
+            }
+        return report
+
+    def memory_report(self):
+        """
+        Return roughly how much memory the elements in this file use.
+
+        Each element is counted as the object itself, its attribute dict,
+        its list of children, and its tag, value and id strings (strings
+        shared by several elements, see :py:meth:`intern`, are only counted
+        once). Python's own overhead (e.g. the allocator) isn't included, so
+        the real usage is somewhat higher.
+
+        :returns: dict with the ``total`` bytes, bytes per record type
+            (``records``, the whole subtree of each level 0 element, by its
+            tag), and bytes and number of elements per tag (``tags`` and
+            ``elements``)
+        :rtype: dict
+        """
+        seen = set()
+        records = collections.Counter()
+        tags = collections.Counter()
+        elements = collections.Counter()
+        for record in self.root_elements:
+            stack = [record]
+            while stack:
+                element = stack.pop()
+                if element.is_parsed:
+                    stack.extend(element.child_elements)
+                size = _element_size(element, seen)
+                records[record.tag] += size
+                tags[element.tag] += size
+                elements[element.tag] += 1
+        return {'total': sum(records.values()), 'records': dict(records), 'tags': dict(tags), 'elements': dict(elements)}
+
+    def refresh(self):
+        """
+        Update this file with the changes made to it on disk since it was parsed.
+
+        Only works for files parsed with ``parse_filename(..., track_changes=True)``
+        (or :py:func:`parse`). The file is read again, but only records
+        (level 0 elements and their children) whose bytes changed are parsed.
+        Unchanged records are kept as they are (including any changes made
+        to them in memory), records no longer in the file are removed, and
+        :py:attr:`root_elements` and :py:attr:`pointers` are updated in place.
+        Records added in memory, that weren't in the file, are kept after the
+        ones from the file (but before the trailer), and a header or trailer
+        added in memory is only kept if the file doesn't have one.
+
+        :returns: ``(changed, removed)``, lists of the new or changed records, and the records that were removed or replaced
+        :rtype: tuple
+        :raises ValueError: if this file wasn't parsed with `track_changes`
+        """
+        if self._source is None:
+            raise ValueError("Only files parsed with parse_filename(..., track_changes=True) can be refreshed")
+        source = self._source
+        stat = os.stat(source['filename'])
+        if (stat.st_size, stat.st_mtime) == source['stat']:
+            return [], []
+
+        old_records = {}
+        for entry in source['records']:
+            old_records.setdefault(entry.digest, collections.deque()).append(entry.record)
+        from_file = set(id(entry.record) for entry in source['records'])
+
+        records, changed = [], []
+        with open_compressed(source['filename'], 'rb') as fp:
+            for offset, data in _scan_records(fp):
+                digest = hashlib.sha1(data).digest()
+                if old_records.get(digest):
+                    record = old_records[digest].popleft()
+                else:
+                    parse_records = _parse_lazy_records if source['lazy'] else _parse_elements
+                    record = [e for e in parse_records(_decode_lines(data), self) if e.level == 0][0]
+                    changed.append(record)
+                records.append(SourceRecord(offset, len(data), digest, record))
+        removed = [record for remaining in old_records.values() for record in remaining]
+
+        for record in removed:
+            if record.id and self.pointers.get(record.id) is record:
+                del self.pointers[record.id]
+        for record in changed:
+            if record.id:
+                self.pointers[record.id] = record
+        self.root_elements[:] = self._merge_refreshed([entry.record for entry in records], [e for e in self.root_elements if id(e) not in from_file])
+        self._reindex_records()
+        self._relationships = None
+        source['records'] = records
+        source['stat'] = (stat.st_size, stat.st_mtime)
+        return changed, removed
+
+    @staticmethod
+    def _merge_refreshed(file_records, added):
+        """
+        Return the records of a refreshed file: those from the file, with those added in memory before its trailer.
+
+        A header or trailer added in memory (e.g. by :py:meth:`ensure_header_trailer`, when saving) is
+        put back at the start or end, or dropped if the file now has its own.
+        """
+        headers = [record for record in added if record.tag == 'HEAD']
+        trailers = [record for record in added if record.tag == 'TRLR']
+        added = [record for record in added if record.tag not in ('HEAD', 'TRLR')]
+        if file_records and file_records[0].tag == 'HEAD':
+            headers = []
+        if file_records and file_records[-1].tag == 'TRLR':
+            trailers = [file_records.pop()]
+        return headers + file_records + added + trailers
+
     def add_element(self, element):
         """
         Add an Element to this file.
@@ -81,26 +404,284 @@ class GedcomFile(object):
             self.pointers[element.id] = element
         if element.level == 0:
             self.root_elements.append(element)
+            self._by_tag.setdefault(element.tag, []).append(element)
+            if self._relationships is not None:
+                self._relationships.add_record(element)
+
+    def records(self, tag):
+        """
+        Return all level 0 elements with this tag, e.g. all individuals.
+
+        The records of each tag are kept in a list as they are added, so this
+        doesn't look at the other records.
+
+        :param str tag: Tag (e.g. 'INDI', 'SOUR')
+        :rtype: :py:class:`Records`
+        """
+        return Records(self, tag, self._by_tag.setdefault(tag, []))
+
+    def relationship_index(self):
+        """
+        Return the index of the family links in this file, building it the first time.
+
+        It is kept up to date when records are added with
+        :py:meth:`add_element`, and links with :py:meth:`Element.add_child_element`.
+        Other changes (e.g. setting the value of a FAMC element, or changing
+        :py:attr:`Element.child_elements` directly) need :py:meth:`reset_relationship_index`.
+
+        :rtype: :py:class:`RelationshipIndex`
+        """
+        if self._relationships is None:
+            self._relationships = RelationshipIndex(self)
+        return self._relationships
+
+    def reset_relationship_index(self):
+        """Forget the index of family links (see :py:meth:`relationship_index`), so it is built again when next needed."""
+        self._relationships = None
+
+    def _reindex_records(self):
+        """Rebuild the lists of records by tag from :py:attr:`root_elements` (keeping the same list objects)."""
+        for records in self._by_tag.values():
+            del records[:]
+        for record in self.root_elements:
+            self._by_tag.setdefault(record.tag, []).append(record)
 
     @property
     def individuals(self):
         """
-        Iterator of all Individual's in this file.
+        All Individual's (INDI records) in this file.
 
-        :returns: iterator of Individual's
-        :rtype: iterator
+        This is a :py:class:`Records` view, not an iterator (as it was before
+        version 0.2.8): use ``iter()`` on it to get one.
+
+        :rtype: :py:class:`Records`
         """
-        return (i for i in self.root_elements if isinstance(i, Individual))
+        return self.records('INDI')
 
     @property
     def families(self):
         """
-        Iterator of all Family's in this file.
+        All Family's (FAM records) in this file.
 
-        :returns: iterator of Families's
-        :rtype: iterator
+        This is a :py:class:`Records` view, not an iterator (as it was before
+        version 0.2.8): use ``iter()`` on it to get one.
+
+        :rtype: :py:class:`Records`
+        """
+        return self.records('FAM')
+
+    @property
+    def sources(self):
+        """
+        All source (SOUR) records in this file.
+
+        :rtype: :py:class:`Records`
+        """
+        return self.records('SOUR')
+
+    @property
+    def repositories(self):
+        """
+        All repository (REPO) records in this file.
+
+        :rtype: :py:class:`Records`
+        """
+        return self.records('REPO')
+
+    @property
+    def multimedia(self):
+        """
+        All multimedia object (OBJE) records in this file.
+
+        :rtype: :py:class:`Records`
+        """
+        return self.records('OBJE')
+
+    @property
+    def notes(self):
+        """
+        All note (NOTE) records in this file.
+
+        :rtype: :py:class:`Records`
+        """
+        return self.records('NOTE')
+
+    @property
+    def submitters(self):
+        """
+        All submitter (SUBM) records in this file.
+
+        :rtype: :py:class:`Records`
+        """
+        return self.records('SUBM')
+
+    def validate(self):
+        """
+        Check the referential integrity of this file, and return a list of problems.
+
+        In one pass over all elements it checks that:
+
+        * every pointer value (FAMC, FAMS, HUSB, WIFE, CHIL, SOUR, NOTE, OBJE) exists in this file,
+          and points to the right type of record,
+        * FAMC and CHIL links, and FAMS and HUSB/WIFE links, agree in both directions,
+        * levels are consistent (0 for records, parent level + 1 for everything else),
+        * no two records share an id, and
+        * nobody is their own ancestor (see :py:meth:`gedcom.pedigree.Pedigree.cycles`).
+
+        Nothing is raised for problems in the file; see :py:meth:`ensure_levels` to fix levels.
+
+        :returns: problems in document order
+        :rtype: list of :py:class:`ValidationIssue`
+        """
+        issues = []
+        # (individual id, family id) -> element making the link, for both directions
+        child_links, chil_links = collections.OrderedDict(), collections.OrderedDict()
+        spouse_links, partner_links = collections.OrderedDict(), collections.OrderedDict()
+
+        for record in self.root_elements:
+            if record.id is not None and self.pointers.get(record.id) is not record:
+                issues.append(ValidationIssue('duplicate-id', record, record, "Id {0} is used by more than one record".format(record.id)))
+            if record.level != 0:
+                issues.append(ValidationIssue('bad-level', record, record, "Record has level {0}, not 0".format(record.level)))
+
+            stack = [record]
+            while stack:
+                element = stack.pop()
+                for child in reversed(element.child_elements):
+                    if element.level is None or child.level != element.level + 1:
+                        issues.append(ValidationIssue('bad-level', record, child, "{0} has level {1} under level {2}".format(child.tag, child.level, element.level)))
+                    stack.append(child)
+
+                if element is record or element.tag not in POINTER_TAGS or element.value is None or not pointer_format.match(element.value):
+                    continue
+                target = self.pointers.get(element.value)
+                if target is None:
+                    issues.append(ValidationIssue('dangling-pointer', record, element, "{0} points to {1}, which isn't in this file".format(element.tag, element.value)))
+                    continue
+                if target.tag != POINTER_TAGS[element.tag]:
+                    issues.append(ValidationIssue('wrong-target', record, element, "{0} points to {1}, which is a {2}, not a {3}".format(element.tag, element.value, target.tag, POINTER_TAGS[element.tag])))
+
+            for child in record.child_elements:
+                target = self.pointers.get(child.value)
+                if target is None or target.tag != POINTER_TAGS.get(child.tag):
+                    continue
+                if record.tag == 'INDI' and child.tag == 'FAMC':
+                    child_links.setdefault((record.id, child.value), child)
+                elif record.tag == 'INDI' and child.tag == 'FAMS':
+                    spouse_links.setdefault((record.id, child.value), child)
+                elif record.tag == 'FAM' and child.tag == 'CHIL':
+                    chil_links.setdefault((child.value, record.id), child)
+                elif record.tag == 'FAM' and child.tag in ('HUSB', 'WIFE'):
+                    partner_links.setdefault((child.value, record.id), child)
+
+        for links, other_links, code, message in [
+                (child_links, chil_links, 'missing-chil', "{0} has FAMC {1}, but {1} has no CHIL {0}"),
+                (chil_links, child_links, 'missing-famc', "{1} has CHIL {0}, but {0} has no FAMC {1}"),
+                (spouse_links, partner_links, 'missing-spouse', "{0} has FAMS {1}, but {1} has no HUSB/WIFE {0}"),
+                (partner_links, spouse_links, 'missing-fams', "{1} has HUSB/WIFE {0}, but {0} has no FAMS {1}")]:
+            for (individual_id, family_id), element in links.items():
+                if (individual_id, family_id) not in other_links:
+                    record = self.pointers[family_id if code in ('missing-famc', 'missing-fams') else individual_id]
+                    issues.append(ValidationIssue(code, record, element, message.format(individual_id, family_id)))
+
+        for cycle in Pedigree(self).cycles():
+            for individual_id in cycle:
+                record = self.pointers[individual_id]
+                issues.append(ValidationIssue('ancestor-cycle', record, record, "{0} is their own ancestor (with {1})".format(individual_id, ", ".join(cycle))))
+
+        return issues
+
+    def to_tables(self):
+        """
+        Flatten the individuals, families and events in this file into columns, in one pass.
+
+        See :py:mod:`gedcom.tables` for the columns, and for writing them as CSV.
+
+        :rtype: :py:class:`gedcom.tables.Tables`
+        """
+        return build_tables(self.root_elements)
+
+    def places(self):
+        """
+        Return the hierarchy of the places of all events in this file.
+
+        See :py:mod:`gedcom.places`. It is built when called, so call this
+        again after changing the file.
+
+        :rtype: :py:class:`gedcom.places.PlaceHierarchy`
+        """
+        return place_hierarchy(self.root_elements)
+
+    def timeline(self, max_age=100):
+        """
+        Return the dated events of all individuals and families in this file, for queries by period.
+
+        See :py:mod:`gedcom.timeline`. It is built when called, so call this
+        again after changing the file.
+
+        :param int max_age: Age people are presumed to live to at most, see :py:meth:`gedcom.timeline.Timeline.alive`
+        :rtype: :py:class:`gedcom.timeline.Timeline`
+        """
+        return Timeline(self.root_elements, max_age=max_age)
+
+    def builder(self, batch_size=10000, pause_gc=False):
         """
-        return (i for i in self.root_elements if isinstance(i, Family))
+        Return a :py:class:`gedcom.builder.Builder`, to add many records to this file at once.
+
+        :param int batch_size: Number of records to make before adding them to the file
+        :param bool pause_gc: Turn off the garbage collector while making records (faster, but for the whole process, see :py:class:`gedcom.builder.Builder`)
+        :rtype: :py:class:`gedcom.builder.Builder`
+        """
+        return Builder(self, batch_size=batch_size, pause_gc=pause_gc)
+
+    def freeze(self):
+        """
+        Return a read-only snapshot of this file, that can be shared between threads.
+
+        See :py:class:`FrozenGedcomFile`. Later changes to this file don't
+        affect the snapshot.
+
+        :rtype: :py:class:`FrozenGedcomFile`
+        """
+        return FrozenGedcomFile(self)
+
+    def clone(self):
+        """
+        Return an independent, editable copy of this file, that only makes the elements of records when they are used.
+
+        The records (level 0 elements) of the copy start out as just their
+        level 0 line, and the text of their child elements, as they are in
+        this file when cloning. Like records read with ``parse(..., lazy=True)``,
+        the child elements of each are only parsed the first time they are
+        needed (to read or change them). Writing out this text is much
+        quicker than copying every element, and it takes less memory.
+        Records that are already kept as text (from ``lazy=True``), and
+        those of a :py:meth:`freeze` snapshot, can't change, so they are
+        shared rather than written out again.
+
+        Changes to the clone never affect this file, and changes to this
+        file after cloning never affect the clone.
+
+        :rtype: :py:class:`GedcomFile`
+        """
+        clone = GedcomFile(interned_value_tags=self.interned_value_tags)
+        clone.next_free_id = self.next_free_id
+        clone._intern_tables = dict((kind, dict(self._intern_tables.get(kind, ()))) for kind in ('tags', 'xrefs', 'values'))
+        for record in self.root_elements:
+            new_record = (record.mutable_class or record.__class__)(level=record.level, tag=record.tag, value=record.value, id=record.id, gedcom_file=clone)
+            del new_record.child_elements
+            if '_unparsed' in record.__dict__:
+                # Text, or a frozen record, that isn't parsed or copied yet
+                new_record._unparsed = record.__dict__['_unparsed']
+            elif isinstance(record, FrozenElementMixin):
+                new_record._unparsed = record
+            else:
+                new_record._unparsed = "\n".join(_element_lines(record.child_elements, start_level=1))
+            clone.root_elements.append(new_record)
+            if record.id and self.pointers.get(record.id) is record:
+                clone.pointers[record.id] = new_record
+        clone._reindex_records()
+        return clone
 
     def gedcom_lines(self):
         """
@@ -124,24 +705,121 @@ class GedcomFile(object):
         """
         return "\n".join(self.gedcom_lines())
 
-    def save(self, fileout):
+    def save(self, fileout, overwrite=False):
         """
         Save the contents of this GEDCOM file to specified filename or file-like object.
 
         :param fileout: Filename or open file-like object to save this to.
-        :raises Exception: if the filename exists
+        :param bool overwrite: Whether to replace the file if it already exists (see :py:func:`write_lines`)
+        :raises Exception: if the filename exists, and `overwrite` is False
+
+        Saving over the file this was parsed from with ``track_changes=True`` makes
+        :py:meth:`refresh` compare with what was saved, rather than what was parsed.
         """
-        if isinstance(fileout, six.string_types):
-            if os.path.exists(fileout):
-                # TODO better exception
-                raise Exception("File exists")
-            else:
-                with open(fileout, "wb") as fp:
-                    return self.save(fp)
+        write_lines(self.gedcom_lines(), fileout, overwrite=overwrite)
+        source = self._source
+        if source is not None and isinstance(fileout, six.string_types) and os.path.realpath(fileout) == os.path.realpath(source['filename']):
+            # The file now has the records as they are in memory, so refresh() should compare with those
+            stat = os.stat(source['filename'])
+            with open_compressed(source['filename'], 'rb') as fp:
+                source['records'] = [SourceRecord(offset, len(data), hashlib.sha1(data).digest(), record)
+                                     for (offset, data), record in zip(_scan_records(fp), self.root_elements)]
+            source['stat'] = (stat.st_size, stat.st_mtime)
+
+    def extract(self, individuals, ancestors=0, descendants=0, spouses=True, fileout=None):
+        """
+        Return a new file with only some people from this file, and the records they refer to.
+
+        Starting from `individuals`, it follows FAMC links up for `ancestors`
+        generations and FAMS/CHIL links down for `descendants` generations.
+        Families that a selected person is a partner in are kept, as are all
+        sources, notes, media etc. that kept records point to (transitively).
+        Links to people and families that aren't kept are removed, so the
+        result has no dangling pointers.
+
+        :param individuals: Seed :py:class:`Individual`'s, or their ids/pointers
+        :param int ancestors: Number of generations of ancestors to include, None for all
+        :param int descendants: Number of generations of descendants to include, None for all
+        :param bool spouses: Whether to include the partners of everyone selected
+        :param fileout: If given, filename or open file-like object to write the result to, instead of returning it
+        :returns: New file, or None if `fileout` was given
+        :rtype: :py:class:`GedcomFile`
+        :raises KeyError: If a seed id isn't in this file
+        """
+        keep = self._relatives([self[i] if isinstance(i, six.string_types) else i for i in individuals], ancestors, descendants, spouses)
+
+        for person_id in list(keep):
+            for fams in self.pointers[person_id].get_list('FAMS'):
+                if fams.value in self.pointers:
+                    keep.add(fams.value)
+
+        # Everything else that a kept record (or the header) points to, transitively
+        records = [r for r in self.root_elements if r.id in keep or (r.id is None and r.tag == 'HEAD')]
+        queue = list(records)
+        while queue:
+            stack = [queue.pop()]
+            while stack:
+                element = stack.pop()
+                stack.extend(element.child_elements)
+                target = self.pointers.get(element.value) if element.value else None
+                if target is not None and target.id not in keep and target.tag not in ('INDI', 'FAM'):
+                    keep.add(target.id)
+                    queue.append(target)
+        records = [r for r in self.root_elements if r.id in keep or (r.id is None and r.tag == 'HEAD')]
+
+        def keep_element(element):
+            target = self.pointers.get(element.value) if element.value else None
+            return target is None or target.id in keep
+
+        if fileout is not None:
+            if len(records) == 0 or records[0].tag != 'HEAD':
+                records.insert(0, GedcomFile().header_element())
+            write_lines(_element_lines(records + [Element(level=0, tag='TRLR')], keep_element), fileout)
+            return None
 
-        for line in self.gedcom_lines():
-            fileout.write(line.encode("utf8"))
-            fileout.write("\n".encode("utf8"))
+        new_file = GedcomFile()
+        for record in records:
+            copy = record.copy(keep=keep_element, gedcom_file=new_file)
+            copy.level = 0
+            new_file.add_element(copy)
+        return new_file
+
+    def _relatives(self, individuals, ancestors, descendants, spouses):
+        """Return the set of ids of `individuals` and their ancestors/descendants/partners, see :py:meth:`extract`."""
+        def partners(family):
+            return [p.value for p in family.child_elements if p.tag in ('HUSB', 'WIFE')]
+
+        def children(family):
+            return [c.value for c in family.child_elements if c.tag == 'CHIL']
+
+        selected = set(i.id for i in individuals)
+        for generations, family_tag, relatives in [(ancestors, 'FAMC', partners), (descendants, 'FAMS', children)]:
+            seen = set(selected)
+            frontier = [i.id for i in individuals]
+            generation = 0
+            while frontier and (generations is None or generation < generations):
+                next_frontier = []
+                for person_id in frontier:
+                    for link in self.pointers[person_id].get_list(family_tag):
+                        family = self.pointers.get(link.value)
+                        if family is None:
+                            continue
+                        for relative_id in relatives(family):
+                            if relative_id not in seen and relative_id in self.pointers:
+                                seen.add(relative_id)
+                                next_frontier.append(relative_id)
+                selected.update(next_frontier)
+                frontier = next_frontier
+                generation += 1
+
+        if spouses:
+            for person_id in list(selected):
+                for link in self.pointers[person_id].get_list('FAMS'):
+                    family = self.pointers.get(link.value)
+                    if family is not None:
+                        selected.update(p for p in partners(family) if p in self.pointers)
+
+        return selected
 
     def ensure_header_trailer(self):
         """
@@ -150,24 +828,37 @@ class GedcomFile(object):
         Call this method to ensure the file has these required elements.
         """
         if len(self.root_elements) == 0 or self.root_elements[0].tag != 'HEAD':
-            # add header
-            head_element = self.element('HEAD', level=0, value='')
-            source = self.element("SOUR")
-            source.add_child_element(self.element("NAME", value="gedcompy"))
-            source.add_child_element(self.element("VERS", value=__version__))
-            head_element.add_child_element(source)
-            head_element.add_child_element(self.element("CHAR", value="UNICODE"))
-
-            gedcom_format = self.element("GEDC")
-            gedcom_format.add_child_element(self.element("VERS", value="5.5"))
-            gedcom_format.add_child_element(self.element("FORM", value="LINEAGE-LINKED"))
-            head_element.add_child_element(gedcom_format)
-
-            head_element.set_levels_downward()
-            self.root_elements.insert(0, head_element)
+            header = self.header_element()
+            self.root_elements.insert(0, header)
+            self._by_tag.setdefault('HEAD', []).insert(0, header)
         if len(self.root_elements) == 0 or self.root_elements[-1].tag != 'TRLR':
             # add trailer
-            self.root_elements.append(self.element('TRLR', level=0, value=''))
+            trailer = self.element('TRLR', level=0, value='')
+            self.root_elements.append(trailer)
+            self._by_tag.setdefault('TRLR', []).append(trailer)
+
+    def header_element(self):
+        """
+        Return a new, default, header (HEAD) element for this file.
+
+        It is not added to the file, see :py:meth:`ensure_header_trailer`.
+
+        :rtype: Element
+        """
+        head_element = self.element('HEAD', level=0, value='')
+        source = self.element("SOUR")
+        source.add_child_element(self.element("NAME", value="gedcompy"))
+        source.add_child_element(self.element("VERS", value=__version__))
+        head_element.add_child_element(source)
+        head_element.add_child_element(self.element("CHAR", value="UNICODE"))
+
+        gedcom_format = self.element("GEDC")
+        gedcom_format.add_child_element(self.element("VERS", value="5.5"))
+        gedcom_format.add_child_element(self.element("FORM", value="LINEAGE-LINKED"))
+        head_element.add_child_element(gedcom_format)
+
+        head_element.set_levels_downward()
+        return head_element
 
     def ensure_levels(self):
         """
@@ -189,7 +880,7 @@ class GedcomFile(object):
         :rtype: Element or subclass based on `tag`
         """
         klass = class_for_tag(tag)
-        return klass(gedcom_file=self, tag=tag, **kwargs)
+        return klass(gedcom_file=self, tag=self.intern('tags', tag), **kwargs)
 
     def individual(self, **kwargs):
         """Create and return an Individual in this file."""
@@ -204,6 +895,39 @@ class GedcomFile(object):
         return new_element
 
 
+class _LazyChildElements(object):
+
+    """
+    Makes the child elements of records that aren't parsed yet when first used.
+
+    Records read with ``parse(..., lazy=True)``, and those of a
+    :py:meth:`GedcomFile.clone`, have no ``child_elements`` of their own
+    but an ``_unparsed`` attribute: the text of their child elements, or
+    the record they are a copy of. Only then is this looked at (it is not
+    a data descriptor, so elements that have their own list never get here),
+    and it parses or copies the child elements, and sets them on the record.
+    """
+
+    def __get__(self, element, owner):
+        """Return the child elements of `element`, making them first if needed."""
+        if element is None:
+            return self
+        if '_unparsed' not in element.__dict__:
+            raise AttributeError("'{0}' object has no attribute 'child_elements'".format(owner.__name__))
+        unparsed = element.__dict__.pop('_unparsed')
+        element.child_elements = []
+        if isinstance(unparsed, Element):
+            for child in unparsed.child_elements:
+                new_child = child.copy(gedcom_file=element.gedcom_file)
+                new_child.parent_element = element
+                new_child.parent_id = element.id
+                element.child_elements.append(new_child)
+        else:
+            for _ in _parse_elements(unparsed.split("\n"), element.gedcom_file, parent=element):
+                pass
+        return element.child_elements
+
+
 class Element(object):
 
     """
@@ -212,6 +936,15 @@ class Element(object):
     Can be used as is, or subclassed for specific functionality.
     """
 
+    #: Tag of every element of this class, set by :py:func:`register_tag` (None for generic classes)
+    default_tag = None
+
+    #: For frozen classes (see :py:class:`FrozenElementMixin`), the class they are the frozen version of
+    mutable_class = None
+
+    #: Child elements of this element, in order (see :py:class:`_LazyChildElements` for records that aren't parsed yet)
+    child_elements = _LazyChildElements()
+
     def __init__(self, level=None, tag=None, value=None, id=None, parent_id=None, parent=None, gedcom_file=None):
         """
         Create an element.
@@ -225,7 +958,7 @@ class Element(object):
         """
         self.level = level
         if tag is not None:
-            if hasattr(self, 'default_tag'):
+            if self.default_tag is not None:
                 if tag != self.default_tag:
                     raise ValueError("Tag {} differs from default {}".format(tag, self.default_tag))
             self.tag = tag
@@ -241,6 +974,11 @@ class Element(object):
         if parent is not None:
             self.parent_element.add_child_element(self)
 
+    @property
+    def is_parsed(self):
+        """False if this is a record from ``parse(..., lazy=True)`` or :py:meth:`GedcomFile.clone` whose child elements haven't been needed (and parsed or copied) yet."""
+        return '_unparsed' not in self.__dict__
+
     def __repr__(self):
         """Interal string represation of this object, for debugging purposes."""
         return "{classname}({level}, {tag!r}{id}{value}{children})".format(
@@ -286,6 +1024,9 @@ class Element(object):
         child_element.parent_id = self.id
         child_element.gedcom_file = self.gedcom_file
         self.child_elements.append(child_element)
+        relationships = getattr(self.gedcom_file, '_relationships', None)
+        if relationships is not None and self.level == 0:
+            relationships.add(self, child_element)
 
     def get_by_id(self, other_id):
         """
@@ -308,10 +1049,36 @@ class Element(object):
         """
         return [c for c in self.child_elements if c.tag == tag]
 
+    def copy(self, keep=None, gedcom_file=None):
+        """
+        Return a copy of this element and all its child elements.
+
+        The copy has no parent element. Values are shared, not copied.
+
+        :param keep: *optional* function that is called with each descendant; if it returns False, that element (and its children) isn't copied
+        :param GedcomFile gedcom_file: File the copy will be in
+        :rtype: Element (or subclass)
+        """
+        new_element = (self.mutable_class or self.__class__)(level=self.level, tag=self.tag, value=self.value, id=self.id, gedcom_file=gedcom_file)
+        stack = [(self, new_element)]
+        while stack:
+            original, copy = stack.pop()
+            for child in original.child_elements:
+                if keep is not None and not keep(child):
+                    continue
+                new_child = (child.mutable_class or child.__class__)(level=child.level, tag=child.tag, value=child.value, id=child.id, parent_id=copy.id, gedcom_file=gedcom_file)
+                new_child.parent_element = copy
+                copy.child_elements.append(new_child)
+                stack.append((child, new_child))
+        return new_element
+
     def set_levels_downward(self):
         """Set all :py:attr:`level` attributes for all child elements recursively, based on the :py:attr:`level` for this object."""
         if not isinstance(self.level, numbers.Integral):
             raise TypeError(self.level)
+        if not self.is_parsed:
+            # The child elements get their levels when they are parsed or copied
+            return
         for c in self.child_elements:
             c.level = self.level + 1
             c.gedcom_file = self.gedcom_file
@@ -326,7 +1093,13 @@ class Element(object):
         line_format = re.compile("^(?P<level>[0-9]+) ((?P<id>@[a-zA-Z0-9]+@) )?(?P<tag>[A-Z]+)( (?P<value>.*))?$")
         line = u"{level}{id} {tag}{value}".format(level=self.level, id=(" " + self.id if self.id else ""), tag=self.tag, value=(" " + self.value if self.value else ""))
         yield line
-        for child in self.child_elements:
+        unparsed = self.__dict__.get('_unparsed')
+        if isinstance(unparsed, six.string_types) and self.level == 0:
+            # Records that aren't parsed yet are written from their text
+            for line in (unparsed.split("\n") if unparsed else ()):
+                yield line
+            return
+        for child in _readable_children(self):
             for line in child.gedcom_lines():
                 yield line
 
@@ -343,6 +1116,89 @@ class Element(object):
             return self['NOTE'].full_text
 
 
+class _LinkLookup(object):
+
+    """Dict-like lookup of the pointers with some tags on a record, see :py:class:`_RecordLinks`."""
+
+    def __init__(self, gedcom_file, tags):
+        self.gedcom_file = gedcom_file
+        self.tags = tags
+
+    def get(self, record_id, default=None):
+        """Return the values of the child elements with these tags of the record with this id/pointer, or `default` if there is no such record (or no file)."""
+        if self.gedcom_file is None:
+            return default
+        try:
+            record = self.gedcom_file[record_id]
+        except KeyError:
+            return default
+        return [child.value for child in record.child_elements if child.tag in self.tags and child.value]
+
+
+class _RecordLinks(object):
+
+    """
+    The family links of a file without a :py:class:`RelationshipIndex`, read from the records when they are looked up.
+
+    It has the same attributes as :py:class:`RelationshipIndex`, but only
+    finds the links written on the record that is looked up (e.g. an
+    individual's FAMC elements, not the CHIL elements pointing to them).
+    """
+
+    def __init__(self, gedcom_file):
+        self.child_families = _LinkLookup(gedcom_file, ('FAMC',))
+        self.spouse_families = _LinkLookup(gedcom_file, ('FAMS',))
+        self.children = _LinkLookup(gedcom_file, ('CHIL',))
+        self.partners = _LinkLookup(gedcom_file, ('HUSB', 'WIFE'))
+
+
+def _readable_children(element):
+    """Return the child elements of this element, to read, without copying those of a record in a clone of a frozen file that hasn't been used yet (see :py:meth:`GedcomFile.clone`)."""
+    unparsed = element.__dict__.get('_unparsed')
+    return unparsed.child_elements if isinstance(unparsed, Element) else element.child_elements
+
+
+def name_parts(name_element):
+    """
+    Return the (firstname, lastname) of this NAME element.
+
+    They are taken from the value (``First /Last/``), or the GIVN and SURN
+    child elements if there is no value. If firstname or lastname isn't in
+    the file, then None is returned for it.
+
+    :param Element name_element: NAME element
+    :returns: (firstname, lastname)
+    :raises Exception: If the name is malformed
+    """
+    if name_element.value in ('', None):
+        try:
+            first = name_element['GIVN'].value
+        except IndexError:
+            first = None
+        try:
+            last = name_element['SURN'].value
+        except IndexError:
+            last = None
+    else:
+        vals = name_element.value.split("/")
+        assert len(vals) > 0
+        if len(vals) == 1:
+            # Only first name
+            first = vals[0].strip()
+            last = None
+        elif len(vals) == 2:
+            # malformed line
+            raise Exception
+        elif len(vals) == 3:
+            # Normal
+            first, last, dud = vals
+
+            first = first.strip()
+            last = last.strip()
+
+    return first, last
+
+
 tags_to_classes = {}
 
 
@@ -366,11 +1222,12 @@ class Individual(Element):
         """
         Return list of parents of this person.
 
-        NB: There may be 0, 1, 2, 3, ... elements in this list.
+        NB: There may be 0, 1, 2, 3, ... elements in this list. Records
+        that aren't in a file (e.g. from :py:func:`iter_records`) have none.
 
         :returns: List of Individual's
         """
-        if 'FAMC' in self:
+        if 'FAMC' in self and self.gedcom_file is not None:
             family_as_child_id = self['FAMC'].value
             family = self.get_by_id(family_as_child_id)
             if not any(child.value == self.id for child in family.get_list("CHIL")):
@@ -382,6 +1239,110 @@ class Individual(Element):
         else:
             return []
 
+    def _linked(self, ids):
+        """Return the records with these ids/pointers, skipping any not in the file."""
+        if self.gedcom_file is None:
+            return []
+        records = []
+        for record_id in ids:
+            try:
+                records.append(self.gedcom_file[record_id])
+            except KeyError:
+                pass
+        return records
+
+    def _family_links(self):
+        """Return the :py:class:`RelationshipIndex` of the file, or :py:class:`_RecordLinks` for files without one (e.g. :py:class:`gedcom.indexed.IndexedGedcomFile`)."""
+        relationship_index = getattr(self.gedcom_file, 'relationship_index', None)
+        return relationship_index() if relationship_index is not None else _RecordLinks(self.gedcom_file)
+
+    @property
+    def families(self):
+        """
+        Return the families this person is a partner (husband/wife) in.
+
+        Uses :py:meth:`GedcomFile.relationship_index`, so finding them
+        doesn't depend on the size of the file. In files without one (e.g.
+        :py:class:`gedcom.indexed.IndexedGedcomFile`), only the links
+        written on the records themselves (FAMS, FAMC, CHIL, HUSB, WIFE)
+        are followed.
+
+        :returns: List of :py:class:`Family`'s
+        """
+        return self._linked(self._family_links().spouse_families.get(self.id, ()))
+
+    @property
+    def spouses(self):
+        """
+        Return the partners of this person, in all their families.
+
+        :returns: List of :py:class:`Individual`'s, without duplicates
+        """
+        index = self._family_links()
+        spouse_ids = []
+        for family_id in index.spouse_families.get(self.id, ()):
+            for partner_id in index.partners.get(family_id, ()):
+                if partner_id != self.id and partner_id not in spouse_ids:
+                    spouse_ids.append(partner_id)
+        return self._linked(spouse_ids)
+
+    @property
+    def children(self):
+        """
+        Return the children of this person, in all their families.
+
+        :returns: List of :py:class:`Individual`'s, without duplicates
+        """
+        index = self._family_links()
+        child_ids = []
+        for family_id in index.spouse_families.get(self.id, ()):
+            for child_id in index.children.get(family_id, ()):
+                if child_id not in child_ids:
+                    child_ids.append(child_id)
+        return self._linked(child_ids)
+
+    @property
+    def siblings(self):
+        """
+        Return the other children of the families this person is a child in.
+
+        :returns: List of :py:class:`Individual`'s, without duplicates
+        """
+        index = self._family_links()
+        sibling_ids = []
+        for family_id in index.child_families.get(self.id, ()):
+            for child_id in index.children.get(family_id, ()):
+                if child_id != self.id and child_id not in sibling_ids:
+                    sibling_ids.append(child_id)
+        return self._linked(sibling_ids)
+
+    @property
+    def half_siblings(self):
+        """
+        Return the children of this person's parents with other partners.
+
+        That is, children of the other families of the partners of the
+        families this person is a child in, who aren't also in one of
+        those families (see :py:attr:`siblings`).
+
+        :returns: List of :py:class:`Individual`'s, without duplicates
+        """
+        index = self._family_links()
+        own_families = index.child_families.get(self.id, ())
+        excluded = set([self.id])
+        for family_id in own_families:
+            excluded.update(index.children.get(family_id, ()))
+        half_sibling_ids = []
+        for family_id in own_families:
+            for parent_id in index.partners.get(family_id, ()):
+                for other_family_id in index.spouse_families.get(parent_id, ()):
+                    if other_family_id in own_families:
+                        continue
+                    for child_id in index.children.get(other_family_id, ()):
+                        if child_id not in excluded and child_id not in half_sibling_ids:
+                            half_sibling_ids.append(child_id)
+        return self._linked(half_sibling_ids)
+
     @property
     def name(self):
         """
@@ -405,33 +1366,7 @@ class Individual(Element):
             # We've only one name
             preferred_name = name_tag
 
-        if preferred_name.value in ('', None):
-            try:
-                first = preferred_name['GIVN'].value
-            except IndexError:
-                first = None
-            try:
-                last = preferred_name['SURN'].value
-            except IndexError:
-                last = None
-        else:
-            vals = preferred_name.value.split("/")
-            assert len(vals) > 0
-            if len(vals) == 1:
-                # Only first name
-                first = vals[0].strip()
-                last = None
-            elif len(vals) == 2:
-                # malformed line
-                raise Exception
-            elif len(vals) == 3:
-                # Normal
-                first, last, dud = vals
-
-                first = first.strip()
-                last = last.strip()
-
-        return first, last
+        return name_parts(preferred_name)
 
     @property
     def aka(self):
@@ -685,6 +1620,194 @@ class Note(Element):
         return result
 
 
+class MemoryBudgetExceeded(MemoryError):
+
+    """Raised when parsing a file would use more memory than the ``max_memory`` given to :py:func:`parse`."""
+
+    def __init__(self, max_memory, used, elements):
+        """
+        Create the exception.
+
+        :param int max_memory: The memory budget, in bytes
+        :param int used: Estimated bytes used when parsing stopped
+        :param int elements: Number of elements parsed when parsing stopped
+        """
+        super(MemoryBudgetExceeded, self).__init__("Parsing used more than {0} bytes (about {1} bytes after {2} elements)".format(max_memory, used, elements))
+        self.max_memory = max_memory
+        self.used = used
+        self.elements = elements
+
+
+class FrozenError(TypeError):
+
+    """Raised when trying to change a :py:class:`FrozenGedcomFile` or one of its elements."""
+
+    pass
+
+
+class _FrozenDict(dict):
+
+    """A dict that can't be changed after it's created."""
+
+    def _readonly(self, *args, **kwargs):
+        raise FrozenError("This dict is read-only")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly
+
+
+class FrozenElementMixin(object):
+
+    """
+    Mixin that makes an :py:class:`Element` (or subclass) read-only, see :py:class:`FrozenGedcomFile`.
+
+    :py:attr:`child_elements` is a tuple, and setting any attribute raises
+    :py:class:`FrozenError`.
+    """
+
+    _frozen_classes = {}
+
+    def __setattr__(self, name, value):
+        """Raise :py:class:`FrozenError` once the element is frozen."""
+        if getattr(self, '_frozen', False):
+            raise FrozenError("Can't set {0} on a frozen element".format(name))
+        super(FrozenElementMixin, self).__setattr__(name, value)
+
+    def add_child_element(self, child_element):
+        """Raise :py:class:`FrozenError`, frozen elements can't be changed."""
+        raise FrozenError("Can't add child elements to a frozen element")
+
+    def set_levels_downward(self):
+        """Raise :py:class:`FrozenError`, frozen elements can't be changed."""
+        raise FrozenError("Can't change levels of a frozen element")
+
+    @classmethod
+    def frozen_class(cls, klass):
+        """Return the (cached) frozen version of the Element subclass `klass`."""
+        if klass not in cls._frozen_classes:
+            cls._frozen_classes[klass] = type("Frozen" + klass.__name__, (cls, klass), {'mutable_class': klass})
+        return cls._frozen_classes[klass]
+
+
+class FrozenGedcomFile(GedcomFile):
+
+    """
+    Read-only snapshot of a :py:class:`GedcomFile`, see :py:meth:`GedcomFile.freeze`.
+
+    All elements are copied into frozen versions of their classes (so
+    ``isinstance(x, Individual)`` etc. still works), with levels, header and
+    trailer already set. Containers are tuples or read-only dicts, and every
+    method that would change the file raises :py:class:`FrozenError`. Since
+    nothing is changed when reading, including :py:meth:`gedcom_lines`, one
+    snapshot can be used by many threads at once without locking.
+
+    Besides :py:attr:`pointers`, it has prebuilt indexes of records by tag
+    (:py:meth:`records`), of the elements pointing to each record
+    (:py:meth:`referrers`) and of family links (:py:meth:`relationship_index`).
+    """
+
+    def __init__(self, gedcom_file):
+        """
+        Create a snapshot of `gedcom_file`.
+
+        :param GedcomFile gedcom_file: File to copy
+        """
+        object.__setattr__(self, '_frozen', False)
+        self._source = None
+        self.next_free_id = gedcom_file.next_free_id
+        self.interned_value_tags = gedcom_file.interned_value_tags
+        self._intern_tables = _FrozenDict()
+
+        records = list(gedcom_file.root_elements)
+        if len(records) == 0 or records[0].tag != 'HEAD':
+            records.insert(0, gedcom_file.header_element())
+        if records[-1].tag != 'TRLR':
+            records.append(Element(level=0, tag='TRLR'))
+
+        root_elements = []
+        pointers = {}
+        by_tag = collections.defaultdict(list)
+        referrers = collections.defaultdict(list)
+        for record in records:
+            frozen_record = self._freeze_element(record, 0, None)
+            root_elements.append(frozen_record)
+            by_tag[frozen_record.tag].append(frozen_record)
+            if frozen_record.id:
+                pointers[frozen_record.id] = frozen_record
+            stack = [frozen_record]
+            while stack:
+                element = stack.pop()
+                stack.extend(reversed(element.child_elements))
+                if element.value and pointer_format.match(element.value):
+                    referrers[element.value].append(element)
+
+        self.root_elements = tuple(root_elements)
+        self.pointers = _FrozenDict(pointers)
+        self._by_tag = _FrozenDict((tag, tuple(elements)) for tag, elements in by_tag.items())
+        self._referrers = _FrozenDict((key, tuple(elements)) for key, elements in referrers.items())
+        self._relationships = RelationshipIndex(self)
+        self._frozen = True
+
+    def _freeze_element(self, element, level, parent):
+        """Return a frozen copy of `element` and its descendants, with levels starting at `level`."""
+        new_element = FrozenElementMixin.frozen_class(element.mutable_class or element.__class__)(
+            level=level, tag=element.tag, value=element.value, id=element.id, parent_id=parent.id if parent is not None else None, gedcom_file=self)
+        new_element.parent_element = parent
+        stack = [(element, new_element)]
+        new_elements = [new_element]
+        while stack:
+            original, copy = stack.pop()
+            for child in original.child_elements:
+                new_child = FrozenElementMixin.frozen_class(child.mutable_class or child.__class__)(
+                    level=copy.level + 1, tag=child.tag, value=child.value, id=child.id, parent_id=copy.id, gedcom_file=self)
+                new_child.parent_element = copy
+                copy.child_elements.append(new_child)
+                new_elements.append(new_child)
+                stack.append((child, new_child))
+        for new_element in new_elements:
+            new_element.child_elements = tuple(new_element.child_elements)
+            new_element._frozen = True
+        return new_elements[0]
+
+    def __setattr__(self, name, value):
+        """Raise :py:class:`FrozenError` once the file is frozen."""
+        if getattr(self, '_frozen', False):
+            raise FrozenError("Can't set {0} on a frozen file".format(name))
+        super(FrozenGedcomFile, self).__setattr__(name, value)
+
+    def records(self, tag):
+        """
+        Return all level 0 elements with this tag, from the index built when freezing.
+
+        :param str tag: Tag (e.g. 'INDI', 'SOUR')
+        :rtype: :py:class:`Records`
+        """
+        return Records(self, tag, self._by_tag.get(tag, ()))
+
+    def referrers(self, pointer):
+        """
+        Return all elements (at any level) whose value is this pointer.
+
+        :param str pointer: id/pointer (e.g. '@I1@')
+        :rtype: tuple
+        """
+        return self._referrers.get(pointer, ())
+
+    def freeze(self):
+        """Return this snapshot, it is already frozen."""
+        return self
+
+    def gedcom_lines(self):
+        """Iterator that returns the lines in this file, without changing anything."""
+        for el in self.root_elements:
+            for line in el.gedcom_lines():
+                yield line
+
+    def _readonly(self, *args, **kwargs):
+        raise FrozenError("This file is read-only")
+
+    add_element = ensure_header_trailer = ensure_levels = element = individual = family = intern = refresh = builder = _readonly
+
+
 def class_for_tag(tag):
     """
     Return the class object for this `tag`.
@@ -705,60 +1828,329 @@ def line_to_element(**line_dict):
     return class_for_tag(line_dict['tag'])(**line_dict)
 
 
-def parse_filename(filename):
+#: Magic bytes at the start of compressed files, and the compression they are for.
+COMPRESSION_MAGIC = ((b'\x1f\x8b', 'gzip'), (b'BZh', 'bz2'), (b'\xfd7zXZ\x00', 'xz'))
+
+#: Filename extensions of files that are written compressed.
+COMPRESSION_EXTENSIONS = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz'}
+
+
+def _compression(filename, mode):
+    """Return the compression ('gzip', 'bz2', 'xz') of this file, from its first bytes when reading, or its extension when writing, or None."""
+    if 'r' in mode:
+        with open(filename, 'rb') as fp:
+            start = fp.read(6)
+        return next((kind for magic, kind in COMPRESSION_MAGIC if start.startswith(magic)), None)
+    return COMPRESSION_EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+
+
+def open_compressed(filename, mode='rb'):
+    """
+    Open a file in binary mode, transparently (de)compressing gzip, bzip2 and xz files.
+
+    Files are read compressed if they start with the magic bytes of one of
+    these, and written compressed if the filename ends with ``.gz``,
+    ``.bz2`` or ``.xz``. Other files are opened normally.
+
+    :param str filename: File to open
+    :param str mode: ``'rb'`` or ``'wb'``
+    :returns: binary file-like object
+    :raises ImportError: for xz files, if the :py:mod:`lzma` module isn't available (Python 2)
+    """
+    kind = _compression(filename, mode)
+    if kind == 'gzip':
+        import gzip
+        return gzip.GzipFile(filename, mode, compresslevel=6)
+    elif kind == 'bz2':
+        import bz2
+        return bz2.BZ2File(filename, mode)
+    elif kind == 'xz':
+        try:
+            import lzma
+        except ImportError:
+            raise ImportError("Reading or writing xz files requires the lzma module (Python 3.3+, or 'pip install backports.lzma')")
+        return lzma.LZMAFile(filename, mode)
+    return open(filename, mode)
+
+
+def _open_text(filename):
+    """Open this (possibly compressed, see :py:func:`open_compressed`) file for reading lines, decoded like ``open(filename, 'r')``."""
+    if _compression(filename, 'r') is None:
+        return open(filename, 'r')
+    fp = open_compressed(filename, 'rb')
+    return fp if six.PY2 else io.TextIOWrapper(fp)
+
+
+def write_lines(lines, fileout, overwrite=False):
+    """
+    Write these lines (encoded as UTF-8) to this filename or file-like object.
+
+    With `overwrite`, the lines are written to a temporary file next to
+    `fileout`, which then replaces it, so `lines` can safely be read from
+    the file that is being overwritten. Filenames ending with ``.gz``,
+    ``.bz2`` or ``.xz`` are written compressed (see :py:func:`open_compressed`).
+
+    :param lines: iterator over strings, without line endings
+    :param fileout: Filename or open (binary) file-like object to write to.
+    :param bool overwrite: Whether to replace `fileout` if it already exists
+    :raises Exception: if the filename exists, and `overwrite` is False
+    """
+    if isinstance(fileout, six.string_types):
+        if os.path.exists(fileout) and not overwrite:
+            # TODO better exception
+            raise Exception("File exists")
+        elif overwrite:
+            handle, temp_filename = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(fileout)), prefix=".gedcompy-", suffix=os.path.splitext(fileout)[1])
+            os.close(handle)
+            try:
+                with open_compressed(temp_filename, "wb") as fp:
+                    write_lines(lines, fp)
+                getattr(os, 'replace', os.rename)(temp_filename, fileout)
+            except BaseException:
+                os.remove(temp_filename)
+                raise
+            return
+        else:
+            with open_compressed(fileout, "wb") as fp:
+                return write_lines(lines, fp)
+
+    for line in lines:
+        fileout.write(line.encode("utf8"))
+        fileout.write("\n".encode("utf8"))
+
+
+def _element_lines(elements, keep=None, start_level=0):
+    """Iterate over the lines of these elements, with levels from their depth (starting at `start_level`), skipping descendants for which `keep` returns False."""
+    for element in elements:
+        stack = [(element, start_level)]
+        while stack:
+            element, level = stack.pop()
+            yield u"{level}{id} {tag}{value}".format(level=level, id=(" " + element.id if element.id else ""), tag=element.tag, value=(" " + element.value if element.value else ""))
+            stack.extend((child, level + 1) for child in reversed(element.child_elements) if keep is None or keep(child))
+
+
+def parse_filename(filename, track_changes=False, **options):
     """
     Parse filename and return GedcomFile.
 
     :param string filename: Filename to parse
+    :param bool track_changes: Remember the offset and hash of each record, so that :py:meth:`GedcomFile.refresh` can later re-parse just the records that changed
+    :param **options: Passed to the :py:class:`GedcomFile` constructor
     :returns: GedcomFile instance
     """
-    with open(filename, 'r') as fp:
-        return __parse(fp.readlines())
+    if not track_changes:
+        with _open_text(filename) as fp:
+            return __parse(fp, **options)
+
+    stat = os.stat(filename)
+    scanned = []
+
+    def lines():
+        with open_compressed(filename, 'rb') as fp:
+            for offset, data in _scan_records(fp):
+                scanned.append((offset, len(data), hashlib.sha1(data).digest()))
+                for line in _decode_lines(data):
+                    yield line
+
+    gedcom_file = __parse(lines(), **options)
+    records = [SourceRecord(offset, length, digest, record) for (offset, length, digest), record in zip(scanned, gedcom_file.root_elements)]
+    gedcom_file._source = {'filename': filename, 'lazy': options.get('lazy', False), 'stat': (stat.st_size, stat.st_mtime), 'records': records}
+    return gedcom_file
+
+
+#: Where a record is in the file it was parsed from, see :py:meth:`GedcomFile.refresh`.
+SourceRecord = collections.namedtuple('SourceRecord', ['offset', 'length', 'digest', 'record'])
+
+
+def _scan_records(fp):
+    """Iterate over ``(offset, bytes)`` for each record (a level 0 line, and the lines until the next one) in this binary file."""
+    offset = start = 0
+    chunks = []
+    in_record = False
+    for line in fp:
+        if line[:2] == b'0 ':
+            if in_record:
+                yield start, b''.join(chunks)
+                start, chunks = offset, []
+            in_record = True
+        chunks.append(line)
+        offset += len(line)
+    if in_record:
+        yield start, b''.join(chunks)
+
 
+def _decode_lines(data):
+    """Split the bytes of a record into lines, decoded the same way as ``open(filename, 'r')`` does."""
+    if not six.PY2:
+        data = data.decode(locale.getpreferredencoding(False))
+    return data.splitlines()
 
-def parse_string(string):
+
+def parse_string(string, **options):
     """
     Parse filename and return GedcomFile.
 
     :param str string: Filename to parse
+    :param **options: Passed to the :py:class:`GedcomFile` constructor
     :returns: GedcomFile instance
     """
-    return __parse(string.split("\n"))
+    return __parse(string.split("\n"), **options)
 
 
-def parse_fp(file_fp):
+def parse_fp(file_fp, **options):
     """
     Parse file and return GedcomFile.
 
     :param filehandle file_fp: open file handle for input
+    :param **options: Passed to the :py:class:`GedcomFile` constructor
     :returns: GedcomFile
     """
-    return __parse(file_fp.readlines())
+    return __parse(file_fp, **options)
 
 
-def parse(obj):
+def parse(obj, **options):
     """
     Parse and return this object, if it's a file.
 
     If it's a filename, it calls :py:func:`parse_filename`, for file-like objects, :py:mod:`parse_fp`, for strings, calls :py:mod:`parse_string`.
 
     :param obj: filename, open file-like object or string contents of GEDCOM file
+    :param bool lazy: Only parse the level 0 line of each record, and keep the rest of its lines as text until its child elements are first used.
+        This makes parsing faster and uses less memory when only some records are looked at. Errors in those lines are only raised when they are parsed.
+    :param bool track_changes: For filenames, allow :py:meth:`GedcomFile.refresh` (see :py:func:`parse_filename`)
+    :param int max_memory: *optional* Stop parsing (raising :py:class:`MemoryBudgetExceeded`) if the elements would use more than this many bytes,
+        as estimated by :py:meth:`GedcomFile.memory_report`. Files that are too big can still be processed one record at a time with :py:func:`iter_records`.
+    :param **options: Passed to the :py:class:`GedcomFile` constructor (e.g. ``interned_value_tags``)
     :returns: GedcomFile
+    :raises MemoryBudgetExceeded: if `max_memory` is exceeded
     """
+    if isinstance(obj, six.string_types) and _is_filename(obj):
+        return parse_filename(obj, **options)
+
+    options.pop('track_changes', None)
     if isinstance(obj, six.string_types):
-        # Sanity check, presumes anything > 1KB could not be a filename
-        if len(obj) <= 1024 and os.path.exists(obj):
-            return parse_filename(obj)
-        else:
-            return parse_string(obj)
+        return parse_string(obj, **options)
     else:
-        return parse_fp(obj)
+        return parse_fp(obj, **options)
 
 
-def __parse(lines_iter):
-    current_level = 0
-    level_to_obj = {}
-    gedcom_file = GedcomFile()
+def _is_filename(obj):
+    """Return True iff this string is the name of an existing file."""
+    # Sanity check, presumes anything > 1KB could not be a filename
+    return len(obj) <= 1024 and os.path.exists(obj)
+
+
+def _iter_source_records(source):
+    """
+    Return the records of a :py:class:`GedcomFile`, or of a file read one record at a time with :py:func:`iter_records`, or the iterable of records given.
+
+    :param source: :py:class:`GedcomFile`, filename, open file-like object, string contents of a GEDCOM file, or iterable of records
+    :rtype: iterable of records
+    """
+    if isinstance(source, GedcomFile):
+        return source.root_elements
+    elif isinstance(source, six.string_types) or hasattr(source, 'read'):
+        return iter_records(source)
+    return source
+
+
+def iter_records(obj):
+    """
+    Iterate over the records (level 0 elements, with their child elements) of a GEDCOM file, without loading all of it.
+
+    Only one record is in memory at a time. The records aren't in a
+    :py:class:`GedcomFile`, so methods that look up other records by
+    id/pointer (e.g. :py:attr:`Individual.parents`) won't work on them.
+
+    :param obj: filename, open file-like object or string contents of GEDCOM file (as for :py:func:`parse`)
+    :rtype: iterator over Element (or subclasses)
+    """
+    if isinstance(obj, six.string_types) and _is_filename(obj):
+        with _open_text(obj) as fp:
+            for record in iter_records(fp):
+                yield record
+        return
+
+    lines = obj.split("\n") if isinstance(obj, six.string_types) else obj
+    record = None
+    for element in _parse_elements(lines):
+        if element.level == 0:
+            if record is not None:
+                yield record
+            record = element
+    if record is not None:
+        yield record
+
+
+def __parse(lines_iter, max_memory=None, lazy=False, **options):
+    gedcom_file = GedcomFile(**options)
+    elements_iter = (_parse_lazy_records if lazy else _parse_elements)(lines_iter, gedcom_file)
+    if max_memory is None:
+        for element in elements_iter:
+            gedcom_file.add_element(element)
+        return gedcom_file
+
+    seen = set()
+    used = 0
+    for elements, element in enumerate(elements_iter, 1):
+        used += _element_size(element, seen)
+        if used > max_memory:
+            # Let go of everything parsed so far before raising, so that the traceback doesn't keep it
+            elements_iter.close()
+            del gedcom_file, element, elements_iter
+            raise MemoryBudgetExceeded(max_memory, used, elements)
+        gedcom_file.add_element(element)
+    return gedcom_file
+
+
+def _element_size(element, seen):
+    """Return the approximate bytes this element (but not its children) uses, counting strings whose id() is in `seen` as free (and adding new ones)."""
+    size = sys.getsizeof(element) + sys.getsizeof(element.__dict__)
+    if element.is_parsed:
+        size += sys.getsizeof(element.child_elements)
+    else:
+        size += sys.getsizeof(element.__dict__['_unparsed'])
+    for string in (element.tag, element.value, element.id):
+        if string is not None and id(string) not in seen:
+            seen.add(id(string))
+            size += sys.getsizeof(string)
+    return size
+
+
+def _parse_lazy_records(lines_iter, gedcom_file):
+    """Iterate over the records on these lines, with the lines of their child elements kept unparsed (see :py:class:`_LazyChildElements`)."""
+    record = None
+    child_lines = []
+    for line in lines_iter:
+        line = line.strip()
+        if line[:2] != '0 ':
+            if line != '':
+                if record is None:
+                    # Let the normal parser raise the error
+                    list(_parse_elements([line], gedcom_file))
+                child_lines.append(line)
+            continue
+        if record is not None:
+            record._unparsed = "\n".join(child_lines)
+            yield record
+        record = next(_parse_elements([line], gedcom_file))
+        del record.child_elements
+        child_lines = []
+    if record is not None:
+        record._unparsed = "\n".join(child_lines)
+        yield record
+
+
+def _parse_elements(lines_iter, gedcom_file=None, parent=None):
+    """Iterate over the elements on these lines, in file order, each already added to its parent element (or `parent`, for lines below it)."""
+    level_to_obj = {} if parent is None else {parent.level: parent}
+    if gedcom_file is not None and getattr(gedcom_file, '_intern_tables', None):
+        intern_tag = gedcom_file._intern_tables['tags'].setdefault
+        intern_xref = gedcom_file._intern_tables['xrefs'].setdefault
+        intern_value = gedcom_file._intern_tables['values'].setdefault
+        interned_value_tags = gedcom_file.interned_value_tags
+    else:
+        intern_tag = intern_xref = intern_value = None
 
     for linenum, line in enumerate(lines_iter):
         line = line.strip()
@@ -772,13 +2164,33 @@ def __parse(lines_iter):
 
         if level == 0:
             parent = None
+            level_to_obj = {}
         else:
             level_to_obj = dict((l, obj) for l, obj in level_to_obj.items() if l < level)
             parent = level_to_obj[level - 1]
 
-        element = line_to_element(level=level, parent=parent, tag=match.groupdict()['tag'], value=match.groupdict()['value'], id=match.groupdict()['id'])
+        tag, value, xref = match.group('tag'), match.group('value'), match.group('id')
+        if intern_tag is not None:
+            tag = intern_tag(tag, tag)
+            if xref is not None:
+                xref = intern_xref(xref, xref)
+            if value:
+                if value[0] == '@' and pointer_format.match(value):
+                    value = intern_xref(value, value)
+                elif tag in interned_value_tags:
+                    value = intern_value(value, value)
+
+        element = line_to_element(level=level, parent=parent, tag=tag, value=value, id=xref)
         level_to_obj[level] = element
         element.gedcom_file = gedcom_file
-        gedcom_file.add_element(element)
+        yield element
 
-    return gedcom_file
+
+from .pipelines import Pipeline, pipeline  # noqa: E402 (needs the names above)
+from .tables import build_tables  # noqa: E402
+from .builder import Builder  # noqa: E402
+from .merging import merge  # noqa: E402
+from .indexed import IndexedGedcomFile  # noqa: E402
+from .places import place_hierarchy  # noqa: E402
+from .mapreduce import map_reduce  # noqa: E402
+from .timeline import Timeline  # noqa: E402
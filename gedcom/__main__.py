@@ -0,0 +1,6 @@
+"""Allow running the command line tool with ``python -m gedcom``, see :py:mod:`gedcom.cli`."""
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,265 @@
+"""
+Create many records at once, e.g. when exporting a database to GEDCOM.
+
+A :py:class:`Builder` (from :py:meth:`gedcom.GedcomFile.builder`) makes
+individuals, families and events from rows (tuples or dicts), and adds them
+to the file in batches. It is much faster than calling
+:py:meth:`gedcom.GedcomFile.individual` and
+:py:meth:`gedcom.Element.add_child_element` for every element, because it
+knows the structure it makes: elements are created with the right class
+(looked up once per tag) and level straight away, ids are assigned in bulk,
+and records are added to the file's lists and pointers once per batch.
+
+    >>> with gedcomfile.builder() as builder:
+    ...     builder.add_individuals([('@I1@', 'Bob /Cox/', 'M', '1 JAN 1900', 'London')])
+    ...     builder.add_families([{'husband': '@I1@', 'children': ['@I2@', '@I3@']}])
+    ...     builder.add_events([('@I1@', 'OCCU', None, 'Paris')])
+
+Rows can be tuples, with the values in the order of the ``columns``
+argument (by default :py:data:`INDIVIDUAL_COLUMNS`, etc.), or dicts with
+those keys. Missing and None values are left out.
+"""
+import gc
+
+import six
+
+from . import class_for_tag, pointer_format
+
+#: Default columns for :py:meth:`Builder.add_individuals`. ``name`` is a GEDCOM name (``"Bob /Cox/"``) or a ``(given name, surname)`` tuple, ``famc`` and ``fams`` a pointer or list of pointers.
+INDIVIDUAL_COLUMNS = ('id', 'name', 'sex', 'birth_date', 'birth_place', 'death_date', 'death_place', 'famc', 'fams')
+
+#: Default columns for :py:meth:`Builder.add_families`. ``children`` is a list of pointers.
+FAMILY_COLUMNS = ('id', 'husband', 'wife', 'children', 'marriage_date', 'marriage_place')
+
+#: Default columns for :py:meth:`Builder.add_events`. ``record`` is the id/pointer of the individual or family the event is for.
+EVENT_COLUMNS = ('record', 'tag', 'date', 'place')
+
+
+def _new(klass, level, tag, value=None, id=None, parent=None, gedcom_file=None):
+    """Return a new element, without the checks and bookkeeping of Element.__init__."""
+    element = klass.__new__(klass)
+    element.__dict__ = {
+        'level': level, 'tag': tag, 'value': value, 'child_elements': [], 'parent_element': parent, 'id': id,
+        'parent_id': parent.id if parent is not None else None, 'gedcom_file': gedcom_file}
+    if parent is not None:
+        parent.child_elements.append(element)
+    return element
+
+
+def _as_list(value):
+    if value is None:
+        return ()
+    elif isinstance(value, six.string_types):
+        return (value,)
+    return value
+
+
+class Builder(object):
+
+    """
+    Adds records to a :py:class:`gedcom.GedcomFile` in bulk, see :py:mod:`gedcom.builder`.
+
+    Records are added to the file every `batch_size` records, and when
+    :py:meth:`flush` is called (which happens at the end of a ``with``
+    block), so the file is only up to date after that.
+
+    With `pause_gc`, the garbage collector is turned off while rows are
+    made into records. The new elements are all kept (by the file), so its
+    repeated scans of them are wasted, and can take over half the time.
+    But this turns it off for the whole process, including other threads,
+    so it should only be used where nothing else is running (e.g. in a
+    script that converts a database).
+    """
+
+    def __init__(self, gedcom_file, batch_size=10000, pause_gc=False):
+        """
+        Create a builder.
+
+        :param GedcomFile gedcom_file: File to add the records to
+        :param int batch_size: Number of records to make before adding them to the file
+        :param bool pause_gc: Turn off the garbage collector while making records (see above)
+        """
+        self.gedcom_file = gedcom_file
+        self.batch_size = batch_size
+        self.pause_gc = pause_gc
+        self._pending = []
+        self._pending_ids = {}
+        intern_tables = gedcom_file._intern_tables
+        self._intern_xref = intern_tables['xrefs'].setdefault
+        self._intern_value = intern_tables['values'].setdefault
+        self._interned_value_tags = gedcom_file.interned_value_tags
+        self._classes = {}
+
+    def __enter__(self):
+        """Use as a context manager, which calls :py:meth:`flush` at the end."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Add the remaining records to the file, unless there was an exception."""
+        if exc_type is None:
+            self.flush()
+
+    def _rows(self, rows, columns, known_columns):
+        """Iterate over the rows as tuples of values, in the order of `known_columns`."""
+        columns = known_columns if columns is None else tuple(columns)
+        unknown = set(columns) - set(known_columns)
+        if unknown:
+            raise ValueError("Unknown columns: {0}".format(", ".join(sorted(unknown))))
+        positions = [columns.index(column) if column in columns else None for column in known_columns]
+        width = len(columns)
+        for row in rows:
+            if isinstance(row, dict):
+                yield tuple(row.get(column) for column in known_columns)
+            else:
+                if len(row) != width:
+                    raise ValueError("Row {0!r} doesn't have {1} values".format(row, width))
+                yield tuple(None if position is None else row[position] for position in positions)
+
+    def _ids(self, prefix, count, reserved=()):
+        """Return `count` unused ids with this prefix, continuing from the file's next free id, and not in `reserved` (e.g. ids given later in the same rows)."""
+        gedcom_file = self.gedcom_file
+        pointers, pending = gedcom_file.pointers, self._pending_ids
+        ids = []
+        number = gedcom_file.next_free_id
+        while len(ids) < count:
+            new_id = "@{0}{1}@".format(prefix, number)
+            number += 1
+            if new_id not in pointers and new_id not in pending and new_id not in reserved:
+                ids.append(new_id)
+        gedcom_file.next_free_id = number
+        return ids
+
+    def _new(self, tag, level, value=None, id=None, parent=None):
+        klass = self._classes.get(tag)
+        if klass is None:
+            klass = self._classes[tag] = class_for_tag(tag)
+        return _new(klass, level, tag, value, id=id, parent=parent, gedcom_file=self.gedcom_file)
+
+    def _record(self, tag, record_id):
+        if record_id in self._pending_ids or record_id in self.gedcom_file.pointers:
+            raise ValueError("Duplicate id {0}".format(record_id))
+        if not pointer_format.match(record_id):
+            raise ValueError("Invalid id {0!r}".format(record_id))
+        record = self._new(tag, 0, id=self._intern_xref(record_id, record_id))
+        self._pending.append(record)
+        self._pending_ids[record.id] = record
+        return record
+
+    def _child(self, parent, tag, value):
+        if tag in self._interned_value_tags:
+            value = self._intern_value(value, value)
+        return self._new(tag, parent.level + 1, value, parent=parent)
+
+    def _pointer(self, parent, tag, pointer):
+        return self._new(tag, parent.level + 1, self._intern_xref(pointer, pointer), parent=parent)
+
+    def _event(self, parent, tag, date, place, value=None):
+        event = self._new(tag, parent.level + 1, value, parent=parent)
+        if date is not None:
+            self._child(event, 'DATE', date)
+        if place is not None:
+            self._child(event, 'PLAC', place)
+        return event
+
+    def _add_records(self, rows, columns, known_columns, prefix, make):
+        rows = list(self._rows(rows, columns, known_columns))
+        given_ids = set(row[0] for row in rows if row[0] is not None)
+        new_ids = iter(self._ids(prefix, sum(1 for row in rows if row[0] is None), given_ids))
+        ids = []
+        paused = self.pause_gc and gc.isenabled()
+        if paused:
+            gc.disable()
+        try:
+            for row in rows:
+                record_id = row[0] if row[0] is not None else next(new_ids)
+                make(record_id, row)
+                ids.append(record_id)
+                if len(self._pending) >= self.batch_size:
+                    self.flush()
+        finally:
+            if paused:
+                gc.enable()
+        return ids
+
+    def add_individuals(self, rows, columns=None):
+        """
+        Make an individual (INDI record) for each row.
+
+        :param rows: iterable of tuples or dicts
+        :param columns: *optional* names of the values in tuple rows (default :py:data:`INDIVIDUAL_COLUMNS`)
+        :returns: the ids/pointers of the new individuals (new ids are assigned where the ``id`` is None)
+        :rtype: list
+        :raises ValueError: if an id is already used, or a row has the wrong number of values
+        """
+        def make(record_id, row):
+            name, sex, birth_date, birth_place, death_date, death_place, famc, fams = row[1:]
+            record = self._record('INDI', record_id)
+            if name is not None:
+                self._child(record, 'NAME', name if isinstance(name, six.string_types) else u"{0} /{1}/".format(*name))
+            if sex is not None:
+                self._child(record, 'SEX', sex)
+            if birth_date is not None or birth_place is not None:
+                self._event(record, 'BIRT', birth_date, birth_place)
+            if death_date is not None or death_place is not None:
+                self._event(record, 'DEAT', death_date, death_place)
+            for pointer in _as_list(famc):
+                self._pointer(record, 'FAMC', pointer)
+            for pointer in _as_list(fams):
+                self._pointer(record, 'FAMS', pointer)
+
+        return self._add_records(rows, columns, INDIVIDUAL_COLUMNS, 'I', make)
+
+    def add_families(self, rows, columns=None):
+        """
+        Make a family (FAM record) for each row.
+
+        :param rows: iterable of tuples or dicts
+        :param columns: *optional* names of the values in tuple rows (default :py:data:`FAMILY_COLUMNS`)
+        :returns: the ids/pointers of the new families (new ids are assigned where the ``id`` is None)
+        :rtype: list
+        :raises ValueError: if an id is already used, or a row has the wrong number of values
+        """
+        def make(record_id, row):
+            husband, wife, children, marriage_date, marriage_place = row[1:]
+            record = self._record('FAM', record_id)
+            if husband is not None:
+                self._pointer(record, 'HUSB', husband)
+            if wife is not None:
+                self._pointer(record, 'WIFE', wife)
+            for pointer in _as_list(children):
+                self._pointer(record, 'CHIL', pointer)
+            if marriage_date is not None or marriage_place is not None:
+                self._event(record, 'MARR', marriage_date, marriage_place)
+
+        return self._add_records(rows, columns, FAMILY_COLUMNS, 'F', make)
+
+    def add_events(self, rows, columns=None):
+        """
+        Add an event (e.g. BIRT, OCCU, MARR) to an existing (or new, not yet flushed) record for each row.
+
+        :param rows: iterable of tuples or dicts
+        :param columns: *optional* names of the values in tuple rows (default :py:data:`EVENT_COLUMNS`)
+        :raises KeyError: if there is no record with the ``record`` id/pointer
+        """
+        pointers, pending = self.gedcom_file.pointers, self._pending_ids
+        for record_id, tag, date, place in self._rows(rows, columns, EVENT_COLUMNS):
+            record = pending[record_id] if record_id in pending else pointers[record_id]
+            self._event(record, tag, date, place)
+
+    def flush(self):
+        """Add all records made so far to the file (before its trailer, if it has one)."""
+        if not self._pending:
+            return
+        gedcom_file = self.gedcom_file
+        root_elements = gedcom_file.root_elements
+        trailer = root_elements.pop() if root_elements and root_elements[-1].tag == 'TRLR' else None
+        root_elements.extend(self._pending)
+        if trailer is not None:
+            root_elements.append(trailer)
+        for record in self._pending:
+            gedcom_file._by_tag.setdefault(record.tag, []).append(record)
+            if gedcom_file._relationships is not None:
+                gedcom_file._relationships.add_record(record)
+        gedcom_file.pointers.update(self._pending_ids)
+        self._pending = []
+        self._pending_ids = {}
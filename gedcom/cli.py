@@ -0,0 +1,403 @@
+"""
+The ``gedcompy`` command line tool, for common jobs on (many, or huge) GEDCOM files.
+
+    $ gedcompy stats --jobs 4 huge.ged
+    $ gedcompy validate *.ged
+    $ gedcompy convert --to json tree.ged tree.jsonl
+    $ gedcompy split --size 50M huge.ged
+    $ gedcompy extract --id @I1@ --ancestors all tree.ged ancestors.ged
+
+``stats``, ``convert`` and ``split`` stream the records (with
+:py:func:`gedcom.iter_records` and :py:func:`gedcom.map_reduce`), so files
+of any size can be processed in constant memory. ``validate`` and
+``extract`` need the whole file to follow pointers. With ``--jobs N``,
+several files are processed at once, or (for ``stats`` on one file) the
+records of the file are split over N processes. ``extract`` has no
+``--jobs``: it reads one file, and follows pointers from record to record,
+which can't be split over processes.
+
+Files are decoded with the character set in their header (``1 CHAR``),
+unless ``--encoding`` is given, and are always written as UTF-8. The same
+is available as ``python -m gedcom``.
+"""
+from __future__ import print_function
+
+import argparse
+import codecs
+import collections
+import io
+import itertools
+import multiprocessing
+import os
+import re
+import sys
+
+import six
+
+from . import COMPRESSION_EXTENSIONS, GedcomFile, _element_lines, _open_text, iter_records, map_reduce, open_compressed, parse_fp, write_lines
+from . import mapreduce, ndjson
+
+#: GEDCOM character sets (``1 CHAR`` in the header), and the Python codec for them.
+#:
+#: A ``1 CHAR UNICODE`` line that can be read as bytes is in a file that
+#: isn't UTF-16 (e.g. one saved by :py:meth:`gedcom.GedcomFile.save`, which
+#: writes UTF-8), so it is read as UTF-8. UTF-16 files are found by their
+#: byte order mark, or the zero bytes of their first character.
+CHARSET_ENCODINGS = {'UTF-8': 'utf-8', 'UTF8': 'utf-8', 'UNICODE': 'utf-8', 'ASCII': 'ascii', 'ANSI': 'cp1252', 'IBMPC': 'cp437', 'MACINTOSH': 'mac_roman'}
+
+#: Filename extensions (before any compression extension) of JSON Lines files, see :py:mod:`gedcom.ndjson`.
+JSON_EXTENSIONS = ('.json', '.jsonl', '.ndjson')
+
+charset_format = re.compile(b"^1 CHAR (\\S+)", re.MULTILINE)
+size_format = re.compile("^([0-9]+)([KMG]?)B?$", re.IGNORECASE)
+
+
+def detect_encoding(filename):
+    """
+    Return the Python codec for this (possibly compressed) GEDCOM file, from its byte order mark or the ``1 CHAR`` line of its header.
+
+    :param str filename: GEDCOM file
+    :returns: codec name, or None if the file doesn't say (so the default, as for :py:func:`gedcom.parse`, is used)
+    :raises ValueError: if the character set has no Python codec (e.g. ANSEL)
+    """
+    with open_compressed(filename, 'rb') as fp:
+        start = fp.read(65536)
+    if start.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    elif start.startswith(codecs.BOM_UTF16_LE) or start.startswith(codecs.BOM_UTF16_BE):
+        return 'utf-16'
+    elif start[:2] == b"0\x00":
+        return 'utf-16-le'
+    elif start[:2] == b"\x000":
+        return 'utf-16-be'
+    # Only look in the header
+    match = charset_format.search(start.split(b"\n0 ", 1)[0])
+    if match is None:
+        return None
+    charset = match.group(1).decode('ascii', 'replace').upper()
+    if charset not in CHARSET_ENCODINGS:
+        raise ValueError("{0}: can't decode character set {1}, give the encoding with --encoding".format(filename, charset))
+    return CHARSET_ENCODINGS[charset]
+
+
+def open_input(filename, encoding=None):
+    """
+    Open this (possibly compressed) GEDCOM file for reading lines of text.
+
+    :param str filename: GEDCOM file
+    :param str encoding: *optional* Python codec, instead of :py:func:`detect_encoding`
+    :returns: text file-like object
+    """
+    encoding = encoding or detect_encoding(filename)
+    if encoding is None:
+        return _open_text(filename)
+    fp = open_compressed(filename, 'rb')
+    return codecs.getreader(encoding)(fp) if six.PY2 else io.TextIOWrapper(fp, encoding=encoding)
+
+
+def _split_extension(filename):
+    """Split ``tree.ged.gz`` into ``('tree', '.ged', '.gz')``."""
+    base, compression = os.path.splitext(filename)
+    if compression.lower() not in COMPRESSION_EXTENSIONS:
+        base, compression = filename, ''
+    base, extension = os.path.splitext(base)
+    return base, extension, compression
+
+
+def _is_json(filename):
+    return _split_extension(filename)[1].lower() in JSON_EXTENSIONS
+
+
+def record_stats(record):
+    """Mapper for :py:func:`file_stats`: count the record by tag, and its elements."""
+    return collections.Counter({('records', record.tag): 1, ('elements', None): sum(mapreduce.tags(record).values())})
+
+
+def file_stats(filename, encoding=None, workers=0):
+    """
+    Count the records (by tag) and elements in this file, streaming it.
+
+    :param str filename: GEDCOM file
+    :param str encoding: *optional* Python codec (default: :py:func:`detect_encoding`)
+    :param int workers: Number of processes, see :py:func:`gedcom.map_reduce`
+    :returns: ``(tag to number of records, number of elements)``
+    :rtype: tuple
+    """
+    with open_input(filename, encoding) as fp:
+        counts = map_reduce(fp, record_stats, mapreduce.merge_counts, workers=workers) or collections.Counter()
+    records = collections.Counter(dict((tag, count) for (kind, tag), count in counts.items() if kind == 'records'))
+    return records, counts[('elements', None)]
+
+
+def validate_file(filename, encoding=None):
+    """
+    Parse and validate (see :py:meth:`gedcom.GedcomFile.validate`) this file.
+
+    :param str filename: GEDCOM file
+    :param str encoding: *optional* Python codec (default: :py:func:`detect_encoding`)
+    :returns: problems, as messages
+    :rtype: list of strings
+    """
+    try:
+        with open_input(filename, encoding) as fp:
+            gedcom_file = parse_fp(fp)
+    except NotImplementedError as error:
+        return ["unparsable line: {0}".format(error)]
+    return ["{0}: {1}: {2}".format(issue.record.id or issue.record.tag, issue.code, issue.message) for issue in gedcom_file.validate()]
+
+
+def _utf8_header(record):
+    """Pipeline map stage that sets the character set in the header to UTF-8 (as the file is written in)."""
+    if record.tag == 'HEAD':
+        for element in record.child_elements:
+            if element.tag == 'CHAR':
+                element.value = 'UTF-8'
+    return record
+
+
+def convert(filename, fileout, to=None, encoding=None, overwrite=False):
+    """
+    Convert a GEDCOM file to UTF-8, or to or from JSON Lines (see :py:mod:`gedcom.ndjson`), one record at a time.
+
+    Files with a ``.json``, ``.jsonl`` or ``.ndjson`` extension are JSON Lines, others GEDCOM.
+
+    :param str filename: GEDCOM or JSON Lines file
+    :param str fileout: File to write to
+    :param str to: ``'gedcom'`` or ``'json'`` (default: from the extension of `fileout`)
+    :param str encoding: *optional* Python codec of a GEDCOM `filename` (default: :py:func:`detect_encoding`)
+    :param bool overwrite: Whether to replace `fileout` if it already exists
+    """
+    to = to or ('json' if _is_json(fileout) else 'gedcom')
+    with (open_compressed(filename, 'rb') if _is_json(filename) else open_input(filename, encoding)) as fp:
+        records = (_utf8_header(record) for record in (ndjson.iter_load(fp) if _is_json(filename) else iter_records(fp)))
+        write_lines(ndjson.iter_dump(records) if to == 'json' else _element_lines(records), fileout, overwrite=overwrite)
+
+
+def split(filename, records=None, size=None, output_dir=None, encoding=None, overwrite=False):
+    """
+    Split a GEDCOM file into parts with at most `records` records, or `size` bytes, each.
+
+    Every part has the header of the file (or a new one) and a trailer.
+    Records are never split, so a part is only bigger than `size` if it has
+    just one record. Pointers between records in different parts are kept,
+    so each part on its own will have dangling pointers.
+
+    :param str filename: GEDCOM file
+    :param int records: Maximum number of records (apart from HEAD and TRLR) per part
+    :param int size: Maximum bytes per part (before any compression)
+    :param str output_dir: Directory to write the parts to (default: the directory of `filename`)
+    :param str encoding: *optional* Python codec (default: :py:func:`detect_encoding`)
+    :param bool overwrite: Whether to replace parts that already exist
+    :returns: filenames of the parts (``tree-001.ged``, ``tree-002.ged``, ...)
+    :rtype: list
+    :raises ValueError: if neither `records` nor `size` is given
+    """
+    if not records and not size:
+        raise ValueError("Give the number of records, or size, of the parts")
+    base, extension, compression = _split_extension(filename)
+    if output_dir is not None:
+        base = os.path.join(output_dir, os.path.basename(base))
+
+    with open_input(filename, encoding) as fp:
+        all_records = iter_records(fp)
+        first = next(all_records, None)
+        if first is not None and first.tag == 'HEAD':
+            header = first
+        else:
+            header = GedcomFile().header_element()
+            all_records = itertools.chain([first] if first is not None else [], all_records)
+        header_lines = list(_element_lines([_utf8_header(header)]))
+        header_size = sum(len(line.encode("utf8")) + 1 for line in header_lines) + len("0 TRLR\n")
+
+        part = {'number': 0, 'records': 0, 'size': 0}
+
+        def part_number(record_lines):
+            record_size = sum(len(line.encode("utf8")) + 1 for line in record_lines[1])
+            full = (records and part['records'] >= records) or (size and part['size'] + record_size > size)
+            if part['number'] == 0 or (full and part['records'] > 0):
+                part.update(number=part['number'] + 1, records=0, size=header_size)
+            part['records'] += 1
+            part['size'] += record_size
+            return part['number']
+
+        with_lines = ((record, list(_element_lines([record]))) for record in all_records if record.tag not in ('HEAD', 'TRLR'))
+        filenames = []
+        for number, group in itertools.groupby(with_lines, part_number):
+            part_filename = "{0}-{1:03d}{2}{3}".format(base, number, extension, compression)
+            lines = itertools.chain(header_lines, (line for record, record_lines in group for line in record_lines), ["0 TRLR"])
+            write_lines(lines, part_filename, overwrite=overwrite)
+            filenames.append(part_filename)
+    return filenames
+
+
+def _call(arguments):
+    """Call ``arguments[0](*arguments[1:])``, in a worker process."""
+    return arguments[0](*arguments[1:])
+
+
+def _run(calls, jobs):
+    """Iterate over the results of these ``(function, arg, ...)`` calls, in order, with up to `jobs` processes."""
+    calls = list(calls)
+    if jobs <= 1 or len(calls) <= 1:
+        for arguments in calls:
+            yield _call(arguments)
+        return
+    pool = multiprocessing.Pool(min(jobs, len(calls)))
+    try:
+        for result in pool.imap(_call, calls):
+            yield result
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _parse_size(value):
+    """Argument type for sizes like ``500000``, ``200K``, ``50M`` or ``1G``."""
+    match = size_format.match(value.strip())
+    if not match:
+        raise argparse.ArgumentTypeError("invalid size {0!r}".format(value))
+    return int(match.group(1)) * 1024 ** " KMG".index(match.group(2).upper() or " ")
+
+
+def _parse_generations(value):
+    """Argument type for a number of generations, or ``all``."""
+    if value == 'all':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid number of generations {0!r}".format(value))
+
+
+def command_stats(args):
+    """Print the number of records of each tag, and of elements, in each file (``gedcompy stats``)."""
+    if len(args.files) == 1:
+        # Split the records of the file over the processes
+        calls, jobs = [(file_stats, args.files[0], args.encoding, args.jobs if args.jobs > 1 else 0)], 1
+    else:
+        calls, jobs = [(file_stats, f, args.encoding, 0) for f in args.files], args.jobs
+    for filename, (records, elements) in zip(args.files, _run(calls, jobs)):
+        print("{0}: {1} records, {2} elements".format(filename, sum(records.values()), elements))
+        for tag, count in records.most_common():
+            print("  {0:<6} {1}".format(tag, count))
+    return 0
+
+
+def command_validate(args):
+    """Print the problems found in each file, and return 1 if there were any (``gedcompy validate``)."""
+    status = 0
+    for filename, problems in zip(args.files, _run(((validate_file, f, args.encoding) for f in args.files), args.jobs)):
+        for problem in problems:
+            print("{0}: {1}".format(filename, problem))
+            status = 1
+    return status
+
+
+def command_convert(args):
+    """Convert files to UTF-8 GEDCOM or JSON Lines, depending on the extension of the output (``gedcompy convert``)."""
+    if len(args.files) < 2:
+        args.parser.error("give an input and an output file")
+    inputs, output = args.files[:-1], args.files[-1]
+    if os.path.isdir(output):
+        if args.to is None:
+            args.parser.error("give --to when converting into a directory")
+        extension = ".jsonl" if args.to == 'json' else ".ged"
+        outputs = [os.path.join(output, os.path.basename(_split_extension(f)[0]) + extension) for f in inputs]
+    elif len(inputs) > 1:
+        args.parser.error("the output must be a directory when converting more than one file")
+    else:
+        outputs = [output]
+    for fileout in outputs:
+        if os.path.exists(fileout) and not args.overwrite:
+            args.parser.error("{0} already exists, use --overwrite to replace it".format(fileout))
+    for _ in _run(((convert, f, fileout, args.to, args.encoding, args.overwrite) for f, fileout in zip(inputs, outputs)), args.jobs):
+        pass
+    return 0
+
+
+def command_split(args):
+    """Split each file into parts of a number of records or bytes (``gedcompy split``)."""
+    if not args.records and not args.size:
+        args.parser.error("give --records or --size")
+    for filenames in _run(((split, f, args.records, args.size, args.output_dir, args.encoding, args.overwrite) for f in args.files), args.jobs):
+        for filename in filenames:
+            print(filename)
+    return 0
+
+
+def command_extract(args):
+    """Write some people, with their ancestors and/or descendants, to a new file (``gedcompy extract``)."""
+    if os.path.exists(args.output) and not args.overwrite:
+        args.parser.error("{0} already exists, use --overwrite to replace it".format(args.output))
+    with open_input(args.input, args.encoding) as fp:
+        # Only the records that are extracted are fully parsed
+        gedcom_file = parse_fp(fp, lazy=True)
+    try:
+        extracted = gedcom_file.extract(args.ids, ancestors=args.ancestors, descendants=args.descendants, spouses=not args.no_spouses)
+    except KeyError as error:
+        args.parser.error("no individual {0} in {1}".format(error.args[0], args.input))
+    extracted.save(args.output, overwrite=args.overwrite)
+    return 0
+
+
+def make_parser():
+    """Return the :py:class:`argparse.ArgumentParser` for :py:func:`main`."""
+    parser = argparse.ArgumentParser(prog="gedcompy", description="Work with GEDCOM files.")
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+    subparsers.required = True
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--encoding", help="Python codec of the input files (default: from their header)")
+
+    jobs = argparse.ArgumentParser(add_help=False)
+    jobs.add_argument("-j", "--jobs", type=int, default=1, help="number of processes (default: %(default)s)")
+
+    overwrite = argparse.ArgumentParser(add_help=False)
+    overwrite.add_argument("--overwrite", action="store_true", help="replace output files that already exist")
+
+    stats = subparsers.add_parser("stats", parents=[common, jobs], help="count the records and elements in files")
+    stats.add_argument("files", nargs="+", metavar="file")
+    stats.set_defaults(function=command_stats)
+
+    validate = subparsers.add_parser("validate", parents=[common, jobs], help="check the references and levels in files (exits with 1 if there are problems)")
+    validate.add_argument("files", nargs="+", metavar="file")
+    validate.set_defaults(function=command_validate)
+
+    convert = subparsers.add_parser("convert", parents=[common, jobs, overwrite], help="convert files to UTF-8, or to or from JSON Lines")
+    convert.add_argument("--to", choices=["gedcom", "json"], help="output format (default: from the output file's extension)")
+    convert.add_argument("files", nargs="+", metavar="file", help="input files, then the output file (or directory, for many input files)")
+    convert.set_defaults(function=command_convert)
+
+    split = subparsers.add_parser("split", parents=[common, jobs, overwrite], help="split files into parts with a maximum number of records or size")
+    split.add_argument("--records", type=int, help="maximum records per part")
+    split.add_argument("--size", type=_parse_size, help="maximum size per part, e.g. 50M")
+    split.add_argument("--output-dir", help="directory for the parts (default: next to the input file)")
+    split.add_argument("files", nargs="+", metavar="file")
+    split.set_defaults(function=command_split)
+
+    extract = subparsers.add_parser("extract", parents=[common, overwrite], help="write some people, and their relatives, to a new file (in one process)")
+    extract.add_argument("--id", dest="ids", action="append", required=True, help="id of an individual to start from (e.g. @I1@), can be repeated")
+    extract.add_argument("--ancestors", type=_parse_generations, default=0, help="generations of ancestors to include, or 'all' (default: %(default)s)")
+    extract.add_argument("--descendants", type=_parse_generations, default=0, help="generations of descendants to include, or 'all' (default: %(default)s)")
+    extract.add_argument("--no-spouses", action="store_true", help="don't include the partners of everyone selected")
+    extract.add_argument("input")
+    extract.add_argument("output")
+    extract.set_defaults(function=command_extract)
+
+    for subparser in (stats, validate, convert, split, extract):
+        subparser.set_defaults(parser=subparser)
+    return parser
+
+
+def main(argv=None):
+    """Command line entry point, see ``gedcompy --help``."""
+    args = make_parser().parse_args(argv)
+    try:
+        return args.function(args)
+    except (EnvironmentError, ValueError, NotImplementedError) as error:
+        print("gedcompy: error: {0}".format(error), file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
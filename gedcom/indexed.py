@@ -0,0 +1,198 @@
+"""
+Random access to single records of big GEDCOM files, through an index file saved next to them.
+
+:py:func:`build_index` scans a file once, and writes (by default to
+``<filename>.idx``) the byte offset, length and tag of every record with an
+id. :py:class:`IndexedGedcomFile` loads that index (building it if it is
+missing or out of date), and reads and parses records only when they are
+looked up, so opening even a huge file is quick and uses little memory.
+
+    >>> from gedcom.indexed import IndexedGedcomFile
+    >>> with IndexedGedcomFile("huge.ged") as gedcomfile:
+    ...     print(gedcomfile['@I12345@'].name)
+
+The index is a text file: two header lines, then one tab separated
+``id, tag, offset, length`` line per record.
+
+Compressed files can't be indexed, because they can't be read from an
+offset without decompressing everything before it.
+"""
+import collections
+import os
+import threading
+
+from . import _compression, _decode_lines, _parse_elements, write_lines
+
+INDEX_HEADER = "# gedcompy index 1"
+
+#: Where a record is in the file.
+IndexEntry = collections.namedtuple('IndexEntry', ['tag', 'offset', 'length'])
+
+
+def default_index_filename(filename):
+    """Return the filename of the index for this GEDCOM file (``<filename>.idx``)."""
+    return filename + ".idx"
+
+
+def _stat_line(filename):
+    stat = os.stat(filename)
+    return "# size {0} mtime {1!r}".format(stat.st_size, stat.st_mtime)
+
+
+def scan(filename):
+    """
+    Iterate over the records with an id in this GEDCOM file, without parsing them.
+
+    :param str filename: GEDCOM file
+    :returns: iterator over ``(id, IndexEntry)``
+    :raises ValueError: if the file is compressed
+    """
+    if _compression(filename, 'r') is not None:
+        raise ValueError("Can't index compressed file {0}".format(filename))
+    with open(filename, 'rb') as fp:
+        offset = 0
+        current = None
+        for line in fp:
+            if line[:2] == b'0 ':
+                if current is not None:
+                    yield current[0], IndexEntry(current[1], current[2], offset - current[2])
+                parts = line.split(None, 3)
+                if len(parts) > 2 and parts[1][:1] == b'@':
+                    current = (parts[1].decode('ascii'), parts[2].decode('ascii'), offset)
+                else:
+                    current = None
+            offset += len(line)
+        if current is not None:
+            yield current[0], IndexEntry(current[1], current[2], offset - current[2])
+
+
+def build_index(filename, index_filename=None):
+    """
+    Scan this GEDCOM file, and save the index of its records.
+
+    :param str filename: GEDCOM file
+    :param str index_filename: *optional* file to write the index to (default :py:func:`default_index_filename`)
+    :returns: id to :py:data:`IndexEntry`
+    :rtype: dict
+    """
+    index_filename = index_filename or default_index_filename(filename)
+    stat_line = _stat_line(filename)
+    index = dict(scan(filename))
+
+    def lines():
+        yield INDEX_HEADER
+        yield stat_line
+        for record_id, entry in index.items():
+            yield u"{0}\t{1}\t{2}\t{3}".format(record_id, entry.tag, entry.offset, entry.length)
+
+    write_lines(lines(), index_filename, overwrite=True)
+    return index
+
+
+def load_index(filename, index_filename=None):
+    """
+    Load the index of this GEDCOM file.
+
+    :param str filename: GEDCOM file
+    :param str index_filename: *optional* file the index is in (default :py:func:`default_index_filename`)
+    :returns: id to :py:data:`IndexEntry`, or None if there is no index, or it is out of date
+    :rtype: dict
+    """
+    index_filename = index_filename or default_index_filename(filename)
+    if not os.path.exists(index_filename):
+        return None
+    with open(index_filename, 'r') as fp:
+        if fp.readline().rstrip("\n") != INDEX_HEADER or fp.readline().rstrip("\n") != _stat_line(filename):
+            return None
+        index = {}
+        for line in fp:
+            record_id, tag, offset, length = line.rstrip("\n").split("\t")
+            index[record_id] = IndexEntry(tag, int(offset), int(length))
+    return index
+
+
+class IndexedGedcomFile(object):
+
+    """
+    Read-only GEDCOM file, whose records are read from disk when they are looked up.
+
+    Lookups by id (``gedcomfile['@I1@']``) parse just that record. The
+    records' :py:attr:`gedcom.Element.gedcom_file` is this object, so
+    e.g. :py:attr:`gedcom.Individual.parents` work, reading the records they
+    need. Records aren't kept, looking one up twice reads it twice.
+    """
+
+    def __init__(self, filename, index_filename=None, build=True):
+        """
+        Open the file, and load its index.
+
+        :param str filename: GEDCOM file (uncompressed)
+        :param str index_filename: *optional* index file (default :py:func:`default_index_filename`)
+        :param bool build: Build (and save) the index if it is missing or out of date
+        :raises ValueError: if there is no up to date index, and `build` is False
+        """
+        self.filename = filename
+        self.index = load_index(filename, index_filename)
+        if self.index is None:
+            if not build:
+                raise ValueError("No up to date index for {0}".format(filename))
+            self.index = build_index(filename, index_filename)
+        self._fp = open(filename, 'rb')
+        self._lock = threading.Lock()
+
+    def close(self):
+        """Close the GEDCOM file."""
+        self._fp.close()
+
+    def __enter__(self):
+        """Use as a context manager, which closes the file at the end."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the file."""
+        self.close()
+
+    def __len__(self):
+        """Return the number of records with an id."""
+        return len(self.index)
+
+    def __contains__(self, key):
+        """Return True iff there is a record with this id/pointer."""
+        return key in self.index
+
+    def __iter__(self):
+        """Iterate over the ids of all records (in no particular order)."""
+        return iter(self.index)
+
+    def ids(self, tag):
+        """
+        Return the ids of all records with this tag.
+
+        :param str tag: Tag (e.g. 'INDI')
+        :rtype: list
+        """
+        return [record_id for record_id, entry in self.index.items() if entry.tag == tag]
+
+    def read(self, key):
+        """
+        Return the text of the record with this id/pointer, as it is in the file.
+
+        :param str key: id/pointer (e.g. '@I1@')
+        :rtype: bytes
+        :raises KeyError: if there is no record with this id
+        """
+        entry = self.index[key]
+        with self._lock:
+            self._fp.seek(entry.offset)
+            return self._fp.read(entry.length)
+
+    def __getitem__(self, key):
+        """
+        Read and return the record with this id/pointer.
+
+        :param str key: id/pointer (e.g. '@I1@')
+        :rtype: :py:class:`gedcom.Element` (or subclass)
+        :raises KeyError: if there is no record with this id
+        """
+        elements = list(_parse_elements(_decode_lines(self.read(key)), self))
+        return elements[0]
@@ -0,0 +1,176 @@
+"""
+Kinship, inbreeding and degree of relationship for many individuals at once.
+
+These use the tabular method on a topologically sorted pedigree. Everyone
+in the same generation is calculated together with NumPy matrix operations,
+using the kinship coefficients of the generations before:
+
+* kinship with earlier people: ``K[i, j] = (K[father(i), j] + K[mother(i), j]) / 2``
+* kinship with themselves: ``K[i, i] = (1 + K[father(i), mother(i)]) / 2``
+
+Only the requested individuals and their ancestors are included.
+
+NumPy is required (``pip install numpy``), and SciPy for ``sparse=True``.
+
+    >>> from gedcom import kinship
+    >>> ids, matrix = kinship.kinship_matrix(gedcomfile, ['@I1@', '@I3@'])
+"""
+from .pedigree import Pedigree
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    from scipy import sparse as scipy_sparse
+except ImportError:
+    scipy_sparse = None
+
+
+def _require_numpy():
+    if numpy is None:
+        raise ImportError("gedcom.kinship requires numpy, install it with 'pip install numpy'")
+
+
+def kinship_matrix(gedcom_file, individuals=None, sparse=False):
+    """
+    Calculate the kinship coefficients between these individuals.
+
+    The kinship coefficient of two people is the probability that an allele
+    picked at random from each is identical by descent: 0.5 for someone and
+    themselves (if not inbred), 0.25 for parent and child or full siblings,
+    0.0625 for first cousins.
+
+    :param gedcom_file: :py:class:`gedcom.GedcomFile`, or a :py:class:`gedcom.pedigree.Pedigree` already built from one
+    :param individuals: *optional* :py:class:`gedcom.Individual`'s or ids/pointers (default everyone)
+    :param bool sparse: Return a ``scipy.sparse.csr_matrix`` (calculated sparsely, for large, mostly unrelated, sets of people)
+    :returns: ``(ids, matrix)``, where row/column ``n`` of ``matrix`` is for ``ids[n]``
+    :rtype: tuple
+    :raises gedcom.pedigree.PedigreeCycleError: if someone is their own ancestor
+    :raises ImportError: if NumPy (or SciPy for sparse matrices) isn't installed
+    """
+    _require_numpy()
+    if sparse and scipy_sparse is None:
+        raise ImportError("Sparse kinship matrices require scipy, install it with 'pip install scipy'")
+    pedigree = gedcom_file if isinstance(gedcom_file, Pedigree) else Pedigree(gedcom_file)
+    wanted = list(range(len(pedigree))) if individuals is None else pedigree.to_indexes(individuals)
+
+    layers = pedigree.layers(pedigree.ancestors(wanted))
+    order = [num for layer in layers for num in layer]
+    position = dict((num, pos) for pos, num in enumerate(order))
+    first_parents = numpy.array([position.get(pedigree.parent_pairs[num][0], -1) for num in order], dtype=int)
+    second_parents = numpy.array([position.get(pedigree.parent_pairs[num][1], -1) for num in order], dtype=int)
+
+    calculate = _sparse_kinship if sparse else _dense_kinship
+    matrix = calculate([len(layer) for layer in layers], first_parents, second_parents)
+
+    selection = [position[num] for num in wanted]
+    if sparse:
+        matrix = matrix[selection][:, selection].tocsr()
+    else:
+        matrix = matrix[numpy.ix_(selection, selection)]
+    return [pedigree.ids[num] for num in wanted], matrix
+
+
+def _dense_kinship(layer_sizes, first_parents, second_parents):
+    """Return the kinship matrix (in topological order) as a NumPy array."""
+    size = len(first_parents)
+    kinship = numpy.zeros((size, size))
+    start = 0
+    for layer_size in layer_sizes:
+        end = start + layer_size
+        layer = numpy.arange(start, end)
+        first, second = first_parents[start:end], second_parents[start:end]
+
+        # Kinship with everyone before this generation
+        earlier = numpy.zeros((layer_size, start))
+        for parents in (first, second):
+            known = parents >= 0
+            earlier[known] += 0.5 * kinship[parents[known], :start]
+        kinship[start:end, :start] = earlier
+        kinship[:start, start:end] = earlier.T
+
+        # Kinship within this generation
+        within = numpy.zeros((layer_size, layer_size))
+        for parents in (first, second):
+            known = parents >= 0
+            within[:, known] += 0.5 * earlier[:, parents[known]]
+        both = (first >= 0) & (second >= 0)
+        inbreeding = numpy.zeros(layer_size)
+        inbreeding[both] = kinship[first[both], second[both]]
+        within[layer - start, layer - start] = 0.5 * (1 + inbreeding)
+        kinship[start:end, start:end] = within
+
+        start = end
+    return kinship
+
+
+def _sparse_kinship(layer_sizes, first_parents, second_parents):
+    """Return the kinship matrix (in topological order) as a SciPy sparse matrix."""
+    kinship = scipy_sparse.csr_matrix((0, 0))
+    start = 0
+    for layer_size in layer_sizes:
+        end = start + layer_size
+        first, second = first_parents[start:end], second_parents[start:end]
+
+        # Row n of this matrix has 0.5 in the columns of person n's parents
+        rows, columns = [], []
+        for parents in (first, second):
+            known = numpy.nonzero(parents >= 0)[0]
+            rows.append(known)
+            columns.append(parents[known])
+        rows, columns = numpy.concatenate(rows), numpy.concatenate(columns)
+        parent_matrix = scipy_sparse.csr_matrix((numpy.full(len(rows), 0.5), (rows, columns)), shape=(layer_size, start))
+
+        earlier = parent_matrix.dot(kinship).tocsr()
+        within = earlier.dot(parent_matrix.T).tolil()
+        both = (first >= 0) & (second >= 0)
+        inbreeding = numpy.zeros(layer_size)
+        if both.any():
+            inbreeding[both] = numpy.asarray(kinship[first[both], second[both]]).ravel()
+        within.setdiag(0.5 * (1 + inbreeding))
+
+        if start == 0:
+            kinship = within.tocsr()
+        else:
+            kinship = scipy_sparse.bmat([[kinship, earlier.T], [earlier, within]], format='csr')
+        start = end
+    return kinship
+
+
+def inbreeding_coefficients(gedcom_file, individuals=None, sparse=False):
+    """
+    Calculate the inbreeding coefficient (the kinship of their parents) of these individuals.
+
+    :param gedcom_file: :py:class:`gedcom.GedcomFile` or :py:class:`gedcom.pedigree.Pedigree`
+    :param individuals: *optional* :py:class:`gedcom.Individual`'s or ids/pointers (default everyone)
+    :param bool sparse: Calculate with sparse matrices, see :py:func:`kinship_matrix`
+    :returns: id/pointer to inbreeding coefficient
+    :rtype: dict
+    """
+    ids, matrix = kinship_matrix(gedcom_file, individuals, sparse=sparse)
+    diagonal = matrix.diagonal()
+    return dict((person_id, 2 * float(diagonal[num]) - 1) for num, person_id in enumerate(ids))
+
+
+def relationship_degrees(matrix):
+    """
+    Convert a kinship matrix to degrees of relationship.
+
+    The degree is ``-log2(2 * kinship)``, rounded: 0 for someone and
+    themselves, 1 for parents, children and full siblings, 2 for
+    grandparents or half siblings, 3 for first cousins, and so on.
+    Unrelated people get ``-1``.
+
+    :param matrix: kinship matrix from :py:func:`kinship_matrix`
+    :returns: integer NumPy array of the same shape (dense, even if `matrix` is sparse)
+    """
+    _require_numpy()
+    if scipy_sparse is not None and scipy_sparse.issparse(matrix):
+        matrix = matrix.toarray()
+    degrees = numpy.full(matrix.shape, -1, dtype=int)
+    related = matrix > 0
+    degrees[related] = numpy.rint(-numpy.log2(2 * matrix[related]))
+    numpy.fill_diagonal(degrees, 0)
+    return degrees
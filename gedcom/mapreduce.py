@@ -0,0 +1,187 @@
+"""
+Calculate statistics over the records of a GEDCOM file in parallel, with several processes.
+
+:py:func:`map_reduce` reads the file as text, one record at a time, and
+sends batches of records to a pool of worker processes. Each worker parses
+its records, calls the `mapper` on each, and combines the results with the
+`reducer`; the partial results of the batches are then combined, in file
+order, in the main process. Parsing (the slowest part) is thus spread over
+all workers, and the file is never loaded as a whole.
+
+    >>> from gedcom import mapreduce
+    >>> mapreduce.surname_frequency("huge.ged", workers=8).most_common(3)
+    [('Smith', 10412), ('Jones', 8320), ('Cox', 7201)]
+
+Mappers and reducers are sent to the worker processes, so they must be
+functions defined at module level (not lambdas or nested functions).
+The built-in statistics map each record to a :py:class:`collections.Counter`
+and add them up with :py:func:`merge_counts`.
+"""
+import collections
+import multiprocessing
+
+import six
+
+from . import FAMILY_EVENT_TAGS, INDIVIDUAL_EVENT_TAGS, _decode_lines, _is_filename, iter_records, open_compressed
+from .pipelines import year_format
+
+
+def _record_chunks(source, batch_size):
+    """Iterate over the text of batches of `batch_size` records of this file, as bytes (from files) or strings."""
+    if isinstance(source, six.string_types) and _is_filename(source):
+        with open_compressed(source, 'rb') as fp:
+            for chunk in _record_chunks(fp, batch_size):
+                yield chunk
+        return
+
+    lines = source.split("\n") if isinstance(source, six.string_types) else source
+    batch = []
+    records = 0
+    for line in lines:
+        if line[:2] in ('0 ', b'0 '):
+            records += 1
+            if records > batch_size:
+                yield _join(batch)
+                batch, records = [], 1
+        batch.append(line)
+    if batch:
+        yield _join(batch)
+
+
+def _join(lines):
+    if isinstance(lines[0], six.binary_type):
+        return b"".join(line if line.endswith(b"\n") else line + b"\n" for line in lines)
+    return "\n".join(line.rstrip("\n") for line in lines)
+
+
+def _map_chunk(chunk, mapper, reducer):
+    """Parse the records in this chunk, and return ``(True, reduced result)``, or ``(False, None)`` if the mapper returned None for all of them."""
+    lines = _decode_lines(chunk) if isinstance(chunk, six.binary_type) else chunk.split("\n")
+    found, result = False, None
+    for record in iter_records(lines):
+        value = mapper(record)
+        if value is None:
+            continue
+        result = reducer(result, value) if found else value
+        found = True
+    return found, result
+
+
+def map_reduce(source, mapper, reducer, workers=None, batch_size=1000):
+    """
+    Call `mapper` on every record of this file, and combine the results with `reducer`.
+
+    :param source: filename (which may be compressed), open file-like object or string contents of a GEDCOM file
+    :param mapper: function called with each record (level 0 element, not in a :py:class:`gedcom.GedcomFile`), returning a value, or None to skip the record
+    :param reducer: function called with two values, returning their combination; it must be associative, and may change and return its first argument
+    :param int workers: Number of worker processes (default: number of CPUs), 0 to do everything in this process
+    :param int batch_size: Number of records sent to a worker at a time
+    :returns: the combination of the values for all records, or None if there were none
+    """
+    found, result = False, None
+
+    def combine(partial):
+        part_found, value = partial
+        if part_found:
+            return True, reducer(result, value) if found else value
+        return found, result
+
+    chunks = _record_chunks(source, batch_size)
+    if workers == 0:
+        for chunk in chunks:
+            found, result = combine(_map_chunk(chunk, mapper, reducer))
+        return result
+
+    workers = workers or multiprocessing.cpu_count()
+    pool = multiprocessing.Pool(workers)
+    try:
+        # Only keep a few batches per worker in flight, so memory use doesn't depend on the file size
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(_map_chunk, (chunk, mapper, reducer)))
+            if len(pending) >= 2 * workers:
+                found, result = combine(pending.popleft().get())
+        while pending:
+            found, result = combine(pending.popleft().get())
+    finally:
+        pool.terminate()
+        pool.join()
+    return result
+
+
+def merge_counts(counts, other_counts):
+    """Reducer that adds `other_counts` to `counts` (both :py:class:`collections.Counter`), and returns it."""
+    counts.update(other_counts)
+    return counts
+
+
+def surnames(record):
+    """Mapper for :py:func:`surname_frequency`: count the surname of the (preferred) name of individuals."""
+    if record.tag != 'INDI' or 'NAME' not in record:
+        return None
+    try:
+        surname = record.name[1]
+    except Exception:
+        return None
+    return collections.Counter([surname]) if surname else None
+
+
+def event_decades(record):
+    """Mapper for :py:func:`events_per_decade`: count the events of individuals and families by ``(tag, decade)``, from the last year in their dates."""
+    event_tags = INDIVIDUAL_EVENT_TAGS if record.tag == 'INDI' else FAMILY_EVENT_TAGS if record.tag == 'FAM' else ()
+    counts = collections.Counter()
+    for event in record.child_elements:
+        if event.tag not in event_tags:
+            continue
+        for date in event.child_elements:
+            if date.tag == 'DATE':
+                years = year_format.findall(date.value or '')
+                if years:
+                    counts[(event.tag, int(years[-1]) // 10 * 10)] += 1
+                break
+    return counts or None
+
+
+def tags(record):
+    """Mapper for :py:func:`tag_histogram`: count the tags of all elements."""
+    counts = collections.Counter()
+    stack = [record]
+    while stack:
+        element = stack.pop()
+        counts[element.tag] += 1
+        stack.extend(element.child_elements)
+    return counts
+
+
+def surname_frequency(source, workers=None):
+    """
+    Count how many individuals have each surname.
+
+    :param source: as for :py:func:`map_reduce`
+    :param int workers: as for :py:func:`map_reduce`
+    :rtype: :py:class:`collections.Counter`
+    """
+    return map_reduce(source, surnames, merge_counts, workers=workers) or collections.Counter()
+
+
+def events_per_decade(source, workers=None):
+    """
+    Count the events (births, marriages, etc.) per decade.
+
+    :param source: as for :py:func:`map_reduce`
+    :param int workers: as for :py:func:`map_reduce`
+    :returns: ``(tag, decade)`` (e.g. ``('BIRT', 1890)``) to number of events
+    :rtype: :py:class:`collections.Counter`
+    """
+    return map_reduce(source, event_decades, merge_counts, workers=workers) or collections.Counter()
+
+
+def tag_histogram(source, workers=None):
+    """
+    Count how often each tag is used, at any level.
+
+    :param source: as for :py:func:`map_reduce`
+    :param int workers: as for :py:func:`map_reduce`
+    :rtype: :py:class:`collections.Counter`
+    """
+    return map_reduce(source, tags, merge_counts, workers=workers) or collections.Counter()
@@ -0,0 +1,93 @@
+"""
+Combine many GEDCOM files into one, renaming ids that are used in more than one.
+
+:py:func:`merge` streams the records of each file in turn (with
+:py:func:`gedcom.iter_records`) straight to the output, so only the id
+mapping of the current file, and the set of ids already written, are kept
+in memory.
+
+    >>> import gedcom
+    >>> renamed = gedcom.merge(["smith.ged", "jones.ged"], "all.ged")
+    >>> renamed[1]['@I1@']
+    '@I4@'
+"""
+import re
+
+from . import GedcomFile, _iter_source_records, pointer_format, write_lines
+
+id_format = re.compile("^@(.*?)[0-9]*@$")
+
+
+class _IdMapper(object):
+
+    """Gives every id/pointer in a file an id that isn't used by the other files."""
+
+    def __init__(self):
+        self.used = set()
+        self.next_numbers = {}
+
+    def new_mapping(self):
+        """Start a new file, return its (empty) mapping of old to new ids."""
+        self.mapping = {}
+        return self.mapping
+
+    def __call__(self, old_id):
+        """Return the new id for `old_id` in the current file."""
+        new_id = self.mapping.get(old_id)
+        if new_id is None:
+            new_id = old_id
+            if new_id in self.used:
+                prefix = id_format.match(old_id).group(1)
+                number = self.next_numbers.get(prefix, 1)
+                while new_id in self.used:
+                    new_id = "@{0}{1}@".format(prefix, number)
+                    number += 1
+                self.next_numbers[prefix] = number
+            self.used.add(new_id)
+            self.mapping[old_id] = new_id
+        return new_id
+
+
+def _merged_lines(sources, mapper, mappings):
+    for line in GedcomFile().header_element().gedcom_lines():
+        yield line
+
+    for source in sources:
+        mapping = mapper.new_mapping()
+        for record in _iter_source_records(source):
+            if record.tag in ('HEAD', 'TRLR'):
+                continue
+            stack = [(record, 0)]
+            while stack:
+                element, level = stack.pop()
+                value = element.value
+                if value and value[0] == '@' and pointer_format.match(value):
+                    value = mapper(value)
+                yield u"{level}{id} {tag}{value}".format(
+                    level=level, id=(" " + mapper(element.id) if element.id else ""), tag=element.tag, value=(" " + value if value else ""))
+                stack.extend((child, level + 1) for child in reversed(element.child_elements))
+        mappings.append(dict((old, new) for old, new in mapping.items() if old != new))
+
+    yield u"0 TRLR"
+
+
+def merge(sources, fileout, overwrite=False):
+    """
+    Write all records of these GEDCOM files to one file, giving records new ids where needed.
+
+    An id is kept unless an earlier file already used it, in which case it
+    gets the next free id with the same prefix (e.g. ``@I1@`` becomes
+    ``@I4@``), and all pointers to it in that file are changed too. Every
+    value that looks like a pointer is remapped, at any level. The headers
+    (HEAD) of the files are replaced by one new one.
+
+    :param sources: iterable of filenames, open file-like objects, GEDCOM strings, :py:class:`gedcom.GedcomFile`'s or iterables of records
+    :param fileout: Filename or open (binary) file-like object
+    :param bool overwrite: Whether to replace `fileout` if it already exists
+    :returns: for each source, a dict of the ids that were changed (old id to new id)
+    :rtype: list of dicts
+    :raises Exception: if the filename exists, and `overwrite` is False
+    """
+    mappings = []
+    write_lines(_merged_lines(sources, _IdMapper(), mappings), fileout, overwrite=overwrite)
+    return mappings
@@ -0,0 +1,123 @@
+"""
+Convert GEDCOM records to and from JSON Lines (newline delimited JSON).
+
+Each record (level 0 element) is one line, holding a nested dict::
+
+    {"tag": "INDI", "id": "@I1@", "children": [{"tag": "NAME", "value": "Robert /Cox/"}, ...]}
+
+``id``, ``value`` and ``children`` are left out when empty. Both directions
+stream one record at a time, and loading builds the :py:class:`gedcom.Element`
+trees directly, without going through GEDCOM text.
+
+    >>> from gedcom import ndjson
+    >>> ndjson.dump("tree.ged", "tree.jsonl")
+    >>> gedcomfile = ndjson.load("tree.jsonl")
+"""
+import json
+
+import six
+
+from . import GedcomFile, _iter_source_records, class_for_tag, open_compressed, write_lines
+
+
+def record_to_dict(element):
+    """
+    Return this element (and its descendants) as a nested dict.
+
+    :param Element element: Element to convert
+    :rtype: dict
+    """
+    def to_dict(element):
+        result = {'tag': element.tag}
+        if element.id:
+            result['id'] = element.id
+        if element.value:
+            result['value'] = element.value
+        return result
+
+    root = to_dict(element)
+    stack = [(element, root)]
+    while stack:
+        element, result = stack.pop()
+        if element.child_elements:
+            children = result['children'] = [to_dict(child) for child in element.child_elements]
+            stack.extend(zip(element.child_elements, children))
+    return root
+
+
+def dict_to_record(data, gedcom_file=None):
+    """
+    Return an Element (or subclass, based on the tag) tree for a dict from :py:func:`record_to_dict`.
+
+    :param dict data: Nested dict
+    :param GedcomFile gedcom_file: File the elements will be in
+    :rtype: Element
+    """
+    root = class_for_tag(data['tag'])(level=0, tag=data['tag'], value=data.get('value'), id=data.get('id'), gedcom_file=gedcom_file)
+    stack = [(data, root)]
+    while stack:
+        data, element = stack.pop()
+        for child_data in data.get('children', ()):
+            child = class_for_tag(child_data['tag'])(
+                level=element.level + 1, tag=child_data['tag'], value=child_data.get('value'), id=child_data.get('id'), parent_id=element.id, gedcom_file=gedcom_file)
+            child.parent_element = element
+            element.child_elements.append(child)
+            stack.append((child_data, child))
+    return root
+
+
+def iter_dump(source):
+    """
+    Iterate over the JSON lines (without line endings) for these records.
+
+    :param source: :py:class:`gedcom.GedcomFile`, iterable of records (e.g. a :py:class:`gedcom.Pipeline`), or GEDCOM filename/file-like object/string to stream
+    :rtype: iterator over string
+    """
+    for record in _iter_source_records(source):
+        yield json.dumps(record_to_dict(record), ensure_ascii=False, separators=(',', ':'))
+
+
+def dump(source, fileout, overwrite=False):
+    """
+    Write these records as JSON Lines to this filename or (binary) file-like object.
+
+    :param source: as for :py:func:`iter_dump`
+    :param fileout: Filename or open (binary) file-like object
+    :param bool overwrite: Whether to replace `fileout` if it already exists
+    :raises Exception: if the filename exists, and `overwrite` is False
+    """
+    write_lines(iter_dump(source), fileout, overwrite=overwrite)
+
+
+def iter_load(obj, gedcom_file=None):
+    """
+    Iterate over the records in this JSON Lines file, one at a time.
+
+    :param obj: filename (which may be compressed, see :py:func:`gedcom.open_compressed`), or open file-like object (text or binary)
+    :param GedcomFile gedcom_file: File the elements will be in (they aren't added to it, see :py:func:`load` for that)
+    :rtype: iterator over Element (or subclasses)
+    """
+    if isinstance(obj, six.string_types):
+        with open_compressed(obj, 'rb') as fp:
+            for record in iter_load(fp, gedcom_file):
+                yield record
+        return
+
+    for line in obj:
+        if isinstance(line, six.binary_type):
+            line = line.decode('utf8')
+        if line.strip():
+            yield dict_to_record(json.loads(line), gedcom_file)
+
+
+def load(obj):
+    """
+    Load a JSON Lines file into a new :py:class:`gedcom.GedcomFile`.
+
+    :param obj: filename, or open file-like object (text or binary)
+    :rtype: :py:class:`gedcom.GedcomFile`
+    """
+    gedcom_file = GedcomFile()
+    for record in iter_load(obj, gedcom_file):
+        gedcom_file.add_element(record)
+    return gedcom_file
@@ -0,0 +1,302 @@
+"""
+Parent/child graph of the individuals in a GEDCOM file.
+
+A :py:class:`Pedigree` is built once from the FAMC links of every individual
+(the same links :py:attr:`gedcom.Individual.parents` uses), and stores people
+as integer indexes, so that whole-file calculations don't need to look up
+families and pointers for every person again and again.
+"""
+import collections
+
+import six
+
+
+class PedigreeCycleError(ValueError):
+
+    """Raised when someone is (through bad FAMC/FAMS data) their own ancestor."""
+
+    def __init__(self, ids):
+        """
+        Create the exception.
+
+        :param list ids: ids/pointers of the individuals that are on, or descend from, a cycle
+        """
+        super(PedigreeCycleError, self).__init__("Individuals are their own ancestors: {0}".format(", ".join(ids[:10]) + (", ..." if len(ids) > 10 else "")))
+        self.ids = ids
+
+
+def _parent_pair(husbands, wives):
+    """Return ``(HUSB, WIFE)`` numbers for a family, filling an empty slot with a second partner of the same sex."""
+    if husbands and wives:
+        return husbands[0], wives[0]
+    elif husbands:
+        return husbands[0], (husbands[1] if len(husbands) > 1 else -1)
+    elif wives:
+        return (wives[1] if len(wives) > 1 else -1), wives[0]
+    else:
+        return -1, -1
+
+
+class Pedigree(object):
+
+    """
+    Parent/child graph of all individuals in a :py:class:`gedcom.GedcomFile`.
+
+    Individuals are numbered in file order. :py:attr:`ids` maps number to
+    id/pointer, :py:attr:`index` the other way. :py:attr:`parents` and
+    :py:attr:`children` are lists of numbers for each person, in file order.
+    :py:attr:`parent_pairs` holds the ``(HUSB, WIFE)`` of each person's
+    first FAMC family (``-1`` if unknown), for calculations that need exactly
+    two parents.
+    """
+
+    def __init__(self, gedcom_file):
+        """
+        Build the graph for this file.
+
+        :param GedcomFile gedcom_file: File to read the individuals and families from
+        """
+        individuals = list(gedcom_file.individuals)
+        self.ids = [person.id for person in individuals]
+        self.index = dict((person_id, num) for num, person_id in enumerate(self.ids))
+        self.parents = [[] for _ in individuals]
+        self.children = [[] for _ in individuals]
+        self.parent_pairs = [(-1, -1)] * len(individuals)
+
+        family_partners = {}
+        for num, person in enumerate(individuals):
+            for famc in person.child_elements:
+                if famc.tag != 'FAMC':
+                    continue
+                if famc.value not in family_partners:
+                    family = gedcom_file.pointers.get(famc.value)
+                    husbands = [] if family is None else [self.index[p.value] for p in family.get_list('HUSB') if p.value in self.index]
+                    wives = [] if family is None else [self.index[p.value] for p in family.get_list('WIFE') if p.value in self.index]
+                    family_partners[famc.value] = (husbands + wives, _parent_pair(husbands, wives))
+                partners, parent_pair = family_partners[famc.value]
+                if self.parent_pairs[num] == (-1, -1):
+                    self.parent_pairs[num] = parent_pair
+                for parent in partners:
+                    if parent not in self.parents[num]:
+                        self.parents[num].append(parent)
+                        self.children[parent].append(num)
+
+    def __len__(self):
+        """Return the number of individuals."""
+        return len(self.ids)
+
+    def to_indexes(self, individuals):
+        """
+        Return the numbers for these individuals.
+
+        :param individuals: iterable of :py:class:`gedcom.Individual`'s or ids/pointers
+        :rtype: list of int
+        :raises KeyError: if an individual isn't in this pedigree
+        """
+        return [self.index[i if isinstance(i, six.string_types) else i.id] for i in individuals]
+
+    def ancestors(self, indexes, include_self=True):
+        """
+        Return the numbers of all ancestors of these people.
+
+        :param indexes: numbers of the people to start from
+        :param bool include_self: Whether to include `indexes` themselves
+        :rtype: set of int
+        """
+        result = set(indexes) if include_self else set()
+        stack = list(indexes)
+        while stack:
+            for parent in self.parents[stack.pop()]:
+                if parent not in result:
+                    result.add(parent)
+                    stack.append(parent)
+        return result
+
+    def descendants(self, indexes, include_self=True):
+        """
+        Return the numbers of all descendants of these people.
+
+        :param indexes: numbers of the people to start from
+        :param bool include_self: Whether to include `indexes` themselves
+        :rtype: set of int
+        """
+        result = set(indexes) if include_self else set()
+        stack = list(indexes)
+        while stack:
+            for child in self.children[stack.pop()]:
+                if child not in result:
+                    result.add(child)
+                    stack.append(child)
+        return result
+
+    def layers(self, indexes=None):
+        """
+        Return people in topological order (parents before children), grouped by generation.
+
+        Layer 0 holds everyone without known parents, layer ``n`` everyone
+        whose parents are all in earlier layers, and at least one in layer
+        ``n - 1``. This is Kahn's algorithm, so it runs in linear time.
+
+        :param indexes: *optional* numbers of the people to sort (default everyone); parents outside this set are ignored
+        :rtype: list of lists of int
+        :raises PedigreeCycleError: if someone is their own ancestor
+        """
+        members = range(len(self)) if indexes is None else indexes
+        member_set = None if indexes is None else set(indexes)
+        missing_parents = collections.Counter()
+        for num in members:
+            missing_parents[num] = len(self.parents[num]) if member_set is None else sum(1 for p in self.parents[num] if p in member_set)
+
+        layer = [num for num in members if missing_parents[num] == 0]
+        result = []
+        done = 0
+        while layer:
+            result.append(layer)
+            done += len(layer)
+            next_layer = []
+            for num in layer:
+                for child in self.children[num]:
+                    if member_set is not None and child not in member_set:
+                        continue
+                    missing_parents[child] -= 1
+                    if missing_parents[child] == 0:
+                        next_layer.append(child)
+            layer = next_layer
+
+        if done != len(missing_parents):
+            raise PedigreeCycleError([self.ids[num] for num in members if missing_parents[num] > 0])
+        return result
+
+    def cycles(self):
+        """
+        Return the groups of people who are their own ancestors.
+
+        Each group is a strongly connected component of the parent graph with
+        more than one person (or someone who is their own parent), found with
+        Tarjan's algorithm in linear time. People who merely descend from a
+        cycle aren't included.
+
+        :returns: list of lists of ids/pointers, in file order
+        :rtype: list
+        """
+        order = [-1] * len(self)
+        lowlink = [0] * len(self)
+        on_stack = [False] * len(self)
+        stack = []
+        result = []
+        counter = 0
+        for root in range(len(self)):
+            if order[root] != -1:
+                continue
+            work = [(root, 0)]
+            while work:
+                num, position = work[-1]
+                if position == 0:
+                    order[num] = lowlink[num] = counter
+                    counter += 1
+                    stack.append(num)
+                    on_stack[num] = True
+                if position < len(self.parents[num]):
+                    work[-1] = (num, position + 1)
+                    parent = self.parents[num][position]
+                    if order[parent] == -1:
+                        work.append((parent, 0))
+                    elif on_stack[parent]:
+                        lowlink[num] = min(lowlink[num], order[parent])
+                    continue
+
+                work.pop()
+                if work:
+                    caller = work[-1][0]
+                    lowlink[caller] = min(lowlink[caller], lowlink[num])
+                if lowlink[num] == order[num]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == num:
+                            break
+                    if len(component) > 1 or num in self.parents[num]:
+                        result.append([self.ids[member] for member in sorted(component)])
+        result.sort(key=lambda ids: self.index[ids[0]])
+        return result
+
+    def generations(self, ignore_cycles=False):
+        """
+        Return the generation depth of everyone: 0 for people without known parents, otherwise one more than their deepest parent.
+
+        :param bool ignore_cycles: Leave out people on, or descended from, a cycle (see :py:meth:`cycles`), instead of raising an exception
+        :returns: id/pointer to generation depth
+        :rtype: dict
+        :raises PedigreeCycleError: if someone is their own ancestor, and `ignore_cycles` is False
+        """
+        if ignore_cycles:
+            on_cycles = [self.index[person_id] for cycle in self.cycles() for person_id in cycle]
+            bad = self.descendants(on_cycles)
+            layers = self.layers([num for num in range(len(self)) if num not in bad]) if bad else self.layers()
+        else:
+            layers = self.layers()
+        return dict((self.ids[num], depth) for depth, layer in enumerate(layers) for num in layer)
+
+    def ahnentafel(self, individual, generations=None):
+        """
+        Return the Ahnentafel numbers of this person's ancestors.
+
+        The person is 1, the father (HUSB) of person ``n`` is ``2n`` and the
+        mother (WIFE) is ``2n + 1``, following each person's first FAMC
+        family. Because of pedigree collapse, someone can have several numbers.
+
+        :param individual: :py:class:`gedcom.Individual` or id/pointer
+        :param int generations: Number of generations of ancestors to include, None for all
+        :returns: number to id/pointer, in increasing order of number
+        :rtype: collections.OrderedDict
+        :raises PedigreeCycleError: if `generations` is None, and this person has an ancestor who is their own ancestor
+        """
+        root = self.to_indexes([individual])[0]
+        if generations is None:
+            self.layers(self.ancestors([root]))
+        result = collections.OrderedDict()
+        current = [(1, root)]
+        generation = 0
+        while current:
+            next_generation = []
+            for number, num in current:
+                result[number] = self.ids[num]
+                if generations is None or generation < generations:
+                    father, mother = self.parent_pairs[num]
+                    if father != -1:
+                        next_generation.append((2 * number, father))
+                    if mother != -1:
+                        next_generation.append((2 * number + 1, mother))
+            current = next_generation
+            generation += 1
+        return result
+
+    def daboville(self, individual, generations=None):
+        """
+        Return the d'Aboville numbers of this person's descendants.
+
+        The person is ``"1"``, their children ``"1.1"``, ``"1.2"``, etc. (in
+        file order), grandchildren ``"1.1.1"`` and so on. Someone descended
+        by several lines has several numbers.
+
+        :param individual: :py:class:`gedcom.Individual` or id/pointer
+        :param int generations: Number of generations of descendants to include, None for all
+        :returns: number to id/pointer, in outline (depth first) order
+        :rtype: collections.OrderedDict
+        :raises PedigreeCycleError: if `generations` is None, and this person has a descendant who is their own ancestor
+        """
+        root = self.to_indexes([individual])[0]
+        if generations is None:
+            self.layers(self.descendants([root]))
+        result = collections.OrderedDict()
+        stack = [("1", root, 0)]
+        while stack:
+            number, num, generation = stack.pop()
+            result[number] = self.ids[num]
+            if generations is None or generation < generations:
+                children = self.children[num]
+                for position in range(len(children), 0, -1):
+                    stack.append(("{0}.{1}".format(number, position), children[position - 1], generation + 1))
+        return result
@@ -0,0 +1,228 @@
+"""
+Streaming transformations of GEDCOM files: read records, filter/map them, and write them out.
+
+Records are read one at a time with :py:func:`gedcom.iter_records`, passed
+through each stage in turn, and written out straight away, so files of any
+size can be transformed in constant memory.
+
+    >>> import gedcom
+    >>> from gedcom.pipelines import redact_living, drop_tags
+    >>> gedcom.pipeline("in.ged").map(redact_living()).map(drop_tags('OBJE')).write("out.ged")
+
+A filter stage is a function that is called with each record (level 0
+element) and returns True to keep it. A map stage returns the (possibly
+changed) record, a new record, or None to drop it.
+"""
+import datetime
+import re
+
+from . import Element, iter_records, write_lines, _element_lines
+
+year_format = re.compile(r"\b([0-9]{3,4})\b")
+
+#: Tags that show someone has died
+DEATH_TAGS = ('DEAT', 'BURI', 'CREM')
+
+#: Tags that show when someone was born, in order of preference
+BIRTH_TAGS = ('BIRT', 'CHR', 'BAPM')
+
+
+class Pipeline(object):
+
+    """
+    A GEDCOM source and a list of stages to apply to its records, see :py:func:`pipeline`.
+
+    :py:meth:`filter` and :py:meth:`map` return a new pipeline with one more
+    stage, so pipelines can be built up and reused. Nothing is read until
+    the pipeline is iterated over or written.
+    """
+
+    def __init__(self, source, stages=()):
+        """
+        Create a pipeline.
+
+        :param source: filename, open file-like object or string contents of a GEDCOM file
+        :param stages: sequence of ``('filter', function)`` or ``('map', function)`` tuples
+        """
+        self.source = source
+        self.stages = tuple(stages)
+
+    def filter(self, predicate):
+        """
+        Return a new pipeline that only keeps records for which `predicate` returns True.
+
+        :param predicate: function called with each record
+        :rtype: :py:class:`Pipeline`
+        """
+        return Pipeline(self.source, self.stages + (('filter', predicate),))
+
+    def map(self, function):
+        """
+        Return a new pipeline that replaces every record with ``function(record)``, dropping it if that is None.
+
+        :param function: function called with each record
+        :rtype: :py:class:`Pipeline`
+        """
+        return Pipeline(self.source, self.stages + (('map', function),))
+
+    def __iter__(self):
+        """Iterate over the records that come out of the last stage."""
+        for record in iter_records(self.source):
+            for kind, function in self.stages:
+                if kind == 'filter':
+                    if not function(record):
+                        record = None
+                else:
+                    record = function(record)
+                if record is None:
+                    break
+            else:
+                yield record
+
+    def lines(self):
+        """
+        Iterate over the lines of the resulting GEDCOM file.
+
+        Levels are recalculated, so stages don't need to set levels of elements they add.
+
+        :rtype: iterator over string
+        """
+        return _element_lines(self)
+
+    def write(self, fileout, overwrite=False):
+        """
+        Run the pipeline, and write the result to this filename or file-like object.
+
+        :param fileout: Filename or open (binary) file-like object
+        :param bool overwrite: Whether to replace `fileout` if it exists, this is safe even if it is the source file (see :py:func:`gedcom.write_lines`)
+        :raises Exception: if the filename exists, and `overwrite` is False
+        """
+        write_lines(self.lines(), fileout, overwrite=overwrite)
+
+
+def pipeline(source):
+    """
+    Return a :py:class:`Pipeline` that streams the records of this GEDCOM file.
+
+    :param source: filename, open file-like object or string contents of a GEDCOM file
+    :rtype: :py:class:`Pipeline`
+    """
+    return Pipeline(source)
+
+
+def _walk(element):
+    """Iterate over this element and all its descendants."""
+    stack = [element]
+    while stack:
+        element = stack.pop()
+        yield element
+        stack.extend(element.child_elements)
+
+
+def drop_tags(*tags):
+    """
+    Return a map stage that removes all elements with these tags, at any level.
+
+    Records with one of these tags are dropped completely.
+
+    :param str tags: Tags to remove (e.g. 'OBJE', '_UID')
+    """
+    tags = frozenset(tags)
+
+    def stage(record):
+        if record.tag in tags:
+            return None
+        for element in _walk(record):
+            element.child_elements = [c for c in element.child_elements if c.tag not in tags]
+        return record
+    return stage
+
+
+def rewrite_values(tag, replacement):
+    """
+    Return a map stage that changes the value of all elements with this tag, at any level.
+
+    :param str tag: Tag of elements to change (e.g. 'PLAC')
+    :param replacement: dict of old value to new value (values not in it are unchanged), or function that is called with the old value and returns the new one
+    """
+    if isinstance(replacement, dict):
+        mapping = replacement
+
+        def replacement(value):
+            return mapping.get(value, value)
+
+    def stage(record):
+        for element in _walk(record):
+            if element.tag == tag:
+                element.value = replacement(element.value)
+        return record
+    return stage
+
+
+def birth_year(individual):
+    """
+    Return the year this person was born (or christened/baptised), from the first date with a year in it.
+
+    :param Element individual: INDI record
+    :returns: year, or None if not known
+    :rtype: int
+    """
+    for tag in BIRTH_TAGS:
+        for event in individual.get_list(tag):
+            for date in event.get_list('DATE'):
+                years = year_format.findall(date.value or '')
+                if years:
+                    return int(years[-1])
+    return None
+
+
+def is_living(individual, years=100, this_year=None):
+    """
+    Guess whether this person is alive.
+
+    Someone is presumed alive if they have no death (or burial/cremation)
+    event, and were born less than `years` ago or have no known birth year.
+
+    :param Element individual: INDI record
+    :param int years: Maximum age people are presumed to live to
+    :param int this_year: Current year (default: today's year)
+    :rtype: bool
+    """
+    if any(tag in individual for tag in DEATH_TAGS):
+        return False
+    born = birth_year(individual)
+    if this_year is None:
+        this_year = datetime.date.today().year
+    return born is None or born > this_year - years
+
+
+def redact_living(years=100, name="Living", keep_tags=('SEX', 'FAMC', 'FAMS'), keep_surname=True):
+    """
+    Return a map stage that removes all details of living individuals (see :py:func:`is_living`).
+
+    Their names are replaced with `name` (and their surname, if
+    `keep_surname`), and only the child elements with `keep_tags` are kept,
+    so family links stay intact.
+
+    :param int years: Maximum age people are presumed to live to
+    :param str name: Replacement first name
+    :param keep_tags: Tags of child elements to keep
+    :param bool keep_surname: Whether to keep the surname of the (first) name
+    """
+    keep_tags = frozenset(keep_tags)
+
+    def stage(record):
+        if record.tag != 'INDI' or not is_living(record, years=years):
+            return record
+        surname = None
+        names = record.get_list('NAME')
+        if keep_surname and names:
+            if names[0].value and names[0].value.count("/") == 2:
+                surname = names[0].value.split("/")[1].strip()
+            elif 'SURN' in names[0]:
+                surname = names[0].get_list('SURN')[0].value
+        new_name = Element(level=1, tag='NAME', value=u"{0} /{1}/".format(name, surname) if surname else name, gedcom_file=record.gedcom_file)
+        new_name.parent_element = record
+        record.child_elements = [new_name] + [c for c in record.child_elements if c.tag in keep_tags]
+        return record
+    return stage
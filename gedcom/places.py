@@ -0,0 +1,210 @@
+"""
+Hierarchy of the places (PLAC values) in a GEDCOM file, with the events that happened in each.
+
+GEDCOM places are lists of jurisdictions, smallest first:
+``"Leeds, Yorkshire, England"``. :py:func:`place_hierarchy` (or
+:py:meth:`gedcom.GedcomFile.places`) splits every PLAC value once, and
+puts it in a tree (England > Yorkshire > Leeds) whose nodes are shared by
+all events in the same place. Each :py:class:`Place` keeps the events that
+happened exactly there, so questions about a whole region are answered by
+walking its part of the tree, rather than looking at every event.
+
+    >>> places = gedcomfile.places()
+    >>> yorkshire = places.get("Yorkshire, England")
+    >>> born_there = yorkshire.individuals(tags=['BIRT'])
+
+Jurisdictions are compared ignoring case and extra whitespace, and empty
+ones (``", Yorkshire, England"``) are skipped. Places are named as they
+were first seen.
+"""
+import collections
+
+from . import _iter_source_records
+
+
+def _normalise(name):
+    return " ".join(name.split())
+
+
+class Place(object):
+
+    """
+    A place in a :py:class:`PlaceHierarchy` (e.g. Yorkshire), with the places in it and the events there.
+
+    :py:attr:`events` holds ``(event, record)`` tuples for events whose
+    place is exactly this one; :py:meth:`iter_events` includes those in the
+    places in it too.
+    """
+
+    def __init__(self, name, parent=None):
+        """
+        Create a place.
+
+        :param str name: Name of this jurisdiction (e.g. "Yorkshire"), None for the root of the hierarchy
+        :param Place parent: Place this is in
+        """
+        self.name = name
+        self.parent = parent
+        self.children = collections.OrderedDict()
+        self.events = []
+
+    def __repr__(self):
+        """Interal string represation of this object, for debugging purposes."""
+        return "Place({0!r})".format(self.full_name)
+
+    @property
+    def full_name(self):
+        """Return the GEDCOM place, smallest jurisdiction first (e.g. "Leeds, Yorkshire, England")."""
+        names = []
+        place = self
+        while place is not None and place.name is not None:
+            names.append(place.name)
+            place = place.parent
+        return ", ".join(names)
+
+    def child(self, name):
+        """
+        Return the place called `name` in this place.
+
+        :raises KeyError: if there isn't one
+        """
+        return self.children[name.lower()]
+
+    def walk(self):
+        """Iterate over this place, and all places in it."""
+        stack = [self]
+        while stack:
+            place = stack.pop()
+            yield place
+            stack.extend(reversed(list(place.children.values())))
+
+    def iter_events(self, tags=None):
+        """
+        Iterate over the events in this place, or any place in it.
+
+        :param tags: *optional* only include events with these tags (e.g. ``['BIRT', 'CHR']``)
+        :returns: iterator over ``(event, record)``
+        """
+        tags = None if tags is None else frozenset(tags)
+        for place in self.walk():
+            for event, record in place.events:
+                if tags is None or event.tag in tags:
+                    yield event, record
+
+    def records(self, tags=None):
+        """
+        Return the individuals and families with an event in this place, or any place in it.
+
+        :param tags: *optional* only look at events with these tags
+        :returns: records, in order of first event found, without duplicates
+        :rtype: list
+        """
+        seen = set()
+        result = []
+        for event, record in self.iter_events(tags):
+            if id(record) not in seen:
+                seen.add(id(record))
+                result.append(record)
+        return result
+
+    def individuals(self, tags=None):
+        """
+        Return the individuals with an event (e.g. born, with ``tags=['BIRT']``) in this place, or any place in it.
+
+        :param tags: *optional* only look at events with these tags
+        :rtype: list
+        """
+        return [record for record in self.records(tags) if record.tag == 'INDI']
+
+
+class PlaceHierarchy(object):
+
+    """The tree of all places in a file, see :py:mod:`gedcom.places`."""
+
+    def __init__(self):
+        """Create an empty hierarchy."""
+        self.root = Place(None)
+        self._by_name = collections.defaultdict(list)
+        self._by_value = {}
+
+    def add(self, value, event, record):
+        """
+        Add an event at this place.
+
+        :param str value: PLAC value
+        :param Element event: The event (the PLAC element's parent)
+        :param Element record: The record (level 0 element) the event is in
+        :returns: the place, or None if `value` has no jurisdictions
+        :rtype: Place
+        """
+        place = self._by_value.get(value)
+        if place is None:
+            place = self.root
+            for name in reversed(value.split(",")):
+                name = _normalise(name)
+                if not name:
+                    continue
+                child = place.children.get(name.lower())
+                if child is None:
+                    child = place.children[name.lower()] = Place(name, place)
+                    self._by_name[name.lower()].append(child)
+                place = child
+            if place is self.root:
+                return None
+            self._by_value[value] = place
+        place.events.append((event, record))
+        return place
+
+    def __iter__(self):
+        """Iterate over all places, largest first."""
+        places = self.root.walk()
+        next(places)
+        return places
+
+    def get(self, value):
+        """
+        Return the place for this (full) GEDCOM place, e.g. "Yorkshire, England".
+
+        :param str value: Place, smallest jurisdiction first
+        :rtype: Place
+        :raises KeyError: if there is no such place
+        """
+        place = self.root
+        for name in reversed(value.split(",")):
+            name = _normalise(name)
+            if name:
+                place = place.child(name)
+        if place is self.root:
+            raise KeyError(value)
+        return place
+
+    def find(self, name):
+        """
+        Return all places with this name, at any level (e.g. every "Springfield").
+
+        :param str name: Name of one jurisdiction
+        :rtype: list of :py:class:`Place`
+        """
+        return list(self._by_name.get(_normalise(name).lower(), ()))
+
+
+def place_hierarchy(records):
+    """
+    Build the hierarchy of the places of all events in these records.
+
+    Every element with a PLAC child element counts as an event.
+
+    :param records: :py:class:`gedcom.GedcomFile`, iterable of records, or a file to read them from (filename, file-like object or string contents)
+    :rtype: :py:class:`PlaceHierarchy`
+    """
+    records = _iter_source_records(records)
+    hierarchy = PlaceHierarchy()
+    for record in records:
+        stack = [record]
+        while stack:
+            element = stack.pop()
+            for child in element.child_elements:
+                if child.tag == 'PLAC' and child.value:
+                    hierarchy.add(child.value, element, record)
+            stack.extend(reversed(element.child_elements))
+    return hierarchy
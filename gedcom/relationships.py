@@ -0,0 +1,198 @@
+"""
+Blood relationships between individuals ("2nd cousin once removed"), for many pairs at once.
+
+A :py:class:`RelationshipCalculator` works on a
+:py:class:`gedcom.pedigree.Pedigree`, so no families or pointers are looked
+up. For each person it calculates (once, and then keeps) how many
+generations up each of their ancestors is. The relationship of two people
+then comes from the common ancestor closest to both of them: if it is
+``a`` generations above the first person and ``b`` above the second, they
+are e.g. siblings for ``(1, 1)``, and cousins of degree ``min(a, b) - 1``,
+``abs(a - b)`` times removed, when both are at least 2.
+
+    >>> from gedcom.relationships import RelationshipCalculator
+    >>> calculator = RelationshipCalculator(gedcomfile)
+    >>> calculator.relationship('@I1@', '@I42@').name
+    '2nd cousin once removed'
+    >>> names = calculator.relationships_to('@I1@', everyone_on_the_page)
+
+Pedigrees aren't trees (everyone has two parents, and the same ancestor can
+be reached along several lines), so this keeps full ancestor tables rather
+than the parent pointers of tree algorithms. Only blood relationships are
+found, not those by marriage.
+"""
+import collections
+
+from .pedigree import Pedigree
+
+#: How two people are related, see :py:meth:`RelationshipCalculator.relationship`.
+#:
+#: ``generations`` is ``(a, b)``: how many generations the common ancestors
+#: are above the first and second person. ``common_ancestors`` are the
+#: ids/pointers of all common ancestors that are that far from both.
+Relationship = collections.namedtuple('Relationship', ['name', 'generations', 'common_ancestors'])
+
+
+def ordinal(number):
+    """Return ``1st``, ``2nd``, ``3rd``, ``4th``, etc."""
+    if 10 <= number % 100 <= 20:
+        suffix = 'th'
+    else:
+        suffix = {1: 'st', 2: 'nd', 3: 'rd'}.get(number % 10, 'th')
+    return "{0}{1}".format(number, suffix)
+
+
+def _greats(name, greats, grand=False):
+    """Return `name` with this many greats, e.g. ``great-aunt/uncle``, ``2nd great-grandparent``."""
+    if grand:
+        name = "grand" + name
+    if greats <= 0:
+        return name
+    elif greats == 1:
+        return "great-" + name
+    return "{0} great-{1}".format(ordinal(greats), name)
+
+
+def _times(number):
+    return {1: "once", 2: "twice"}.get(number, "{0} times".format(number))
+
+
+def relationship_name(a, b, half=False):
+    """
+    Return the name of the relationship of the second person to the first, given how far their closest common ancestor is above each.
+
+    :param int a: Generations from the first person up to the common ancestor
+    :param int b: Generations from the second person up to the common ancestor
+    :param bool half: Whether they have only one of two parents (at that level) in common, for siblings
+    :rtype: str
+    """
+    if a == 0 and b == 0:
+        return "self"
+    elif b == 0:
+        return "parent" if a == 1 else _greats("parent", a - 2, grand=True)
+    elif a == 0:
+        return "child" if b == 1 else _greats("child", b - 2, grand=True)
+    elif a == 1 and b == 1:
+        return "half-sibling" if half else "sibling"
+    elif b == 1:
+        return _greats("aunt/uncle", a - 2)
+    elif a == 1:
+        return _greats("niece/nephew", b - 2)
+    name = "{0} cousin".format(ordinal(min(a, b) - 1))
+    if a != b:
+        name += " {0} removed".format(_times(abs(a - b)))
+    return name
+
+
+class RelationshipCalculator(object):
+
+    """
+    Finds how individuals in a file are related, see :py:mod:`gedcom.relationships`.
+
+    Build it once, and use it for many pairs: the ancestors of everyone
+    looked at are kept, so each person's ancestors are only walked once.
+    Build a new one after changing the file.
+    """
+
+    def __init__(self, gedcom_file):
+        """
+        Create a calculator.
+
+        :param gedcom_file: :py:class:`gedcom.GedcomFile`, or a :py:class:`gedcom.pedigree.Pedigree` already built from one
+        """
+        self.pedigree = gedcom_file if isinstance(gedcom_file, Pedigree) else Pedigree(gedcom_file)
+        self._ancestors = {}
+
+    def ancestor_generations(self, num):
+        """
+        Return the ancestors of this person (including themselves, at 0), and how many generations up the closest line to each is.
+
+        :param int num: Number of the person in :py:attr:`pedigree`
+        :returns: number to generations
+        :rtype: dict
+        """
+        result = self._ancestors.get(num)
+        if result is None:
+            parents = self.pedigree.parents
+            result = {num: 0}
+            generation = [num]
+            depth = 0
+            while generation:
+                depth += 1
+                next_generation = []
+                for person in generation:
+                    for parent in parents[person]:
+                        if parent not in result:
+                            result[parent] = depth
+                            next_generation.append(parent)
+                generation = next_generation
+            self._ancestors[num] = result
+        return result
+
+    def _relationship(self, first, second):
+        first_ancestors = self.ancestor_generations(first)
+        second_ancestors = self.ancestor_generations(second)
+        # Go through the smaller table, and look up in the other
+        swapped = len(second_ancestors) < len(first_ancestors)
+        smaller, larger = (second_ancestors, first_ancestors) if swapped else (first_ancestors, second_ancestors)
+
+        best, common = None, []
+        for ancestor, depth in smaller.items():
+            other_depth = larger.get(ancestor)
+            if other_depth is None:
+                continue
+            a, b = (other_depth, depth) if swapped else (depth, other_depth)
+            key = (a + b, abs(a - b), a)
+            if best is None or key < best:
+                best, common = key, [ancestor]
+            elif key == best:
+                common.append(ancestor)
+        if best is None:
+            return None
+
+        a, b = first_ancestors[common[0]], second_ancestors[common[0]]
+        parents = self.pedigree.parents
+        half = (a, b) == (1, 1) and len(common) == 1 and len(parents[first]) > 1 and len(parents[second]) > 1
+        ids = self.pedigree.ids
+        return Relationship(relationship_name(a, b, half), (a, b), [ids[num] for num in sorted(common)])
+
+    def relationship(self, first, second):
+        """
+        Return how `second` is related to `first`, by blood.
+
+        Where they are related along several lines, the closest one (fewest
+        generations in total to the common ancestor) is used.
+
+        :param first: :py:class:`gedcom.Individual` or id/pointer
+        :param second: :py:class:`gedcom.Individual` or id/pointer
+        :returns: the relationship (e.g. ``name`` is ``'aunt/uncle'`` if `second` is `first`'s aunt or uncle), or None if they have no known common ancestor
+        :rtype: :py:data:`Relationship`
+        :raises KeyError: if an individual isn't in the file
+        """
+        first, second = self.pedigree.to_indexes([first, second])
+        return self._relationship(first, second)
+
+    def relationships(self, pairs):
+        """
+        Return the relationships of many pairs of people.
+
+        :param pairs: iterable of ``(first, second)`` :py:class:`gedcom.Individual`'s or ids/pointers
+        :returns: a :py:data:`Relationship` (or None) for each pair, as for :py:meth:`relationship`
+        :rtype: list
+        :raises KeyError: if an individual isn't in the file
+        """
+        to_indexes = self.pedigree.to_indexes
+        return [self._relationship(*to_indexes(pair)) for pair in pairs]
+
+    def relationships_to(self, individual, others):
+        """
+        Return how each of `others` is related to `individual` (e.g. to show "your 2nd cousin" next to everyone on a page).
+
+        :param individual: :py:class:`gedcom.Individual` or id/pointer
+        :param others: iterable of :py:class:`gedcom.Individual`'s or ids/pointers
+        :returns: a :py:data:`Relationship` (or None) for each of `others`
+        :rtype: list
+        :raises KeyError: if an individual isn't in the file
+        """
+        num = self.pedigree.to_indexes([individual])[0]
+        return [self._relationship(num, other) for other in self.pedigree.to_indexes(others)]
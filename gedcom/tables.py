@@ -0,0 +1,193 @@
+"""
+Flatten GEDCOM records into column-oriented tables, for analytics.
+
+:py:meth:`gedcom.GedcomFile.to_tables` (or :py:func:`build_tables` on any
+iterable of records, e.g. :py:func:`gedcom.iter_records`) looks at every
+child element of every record once, and fills these tables:
+
+* ``individuals``: id, given_name, surname, sex, birth_date, birth_place, death_date, death_place, famc
+* ``families``: id, husband, wife, marriage_date, marriage_place, children (a count)
+* ``children``: family, child
+* ``events``: record, record_type, tag, date, place (all events of individuals and families)
+
+Missing values are None (or 0 for counts); nothing raises for missing or
+malformed data. Text columns are lists, counts are :py:mod:`array` arrays.
+
+    >>> tables = gedcomfile.to_tables()
+    >>> tables.individuals.columns['surname'][:3]
+    ['Cox', 'Para', 'Cox']
+    >>> tables.write_csv("/tmp/tree")
+"""
+import array
+import collections
+import csv
+import io
+import os
+
+import six
+
+from . import FAMILY_EVENT_TAGS, INDIVIDUAL_EVENT_TAGS, name_parts
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class Table(object):
+
+    """A table stored as columns: :py:attr:`columns` maps column name to a list (or array) of values."""
+
+    def __init__(self, name, columns):
+        """
+        Create an empty table.
+
+        :param str name: Name of the table (used as CSV filename)
+        :param columns: list of column names, or ``(name, array typecode)`` for numeric columns
+        """
+        self.name = name
+        self.columns = collections.OrderedDict()
+        for column in columns:
+            if isinstance(column, tuple):
+                self.columns[column[0]] = array.array(column[1])
+            else:
+                self.columns[column] = []
+        self._appenders = [c.append for c in self.columns.values()]
+
+    def __len__(self):
+        """Return the number of rows."""
+        return len(next(iter(self.columns.values())))
+
+    def __repr__(self):
+        """Interal string represation of this object, for debugging purposes."""
+        return "Table({0!r}, {1} rows, columns={2!r})".format(self.name, len(self), list(self.columns))
+
+    def append(self, *row):
+        """Add a row, with one value for each column."""
+        for append, value in zip(self._appenders, row):
+            append(value)
+
+    def rows(self):
+        """Iterate over the rows, as tuples."""
+        return six.moves.zip(*self.columns.values())
+
+    def to_numpy(self):
+        """
+        Return the columns as NumPy arrays (text columns have dtype object).
+
+        :rtype: collections.OrderedDict
+        :raises ImportError: if NumPy isn't installed
+        """
+        if numpy is None:
+            raise ImportError("Table.to_numpy requires numpy, install it with 'pip install numpy'")
+        return collections.OrderedDict(
+            (name, numpy.array(values) if isinstance(values, array.array) else numpy.array(values, dtype=object)) for name, values in self.columns.items())
+
+    def write_csv(self, fileout):
+        """
+        Write this table, with a header row, as CSV.
+
+        :param fileout: Filename or open (text) file-like object
+        """
+        if isinstance(fileout, six.string_types):
+            if six.PY2:
+                with open(fileout, 'wb') as fp:
+                    return self.write_csv(fp)
+            with io.open(fileout, 'w', newline='', encoding='utf8') as fp:
+                return self.write_csv(fp)
+
+        writer = csv.writer(fileout)
+        writer.writerow(list(self.columns))
+        for row in self.rows():
+            if six.PY2:
+                row = [v.encode('utf8') if isinstance(v, six.text_type) else v for v in row]
+            writer.writerow(row)
+
+
+class Tables(collections.namedtuple('Tables', ['individuals', 'families', 'children', 'events'])):
+
+    """The tables made by :py:func:`build_tables`."""
+
+    def write_csv(self, directory):
+        """
+        Write every table as ``<name>.csv`` in this directory (which is created if needed).
+
+        :param str directory: Directory to write to
+        """
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        for table in self:
+            table.write_csv(os.path.join(directory, table.name + ".csv"))
+
+
+def _date_place(event):
+    date = place = None
+    for child in event.child_elements:
+        if child.tag == 'DATE' and date is None:
+            date = child.value
+        elif child.tag == 'PLAC' and place is None:
+            place = child.value
+    return date, place
+
+
+def build_tables(records):
+    """
+    Flatten these records into :py:class:`Tables`.
+
+    :param records: iterable of records (level 0 elements)
+    :rtype: :py:class:`Tables`
+    """
+    tables = Tables(
+        individuals=Table('individuals', ['id', 'given_name', 'surname', 'sex', 'birth_date', 'birth_place', 'death_date', 'death_place', 'famc']),
+        families=Table('families', ['id', 'husband', 'wife', 'marriage_date', 'marriage_place', ('children', 'l')]),
+        children=Table('children', ['family', 'child']),
+        events=Table('events', ['record', 'record_type', 'tag', 'date', 'place']))
+    add_event = tables.events.append
+
+    for record in records:
+        if record.tag == 'INDI':
+            name = sex = famc = birth = death = None
+            for child in record.child_elements:
+                tag = child.tag
+                if tag in INDIVIDUAL_EVENT_TAGS:
+                    date_place = _date_place(child)
+                    add_event(record.id, 'INDI', tag, date_place[0], date_place[1])
+                    if tag == 'BIRT' and birth is None:
+                        birth = date_place
+                    elif tag == 'DEAT' and death is None:
+                        death = date_place
+                elif tag == 'NAME':
+                    if name is None or ('TYPE' in name and 'TYPE' not in child):
+                        name = child
+                elif tag == 'SEX' and sex is None:
+                    sex = child.value
+                elif tag == 'FAMC' and famc is None:
+                    famc = child.value
+            try:
+                given_name, surname = name_parts(name) if name is not None else (None, None)
+            except Exception:
+                given_name = surname = None
+            birth, death = birth or (None, None), death or (None, None)
+            tables.individuals.append(record.id, given_name, surname, sex, birth[0], birth[1], death[0], death[1], famc)
+
+        elif record.tag == 'FAM':
+            husband = wife = marriage = None
+            children = 0
+            for child in record.child_elements:
+                tag = child.tag
+                if tag == 'CHIL':
+                    children += 1
+                    tables.children.append(record.id, child.value)
+                elif tag in FAMILY_EVENT_TAGS:
+                    date_place = _date_place(child)
+                    add_event(record.id, 'FAM', tag, date_place[0], date_place[1])
+                    if tag == 'MARR' and marriage is None:
+                        marriage = date_place
+                elif tag == 'HUSB' and husband is None:
+                    husband = child.value
+                elif tag == 'WIFE' and wife is None:
+                    wife = child.value
+            marriage = marriage or (None, None)
+            tables.families.append(record.id, husband, wife, marriage[0], marriage[1], children)
+
+    return tables
@@ -0,0 +1,295 @@
+"""
+All the events in a GEDCOM file in date order, for queries by period and place.
+
+:py:func:`parse_date_range` turns a GEDCOM date (``"ABT 1900"``,
+``"BET 1914 AND 1918"``, ``"JAN 1850"``, ...) into the first and last day
+it could be. A :py:class:`Timeline` (from :py:meth:`gedcom.GedcomFile.timeline`)
+parses the date of every event of every individual and family once, and
+keeps them in an :py:class:`IntervalTree`, so finding the events in a
+period only looks at the events that could overlap it.
+
+    >>> timeline = gedcomfile.timeline()
+    >>> wartime = timeline.overlapping(1914, 1918, place="France")
+    >>> alive = timeline.alive(1900)
+
+Dates are ranges, so queries find everything that *may* have happened in
+the period: ``BEF 1900`` overlaps every earlier year. ``ABT``, ``CAL`` and
+``EST`` dates are taken as they are. Dates in calendars other than
+Gregorian and Julian (which isn't converted), and date phrases, can't be
+parsed, and their events are left out.
+"""
+import calendar
+import collections
+import datetime
+import re
+
+import six
+
+from . import FAMILY_EVENT_TAGS, INDIVIDUAL_EVENT_TAGS, _iter_source_records
+from .pipelines import BIRTH_TAGS, DEATH_TAGS
+from .places import PlaceHierarchy
+
+MONTHS = dict((month, number) for number, month in enumerate(['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC'], 1))
+
+date_format = re.compile(r"^(?:([0-9]{1,2}) )?(?:([A-Z]{3}) )?([0-9]{1,4})(?:/[0-9]{1,2})?$")
+range_format = re.compile(r"^(BET|FROM) (.+) (AND|TO) (.+)$")
+calendar_format = re.compile(r"@#D([A-Z ]+)@ ?")
+phrase_format = re.compile(r"\(.*?\)")
+
+#: A dated event in a :py:class:`Timeline`. ``start`` and ``end`` are the first and last day it could have been.
+TimelineEvent = collections.namedtuple('TimelineEvent', ['start', 'end', 'event', 'record'])
+
+
+def _single_date(text):
+    """Return the first and last day of a date without a range keyword (e.g. "1 JAN 1900", "JAN 1900", "1900"), or None."""
+    match = date_format.match(text)
+    if match is None:
+        return None
+    day, month, year = match.groups()
+    year = int(year)
+    if year == 0:
+        return None
+    if month is None:
+        return None if day else (datetime.date(year, 1, 1), datetime.date(year, 12, 31))
+    if month not in MONTHS:
+        return None
+    month = MONTHS[month]
+    last_day = calendar.monthrange(year, month)[1]
+    if day is None:
+        return datetime.date(year, month, 1), datetime.date(year, month, last_day)
+    if not 1 <= int(day) <= last_day:
+        return None
+    date = datetime.date(year, month, int(day))
+    return date, date
+
+
+def parse_date_range(value):
+    """
+    Return the first and last day that a GEDCOM date value could be.
+
+    Open ranges (``BEF``, ``AFT``, ``FROM`` without ``TO``, ``TO``) use
+    ``datetime.date.min`` and ``datetime.date.max``.
+
+    :param str value: GEDCOM date (e.g. ``"1 JAN 1900"``, ``"ABT 1900"``, ``"BET 1914 AND 1918"``, ``"AFT MAR 1850"``)
+    :returns: ``(start, end)`` :py:class:`datetime.date`'s, or None if it can't be parsed
+    :rtype: tuple
+    """
+    if not value:
+        return None
+    text = " ".join(phrase_format.sub("", value).upper().split())
+    for match in calendar_format.finditer(text):
+        if match.group(1).strip() not in ('GREGORIAN', 'JULIAN'):
+            return None
+    text = calendar_format.sub("", text)
+    for prefix in ('INT ', 'ABT ', 'CAL ', 'EST '):
+        if text.startswith(prefix):
+            text = text[len(prefix):]
+
+    match = range_format.match(text)
+    if match is not None and (match.group(1), match.group(3)) in (('BET', 'AND'), ('FROM', 'TO')):
+        first, last = _single_date(match.group(2)), _single_date(match.group(4))
+        return (first[0], last[1]) if first and last and first[0] <= last[1] else None
+    for prefix, open_start in (('BEF ', True), ('TO ', True), ('AFT ', False), ('FROM ', False)):
+        if text.startswith(prefix):
+            date = _single_date(text[len(prefix):])
+            if date is None:
+                return None
+            return (datetime.date.min, date[1]) if open_start else (date[0], datetime.date.max)
+    return _single_date(text)
+
+
+def _bounds(start, end=None):
+    """Return the first and last day of a query period, given as years, dates or GEDCOM date strings."""
+    def as_range(value):
+        if isinstance(value, datetime.date):
+            return value, value
+        elif isinstance(value, six.integer_types):
+            return datetime.date(value, 1, 1), datetime.date(value, 12, 31)
+        date_range = parse_date_range(value)
+        if date_range is None:
+            raise ValueError("Can't parse date {0!r}".format(value))
+        return date_range
+
+    first = as_range(start)
+    last = first if end is None else as_range(end)
+    return first[0], last[1]
+
+
+def _add_years(date, years):
+    """Return this date `years` later (or earlier), kept within the dates Python supports."""
+    year = min(max(date.year + years, datetime.MINYEAR), datetime.MAXYEAR)
+    return date.replace(year=year, day=min(date.day, calendar.monthrange(year, date.month)[1]))
+
+
+class IntervalTree(object):
+
+    """
+    Static interval tree: finds the items whose ``[start, end]`` overlaps a query in ``O(log n + k)``.
+
+    The items are sorted by start, and kept as an implicit balanced binary
+    tree over that list, where each node also has the latest end in its
+    subtree, so whole subtrees that end too early are skipped.
+    """
+
+    def __init__(self, intervals):
+        """
+        Build the tree.
+
+        :param intervals: iterable of ``(start, end, item)``, where starts and ends can be compared (e.g. dates)
+        """
+        intervals = sorted(intervals, key=lambda interval: interval[0])
+        self.starts = [interval[0] for interval in intervals]
+        self.ends = [interval[1] for interval in intervals]
+        self.items = [interval[2] for interval in intervals]
+        self.max_ends = list(self.ends)
+        self._build(0, len(intervals))
+
+    def _build(self, low, high):
+        """Set :py:attr:`max_ends` of the subtree of ``items[low:high]`` (whose root is the middle one), and return it."""
+        if low >= high:
+            return None
+        middle = (low + high) // 2
+        for child_end in (self._build(low, middle), self._build(middle + 1, high)):
+            if child_end is not None and child_end > self.max_ends[middle]:
+                self.max_ends[middle] = child_end
+        return self.max_ends[middle]
+
+    def __len__(self):
+        """Return the number of items."""
+        return len(self.items)
+
+    def overlapping(self, start, end):
+        """
+        Return the items whose interval overlaps ``[start, end]`` (both included).
+
+        :returns: items, in order of start
+        :rtype: list
+        """
+        found = []
+        stack = [(0, len(self.items))]
+        while stack:
+            low, high = stack.pop()
+            if low >= high:
+                continue
+            middle = (low + high) // 2
+            if self.max_ends[middle] < start:
+                continue
+            stack.append((low, middle))
+            if self.starts[middle] <= end:
+                if self.ends[middle] >= start:
+                    found.append(middle)
+                stack.append((middle + 1, high))
+        return [self.items[position] for position in sorted(found)]
+
+
+class Timeline(object):
+
+    """
+    The dated events, and lifespans, of all individuals and families in a file, see :py:mod:`gedcom.timeline`.
+
+    Built once from the records as they are; build a new one after changing the file.
+    """
+
+    def __init__(self, records, max_age=100):
+        """
+        Parse the dates of all events in these records.
+
+        :param records: :py:class:`gedcom.GedcomFile`, iterable of records, or a file to read them from (filename, file-like object or string contents)
+        :param int max_age: Age people are presumed to live to at most, for lifespans without a birth or death date
+        """
+        records = _iter_source_records(records)
+        self.places = PlaceHierarchy()
+        events = []
+        lifespans = []
+        for record in records:
+            event_tags = INDIVIDUAL_EVENT_TAGS if record.tag == 'INDI' else FAMILY_EVENT_TAGS if record.tag == 'FAM' else None
+            if event_tags is None:
+                continue
+            born = died = None
+            for event in record.child_elements:
+                if event.tag not in event_tags:
+                    continue
+                date_range = place = None
+                for child in event.child_elements:
+                    if child.tag == 'DATE' and date_range is None:
+                        date_range = parse_date_range(child.value)
+                    elif child.tag == 'PLAC' and child.value:
+                        place = child.value
+                if date_range is None:
+                    continue
+                events.append((date_range[0], date_range[1], TimelineEvent(date_range[0], date_range[1], event, record)))
+                if place is not None:
+                    self.places.add(place, event, record)
+                if born is None and event.tag in BIRTH_TAGS:
+                    born = date_range
+                elif died is None and event.tag in DEATH_TAGS:
+                    died = date_range
+            if record.tag == 'INDI':
+                lifespan = self._lifespan(born, died, max_age)
+                if lifespan is not None:
+                    lifespans.append(lifespan + (record,))
+
+        self.events = IntervalTree(events)
+        self.lifespans = IntervalTree(lifespans)
+
+    @staticmethod
+    def _lifespan(born, died, max_age):
+        """Return the first and last day someone could have been alive, or None if neither their birth nor their death has a usable date."""
+        start = born[0] if born is not None and born[0] != datetime.date.min else None
+        end = died[1] if died is not None and died[1] != datetime.date.max else None
+        if start is None and end is None:
+            return None
+        if start is None:
+            start = _add_years(died[0] if died[0] != datetime.date.min else end, -max_age)
+        if end is None:
+            end = _add_years(born[1] if born[1] != datetime.date.max else start, max_age)
+        return start, end
+
+    def __len__(self):
+        """Return the number of dated events."""
+        return len(self.events)
+
+    def __iter__(self):
+        """Iterate over all dated events (:py:data:`TimelineEvent`), in order of start."""
+        return iter(self.events.items)
+
+    def overlapping(self, start, end=None, place=None, tags=None):
+        """
+        Return the events that may have happened during this period.
+
+        :param start: First year (int), :py:class:`datetime.date` or GEDCOM date of the period
+        :param end: *optional* Last year, date or GEDCOM date of the period (default: the same as `start`)
+        :param str place: *optional* Only include events in this place, or any place in it (e.g. "France", see :py:meth:`gedcom.places.PlaceHierarchy.get`)
+        :param tags: *optional* Only include events with these tags (e.g. ``['BIRT', 'CHR']``)
+        :returns: events, in order of start
+        :rtype: list of :py:data:`TimelineEvent`
+        :raises ValueError: if a GEDCOM date can't be parsed
+        """
+        found = self.events.overlapping(*_bounds(start, end))
+        if tags is not None:
+            tags = frozenset(tags)
+            found = [entry for entry in found if entry.event.tag in tags]
+        if place is not None:
+            try:
+                in_place = set(id(event) for event, record in self.places.get(place).iter_events())
+            except KeyError:
+                return []
+            found = [entry for entry in found if id(entry.event) in in_place]
+        return found
+
+    def alive(self, start, end=None):
+        """
+        Return the individuals who may have been alive at some time during this period.
+
+        Lifespans are from the start of the (first) birth, christening or
+        baptism date to the end of the death, burial or cremation date.
+        Where one of them is missing, people are presumed to have lived at
+        most `max_age` years; people with neither are left out.
+
+        :param start: First year (int), :py:class:`datetime.date` or GEDCOM date of the period
+        :param end: *optional* Last year, date or GEDCOM date of the period (default: the same as `start`)
+        :returns: INDI records, in order of the start of their lifespan
+        :rtype: list
+        :raises ValueError: if a GEDCOM date can't be parsed
+        """
+        return self.lifespans.overlapping(*_bounds(start, end))
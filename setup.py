@@ -10,6 +10,12 @@ setup(
     packages=['gedcom',],
     license='GPLv3+',
     test_suite='tests',
+    extras_require={
+        'kinship': ['numpy', 'scipy'],
+    },
+    entry_points={
+        'console_scripts': ['gedcompy = gedcom.cli:main'],
+    },
     description="Parse and create GEDCOM (genealogy) files",
     author="Rory McCann",
     author_email="rory@technomancy.org",
@@ -2,8 +2,16 @@ import unittest
 import gedcom
 import six
 import tempfile
+import os
+import shutil
+import sys
 from os import remove
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 # Sample GEDCOM file from Wikipedia
 GEDCOM_FILE = """0 HEAD
 1 SOUR Reunion
@@ -283,5 +291,728 @@ class GedComTestCase(unittest.TestCase):
         gedcomfile = gedcom.parse_string("0 HEAD\n0 @I1@ INDI\n1 NAME Bob /Russel\n0 TRLR")
         self.assertRaises(Exception, lambda : list(gedcomfile.individuals)[0].name)
 
+    def testValidateCleanFile(self):
+        self.assertEqual(gedcom.parse_string(GEDCOM_FILE).validate(), [])
+
+    def testValidateFindsProblems(self):
+        gedcomfile = gedcom.parse_string("0 @I1@ INDI\n1 FAMC @F1@\n1 FAMS @F2@\n1 NOTE @N9@\n0 @F1@ FAM\n1 CHIL @I2@\n0 @I2@ INDI\n0 @F2@ FAM\n1 HUSB @F1@\n0 @I1@ INDI\n0 TRLR")
+        issues = gedcomfile.validate()
+        self.assertEqual([i.code for i in issues], ['duplicate-id', 'dangling-pointer', 'wrong-target', 'missing-chil', 'missing-famc', 'missing-spouse'])
+        self.assertEqual(issues[1].element.value, '@N9@')
+        self.assertEqual(issues[4].record.id, '@F1@')
+
+    def testValidateLevels(self):
+        gedcomfile = gedcom.GedcomFile()
+        individual = gedcomfile.individual()
+        individual.set_sex("M")
+        self.assertEqual([i.code for i in gedcomfile.validate()], ['bad-level'])
+        gedcomfile.ensure_levels()
+        self.assertEqual(gedcomfile.validate(), [])
+
+    def testParseErrorWithLevelJump(self):
+        self.assertRaises(Exception, gedcom.parse_string, "0 @I1@ INDI\n1 NAME Bob\n0 @I2@ INDI\n2 GIVN Bob")
+
+    def testExtractAncestors(self):
+        gedcomfile = gedcom.parse_string(GEDCOM_FILE)
+        extracted = gedcomfile.extract(['@I3@'], ancestors=1)
+        self.assertEqual(extracted.gedcom_lines_as_string() + "\n", GEDCOM_FILE)
+        self.assertEqual(extracted['@I3@'].father.name, ("Robert", "Cox"))
+        self.assertFalse(extracted['@I3@'] is gedcomfile['@I3@'])
+
+    def testExtractRemovesDanglingLinks(self):
+        gedcomfile = gedcom.parse_string(GEDCOM_FILE)
+        extracted = gedcomfile.extract([gedcomfile['@I1@']], spouses=False)
+        self.assertEqual([i.id for i in extracted.individuals], ['@I1@'])
+        self.assertEqual([p.value for p in extracted['@F1@'].partners], ['@I1@'])
+        self.assertEqual(extracted['@F1@'].get_list('CHIL'), [])
+        self.assertEqual(extracted.validate(), [])
+
+    def testExtractToFile(self):
+        gedcomfile = gedcom.parse_string("0 @I1@ INDI\n1 NOTE @N1@\n1 FAMC @F1@\n0 @N1@ NOTE Hello\n1 SOUR @S1@\n0 @S1@ SOUR\n0 @N2@ NOTE Unused\n0 @F1@ FAM\n1 CHIL @I1@")
+        output = six.BytesIO()
+        self.assertEqual(gedcomfile.extract(['@I1@'], fileout=output), None)
+        lines = output.getvalue().decode("utf8").split("\n")
+        self.assertEqual(lines[0], "0 HEAD")
+        self.assertEqual(lines[lines.index("0 @I1@ INDI"):], ["0 @I1@ INDI", "1 NOTE @N1@", "0 @N1@ NOTE Hello", "1 SOUR @S1@", "0 @S1@ SOUR", "0 TRLR", ""])
+
+    def testFreeze(self):
+        gedcomfile = gedcom.parse_string(GEDCOM_FILE)
+        frozen = gedcomfile.freeze()
+        self.assertEqual(frozen.gedcom_lines_as_string() + "\n", GEDCOM_FILE)
+        self.assertTrue(isinstance(frozen['@I3@'], gedcom.Individual))
+
+        directory = tempfile.mkdtemp()
+        filename = os.path.join(directory, "frozen.ged")
+        frozen.save(filename)
+        with open(filename) as fp:
+            self.assertEqual(fp.read(), GEDCOM_FILE)
+        shutil.rmtree(directory)
+        self.assertEqual(frozen['@I3@'].father.name, ("Robert", "Cox"))
+        self.assertEqual([i.id for i in frozen.records('INDI')], ['@I1@', '@I2@', '@I3@'])
+        self.assertEqual([e.tag for e in frozen.referrers('@I1@')], ['HUSB'])
+        self.assertTrue(frozen.freeze() is frozen)
+
+        gedcomfile['@I3@'].set_sex('F')
+        self.assertEqual(frozen['@I3@'].sex, 'M')
+
+    def testFreezeIsReadOnly(self):
+        gedcomfile = gedcom.GedcomFile()
+        gedcomfile.individual()
+        frozen = gedcomfile.freeze()
+        individual = list(frozen.individuals)[0]
+        self.assertRaises(gedcom.FrozenError, individual.set_sex, 'M')
+        self.assertRaises(gedcom.FrozenError, setattr, individual, 'value', 'foo')
+        self.assertRaises(gedcom.FrozenError, individual.add_child_element, gedcom.Element(tag='NOTE'))
+        self.assertRaises(gedcom.FrozenError, frozen.individual)
+        self.assertRaises(gedcom.FrozenError, frozen.pointers.pop, '@I1@')
+        self.assertRaises(gedcom.FrozenError, setattr, frozen, 'root_elements', [])
+
+    def testFreezeDoesNotChangeOriginal(self):
+        gedcomfile = gedcom.GedcomFile()
+        gedcomfile.individual()
+        frozen = gedcomfile.freeze()
+        self.assertEqual([e.tag for e in frozen.root_elements], ['HEAD', 'INDI', 'TRLR'])
+        self.assertEqual([e.tag for e in gedcomfile.root_elements], ['INDI'])
+        frozen.gedcom_lines_as_string()
+        self.assertEqual(len(frozen.root_elements), 3)
+
+    def testInterning(self):
+        gedcomfile = gedcom.parse_string(GEDCOM_FILE)
+        husband, child = gedcomfile['@F1@'].get_list('HUSB')[0], gedcomfile['@F1@'].get_list('CHIL')[0]
+        self.assertTrue(husband.value is gedcomfile['@I1@'].id)
+        self.assertTrue(child.value is gedcomfile['@I3@'].id)
+        sexes = [gedcomfile[i].get_list('SEX')[0].value for i in ('@I1@', '@I3@')]
+        self.assertTrue(sexes[0] is sexes[1])
+        self.assertTrue(gedcomfile.intern('tags', 'INDI') is gedcomfile['@I1@'].tag)
+
+        report = gedcomfile.interning_report()
+        self.assertEqual(report['xrefs']['distinct'], report['xrefs']['objects'])
+        self.assertEqual(report['tags']['distinct'], report['tags']['objects'])
+        self.assertTrue(report['tags']['bytes'] < report['tags']['bytes_without_interning'])
+
+    def testInternedValueTags(self):
+        gedcomfile = gedcom.parse_string(GEDCOM_FILE, interned_value_tags=[])
+        sexes = [gedcomfile[i].get_list('SEX')[0].value for i in ('@I1@', '@I3@')]
+        self.assertEqual(sexes[0], sexes[1])
+        self.assertEqual(gedcomfile.interning_report()['values']['references'], 0)
+
+    def testMemoryReport(self):
+        gedcomfile = gedcom.parse_string(GEDCOM_FILE)
+        report = gedcomfile.memory_report()
+        self.assertEqual(sorted(report['records']), ['FAM', 'HEAD', 'INDI', 'TRLR'])
+        self.assertEqual(sum(report['records'].values()), report['total'])
+        self.assertEqual(sum(report['tags'].values()), report['total'])
+        self.assertEqual(report['elements']['INDI'], 3)
+        self.assertTrue(report['records']['INDI'] > report['records']['FAM'] > report['records']['TRLR'] > 0)
+
+    def testMaxMemory(self):
+        total = gedcom.parse_string(GEDCOM_FILE).memory_report()['total']
+        self.assertEqual(len(gedcom.parse(GEDCOM_FILE, max_memory=total).root_elements), 6)
+        with self.assertRaises(gedcom.MemoryBudgetExceeded) as context:
+            gedcom.parse(GEDCOM_FILE, max_memory=total // 2)
+        self.assertTrue(total // 2 < context.exception.used <= total)
+
+        # The traceback doesn't keep the records parsed so far (assertRaises clears its frames, so it can't be used here)
+        try:
+            gedcom.parse(GEDCOM_FILE, max_memory=total // 2)
+        except gedcom.MemoryBudgetExceeded:
+            traceback = sys.exc_info()[2]
+        while traceback is not None:
+            kept = [value for value in traceback.tb_frame.f_locals.values() if isinstance(value, (gedcom.GedcomFile, gedcom.Element))]
+            self.assertEqual(kept, [], traceback.tb_frame.f_code.co_name)
+            traceback = traceback.tb_next
+
+    def testLazyParse(self):
+        gedcomfile = gedcom.parse(GEDCOM_FILE, lazy=True)
+        self.assertEqual([e.id for e in gedcomfile.individuals], ['@I1@', '@I2@', '@I3@'])
+        self.assertFalse(any(e.is_parsed for e in gedcomfile.root_elements))
+        self.assertEqual(gedcomfile['@I1@'].name, ("Robert", "Cox"))
+        self.assertTrue(gedcomfile['@I1@'].is_parsed)
+        self.assertFalse(gedcomfile['@I2@'].is_parsed)
+        self.assertEqual(gedcomfile['@I3@'].father.name, ("Robert", "Cox"))
+        self.assertEqual(gedcomfile['@I3@']['SEX'].parent_element, gedcomfile['@I3@'])
+        self.assertEqual(gedcomfile.freeze().gedcom_lines_as_string() + "\n", GEDCOM_FILE)
+        self.assertEqual(gedcomfile.gedcom_lines_as_string() + "\n", GEDCOM_FILE)
+
+    def testLazyParseKeepsAttributeErrors(self):
+        gedcomfile = gedcom.parse(GEDCOM_FILE, lazy=True)
+        family = gedcomfile['@F1@']
+        with self.assertRaises(AttributeError) as raised:
+            family.no_such_attribute
+        self.assertEqual(str(raised.exception), "'Family' object has no attribute 'no_such_attribute'")
+        self.assertFalse(family.is_parsed)
+
+        # Errors in properties aren't replaced by one about the property
+        family.child_elements.append(None)
+        with self.assertRaises(AttributeError) as raised:
+            family.partners
+        self.assertTrue("'NoneType'" in str(raised.exception))
+
+    def testClone(self):
+        original = gedcom.parse_string(GEDCOM_FILE)
+        clone = original.clone()
+        self.assertFalse(any(record.is_parsed for record in clone.root_elements))
+        self.assertEqual(clone.gedcom_lines_as_string(), original.gedcom_lines_as_string())
+        self.assertFalse(any(record.is_parsed for record in clone.root_elements))
+        self.assertEqual([r.id for r in clone.individuals], ['@I1@', '@I2@', '@I3@'])
+
+        bob = clone['@I3@'].father
+        self.assertTrue(bob is clone['@I1@'] and bob is not original['@I1@'])
+        bob.get_list("NAME")[0].value = "Bob /Cox/"
+        bob.add_child_element(clone.element("OCCU", value="Baker"))
+        clone.individual().add_child_element(clone.element("NAME", value="New /Person/"))
+        self.assertEqual(clone['@I3@'].father.name, ("Bob", "Cox"))
+        self.assertFalse(clone.root_elements[0].is_parsed)
+        self.assertEqual(original.gedcom_lines_as_string() + "\n", GEDCOM_FILE)
+        self.assertEqual(len(list(original.individuals)), 3)
+        self.assertEqual(len(list(clone.individuals)), 4)
+
+        lazy_clone = gedcom.parse(GEDCOM_FILE, lazy=True).clone()
+        self.assertEqual(lazy_clone['@I3@'].mother.name, ("Joann", "Para"))
+        frozen_clone = original.freeze().clone()
+        frozen_clone['@I1@'].set_sex('F')
+        self.assertEqual(frozen_clone['@I1@'].sex, 'F')
+        self.assertEqual(frozen_clone.clone().gedcom_lines_as_string(), frozen_clone.gedcom_lines_as_string())
+
+    def testCloneIsIndependentOfOriginal(self):
+        original = gedcom.parse_string(GEDCOM_FILE)
+        clone = original.clone()
+        original['@I1@'].set_sex('F')
+        original['@I2@'].get_list("NAME")[0].value = "Jo /Para/"
+        original['@F1@'].add_child_element(original.element("NOTE", value="Changed"))
+        self.assertEqual(clone['@I1@'].sex, 'M')
+        self.assertEqual(clone['@I2@'].name, ("Joann", "Para"))
+        self.assertFalse('NOTE' in clone['@F1@'])
+
+        # Clones of clones, and of lazily parsed files, don't change with their original either
+        second = clone.clone()
+        clone['@I3@'].set_sex('F')
+        self.assertEqual(second['@I3@'].sex, 'M')
+        lazy = gedcom.parse(GEDCOM_FILE, lazy=True)
+        lazy_clone = lazy.clone()
+        lazy['@I1@'].set_sex('F')
+        self.assertEqual(lazy_clone['@I1@'].sex, 'M')
+
+    def testLazyParseDefersErrors(self):
+        gedcomfile = gedcom.parse("0 @I1@ INDI\n1 BIRT\n3 DATE 1990\n0 @I2@ INDI", lazy=True)
+        self.assertEqual(len(gedcomfile.root_elements), 2)
+        self.assertRaises(KeyError, lambda: gedcomfile['@I1@'].child_elements)
+
+    def testRefresh(self):
+        inputfile = tempfile.NamedTemporaryFile(delete=False)
+        inputfile.write(GEDCOM_FILE.encode("utf8"))
+        inputfile.close()
+        gedcomfile = gedcom.parse(inputfile.name, track_changes=True)
+        bob, joann = gedcomfile['@I1@'], gedcomfile['@I2@']
+        root_elements, pointers = gedcomfile.root_elements, gedcomfile.pointers
+        self.assertEqual(gedcomfile.refresh(), ([], []))
+
+        with open(inputfile.name, 'w') as fp:
+            fp.write(GEDCOM_FILE.replace("Robert", "Bob").replace("0 @I3@ INDI", "0 @I4@ INDI\n1 NAME Ann /Cox/\n0 @I3@ INDI"))
+        changed, removed = gedcomfile.refresh()
+        self.assertEqual([r.id for r in changed], ['@I1@', '@I4@'])
+        self.assertEqual(removed, [bob])
+        self.assertTrue(gedcomfile.root_elements is root_elements and gedcomfile.pointers is pointers)
+        self.assertTrue(gedcomfile['@I2@'] is joann)
+        self.assertEqual(gedcomfile['@I1@'].name, ("Bob", "Cox"))
+        self.assertEqual([e.id for e in gedcomfile.individuals], ['@I1@', '@I2@', '@I4@', '@I3@'])
+        remove(inputfile.name)
+
+        self.assertRaises(ValueError, gedcom.parse(GEDCOM_FILE, track_changes=True).refresh)
+
+    def testRefreshAfterSave(self):
+        directory = tempfile.mkdtemp()
+        filename = os.path.join(directory, "no-header.ged")
+        with open(filename, 'w') as fp:
+            fp.write("0 @I1@ INDI\n1 NAME A /B/\n0 @I2@ INDI\n1 NAME C /D/\n")
+        gedcomfile = gedcom.parse(filename, track_changes=True)
+        gedcomfile.individual(id='@I3@')
+        gedcomfile.save(filename, overwrite=True)
+        self.assertEqual([e.tag for e in gedcomfile.root_elements], ['HEAD', 'INDI', 'INDI', 'INDI', 'TRLR'])
+
+        self.assertEqual(gedcomfile.refresh(), ([], []))
+
+        # Saved records are compared with what was saved, and records added in memory go before the trailer
+        with open(filename, 'w') as fp:
+            fp.write("0 @I1@ INDI\n1 NAME X /B/\n0 @I2@ INDI\n1 NAME C /D/\n")
+        added = gedcomfile.individual()
+        changed, removed = gedcomfile.refresh()
+        self.assertEqual([e.id for e in changed], ['@I1@'])
+        self.assertEqual([e.id for e in gedcomfile.root_elements], ['@I1@', '@I2@', '@I4@'])
+        self.assertTrue(gedcomfile['@I4@'] is added)
+
+        # A header and trailer only in memory stay at the ends
+        gedcomfile = gedcom.parse(filename, track_changes=True)
+        gedcomfile.save(os.path.join(directory, "copy.ged"))
+        gedcomfile.individual()
+        with open(filename, 'a') as fp:
+            fp.write("0 @I9@ INDI\n")
+        self.assertEqual([e.id for e in gedcomfile.refresh()[0]], ['@I9@'])
+        self.assertEqual([e.id or e.tag for e in gedcomfile.root_elements], ['HEAD', '@I1@', '@I2@', '@I9@', '@I3@', 'TRLR'])
+        lines = gedcomfile.gedcom_lines_as_string()
+        self.assertEqual((lines.count("0 HEAD"), lines.count("0 TRLR")), (1, 1))
+        shutil.rmtree(directory)
+
+    def testRecordRegistries(self):
+        gedcomfile = gedcom.parse_string(GEDCOM_FILE + "0 @S1@ SOUR\n0 @N1@ NOTE Hello\n")
+        self.assertEqual(len(gedcomfile.individuals), 3)
+        self.assertEqual(len(gedcomfile.families), 1)
+        self.assertEqual([r.id for r in gedcomfile.sources], ['@S1@'])
+        self.assertEqual(gedcomfile.notes['@N1@'].value, "Hello")
+        self.assertEqual(len(gedcomfile.repositories), 0)
+        self.assertEqual(gedcomfile.individuals[-1].id, '@I3@')
+        self.assertTrue('@I1@' in gedcomfile.individuals)
+        self.assertFalse('@F1@' in gedcomfile.individuals)
+        self.assertRaises(KeyError, lambda: gedcomfile.individuals['@F1@'])
+
+        individuals = gedcomfile.individuals
+        gedcomfile.individual()
+        self.assertEqual(len(individuals), 4)
+        self.assertEqual(len(gedcomfile.freeze().individuals), 4)
+
+    def testBuilder(self):
+        gedcomfile = gedcom.GedcomFile()
+        gedcomfile.individual()
+        gedcomfile.ensure_header_trailer()
+        with gedcomfile.builder(batch_size=2) as builder:
+            ids = builder.add_individuals([
+                ('@P1@', 'Bob /Cox/', 'M', '1900', 'London', None, None, None, '@F1@'),
+                {'name': ('Joann', 'Para'), 'sex': 'F', 'fams': ['@F1@']},
+                {'name': 'Rob /Cox/', 'famc': '@F1@', 'death_date': '1990'}])
+            builder.add_families([('@F1@', '@P1@', ids[1], [ids[2]], '1920', 'Paris')])
+            builder.add_events([('@P1@', 'OCCU', None, 'London')], columns=('record', 'tag', 'date', 'place'))
+        self.assertEqual(ids, ['@P1@', '@I2@', '@I3@'])
+        self.assertEqual(len(gedcomfile.individuals), 4)
+        self.assertEqual(len(gedcomfile.families), 1)
+        self.assertEqual([e.tag for e in gedcomfile.root_elements], ['HEAD', 'INDI', 'INDI', 'INDI', 'INDI', 'FAM', 'TRLR'])
+        self.assertEqual(gedcomfile['@I3@'].father.name, ("Bob", "Cox"))
+        self.assertEqual(gedcomfile['@P1@'].birth.place, "London")
+        self.assertEqual(gedcomfile['@F1@']['MARR'].date, "1920")
+        self.assertEqual(gedcomfile['@P1@']['OCCU']['PLAC'].level, 2)
+        self.assertEqual(gedcomfile.validate(), [])
+        self.assertRaises(ValueError, gedcomfile.builder().add_individuals, [('@P1@', 'Bob /Cox/')], columns=('id', 'name'))
+        self.assertRaises(ValueError, gedcomfile.builder().add_individuals, [('@P9@',)], columns=('id', 'nmae'))
+
+        # New ids don't take ids given later in the same rows
+        with gedcom.GedcomFile().builder() as builder:
+            self.assertEqual(builder.add_individuals([{'name': 'A /B/'}, {'id': '@I1@', 'name': 'C /D/'}]), ['@I2@', '@I1@'])
+
+    def testBuilderOnlyPausesGarbageCollectorWhenAsked(self):
+        import gc
+        enabled = []
+
+        def make(record_id, row):
+            enabled.append(gc.isenabled())
+
+        for pause_gc in (False, True):
+            gedcom.GedcomFile().builder(pause_gc=pause_gc)._add_records([(None, None)], ('id', 'name'), ('id', 'name'), 'I', make)
+            self.assertTrue(gc.isenabled())
+        self.assertEqual(enabled, [True, False])
+
+    def testCompressedFiles(self):
+        directory = tempfile.mkdtemp()
+        gedcomfile = gedcom.parse_string(GEDCOM_FILE)
+        for extension in ('.ged.gz', '.ged.bz2', '.ged.xz', '.ged'):
+            filename = os.path.join(directory, "tree" + extension)
+            gedcomfile.save(filename)
+            with open(filename, 'rb') as fp:
+                self.assertEqual(fp.read(3) == b"0 H", extension == '.ged')
+            self.assertEqual(gedcom.parse(filename).gedcom_lines_as_string() + "\n", GEDCOM_FILE)
+            self.assertEqual([r.tag for r in gedcom.iter_records(filename)], ['HEAD', 'INDI', 'INDI', 'INDI', 'FAM', 'TRLR'])
+            gedcomfile.save(filename, overwrite=True)
+            os.rename(filename, filename + ".renamed")
+            self.assertEqual(len(gedcom.parse(filename + ".renamed").individuals), 3)
+        shutil.rmtree(directory)
+
+    def testIndexedGedcomFile(self):
+        from gedcom import indexed
+        directory = tempfile.mkdtemp()
+        filename = os.path.join(directory, "tree.ged")
+        with open(filename, 'w') as fp:
+            fp.write(GEDCOM_FILE)
+        self.assertRaises(ValueError, gedcom.IndexedGedcomFile, filename, build=False)
+        with gedcom.IndexedGedcomFile(filename) as gedcomfile:
+            self.assertTrue(os.path.exists(filename + ".idx"))
+            self.assertEqual(len(gedcomfile), 4)
+            self.assertEqual(sorted(gedcomfile.ids('INDI')), ['@I1@', '@I2@', '@I3@'])
+            self.assertEqual(gedcomfile['@I3@'].father.name, ("Robert", "Cox"))
+            self.assertEqual(gedcomfile['@F1@'].get_list('CHIL')[0].value, '@I3@')
+            self.assertRaises(KeyError, lambda: gedcomfile['@I9@'])
+        self.assertEqual(indexed.load_index(filename), dict(indexed.scan(filename)))
+
+        with open(filename, 'a') as fp:
+            fp.write("0 @I9@ INDI\n")
+        self.assertEqual(indexed.load_index(filename), None)
+        with gedcom.IndexedGedcomFile(filename) as gedcomfile:
+            self.assertTrue('@I9@' in gedcomfile)
+        shutil.rmtree(directory)
+
+    def testIndexedGedcomFileFamilyLinks(self):
+        directory = tempfile.mkdtemp()
+        filename = os.path.join(directory, "tree.ged")
+        with open(filename, 'w') as fp:
+            fp.write(GEDCOM_FILE)
+        with gedcom.IndexedGedcomFile(filename) as gedcomfile:
+            bob = gedcomfile['@I1@']
+            self.assertEqual([r.id for r in bob.families], ['@F1@'])
+            self.assertEqual([r.id for r in bob.spouses], ['@I2@'])
+            self.assertEqual([r.id for r in bob.children], ['@I3@'])
+            self.assertEqual(gedcomfile['@I3@'].siblings, [])
+            self.assertEqual(gedcomfile['@I3@'].half_siblings, [])
+        shutil.rmtree(directory)
+
+    def testPlaces(self):
+        gedcomfile = gedcom.parse_string("\n".join([
+            "0 @I1@ INDI", "1 BIRT", "2 PLAC Leeds, Yorkshire, England", "1 DEAT", "2 PLAC London,  England",
+            "0 @I2@ INDI", "1 BIRT", "2 PLAC York, yorkshire , England", "1 RESI", "2 PLAC , Yorkshire, England",
+            "0 @I3@ INDI", "1 BIRT", "2 PLAC Paris, France", "0 @F1@ FAM", "1 MARR", "2 PLAC York, Yorkshire, England"]))
+        places = gedcomfile.places()
+        yorkshire = places.get("Yorkshire, England")
+        self.assertTrue(places.get("York,Yorkshire,England").parent is yorkshire)
+        self.assertEqual(yorkshire.full_name, "Yorkshire, England")
+        self.assertEqual([p.name for p in yorkshire.children.values()], ["Leeds", "York"])
+        self.assertEqual([r.id for r in yorkshire.individuals(tags=['BIRT'])], ['@I1@', '@I2@'])
+        self.assertEqual(sorted(r.id for r in yorkshire.records()), ['@F1@', '@I1@', '@I2@'])
+        self.assertEqual([e.tag for e, r in yorkshire.events], ['RESI'])
+        self.assertEqual([r.id for r in places.get("England").individuals(tags=['DEAT'])], ['@I1@'])
+        self.assertEqual(places.find("york"), [places.get("York, Yorkshire, England")])
+        self.assertEqual([p.name for p in places], ["England", "Yorkshire", "Leeds", "York", "London", "France", "Paris"])
+        self.assertRaises(KeyError, places.get, "Leeds, England")
+
+    def testTimeline(self):
+        import datetime
+        from gedcom.timeline import parse_date_range
+        self.assertEqual(parse_date_range("FEB 1900"), (datetime.date(1900, 2, 1), datetime.date(1900, 2, 28)))
+        self.assertEqual(parse_date_range("BET 1914 AND 1918"), (datetime.date(1914, 1, 1), datetime.date(1918, 12, 31)))
+        self.assertEqual(parse_date_range("ABT 1 JAN 1900")[0], datetime.date(1900, 1, 1))
+        self.assertEqual(parse_date_range("BEF 1900"), (datetime.date.min, datetime.date(1900, 12, 31)))
+        self.assertEqual([parse_date_range(value) for value in ["(unknown)", "31 FEB 1900", "@#DHEBREW@ 5600"]], [None] * 3)
+
+        gedcomfile = gedcom.parse_string("\n".join([
+            "0 @I1@ INDI", "1 BIRT", "2 DATE 1890", "1 RESI", "2 DATE FROM 1910 TO 1920", "2 PLAC Paris, France", "1 DEAT", "2 DATE 3 MAR 1950",
+            "0 @I2@ INDI", "1 BIRT", "2 DATE ABT 1920", "2 PLAC Lyon, France", "1 CENS", "2 DATE 1911", "2 PLAC London, England",
+            "0 @I3@ INDI", "1 DEAT", "2 DATE 1800", "1 BURI", "2 DATE (unknown)",
+            "0 @F1@ FAM", "1 MARR", "2 DATE AFT 1915", "2 PLAC Paris, France"]))
+        timeline = gedcomfile.timeline()
+        self.assertEqual(len(timeline), 7)
+        self.assertEqual([(e.record.id, e.event.tag) for e in timeline.overlapping(1914, 1918)], [('@I1@', 'RESI'), ('@F1@', 'MARR')])
+        self.assertEqual([e.event.tag for e in timeline.overlapping(1900, 2000, place="France", tags=['RESI', 'BIRT'])], ['RESI', 'BIRT'])
+        self.assertEqual(timeline.overlapping(1900, 2000, place="Spain"), [])
+        self.assertEqual([r.id for r in timeline.alive(1911)], ['@I1@'])
+        self.assertEqual([r.id for r in timeline.alive("1750", datetime.date(1921, 1, 1))], ['@I3@', '@I1@', '@I2@'])
+
+        from gedcom.timeline import IntervalTree
+        intervals = [(start, start + length, n) for n, (start, length) in enumerate((n * 7 % 31, n * 5 % 11) for n in range(200))]
+        tree = IntervalTree(intervals)
+        for start, end in [(0, 0), (3, 9), (15, 15), (29, 40), (-5, -1)]:
+            self.assertEqual(sorted(tree.overlapping(start, end)), [n for s, e, n in intervals if s <= end and e >= start])
+
+    def testFamilyLinks(self):
+        gedcomfile = gedcom.parse_string(INBRED_GEDCOM_FILE)
+        ids = lambda records: [record.id for record in records]
+        self.assertEqual(ids(gedcomfile['@I1@'].families), ['@F1@', '@F2@'])
+        self.assertEqual(ids(gedcomfile['@I1@'].spouses), ['@I2@', '@I4@'])
+        self.assertEqual(ids(gedcomfile['@I1@'].children), ['@I3@', '@I5@'])
+        self.assertEqual(ids(gedcomfile['@I3@'].siblings), [])
+        self.assertEqual(ids(gedcomfile['@I3@'].half_siblings), ['@I5@'])
+        self.assertEqual(ids(gedcomfile['@I6@'].families), [])
+
+        # Links added to the file afterwards are indexed too
+        sibling = gedcomfile.individual(id='@I7@')
+        sibling.add_child_element(gedcomfile.element("FAMC", value="@F1@"))
+        self.assertEqual(ids(gedcomfile['@I3@'].siblings), ['@I7@'])
+        self.assertEqual(ids(gedcomfile['@I7@'].half_siblings), ['@I5@'])
+        gedcomfile['@F3@'].add_child_element(gedcomfile.element("CHIL", value="@I7@"))
+        self.assertEqual(ids(gedcomfile['@I6@'].siblings), ['@I7@'])
+
+        self.assertEqual(ids(gedcomfile.freeze()['@I1@'].children), ['@I3@', '@I7@', '@I5@'])
+        self.assertEqual(ids(gedcomfile.clone()['@I2@'].children), ['@I3@', '@I7@'])
+
+    def testFamilyLinksOfRecordsNotInAFile(self):
+        robert, joann, bobby_jo = [r for r in gedcom.iter_records(GEDCOM_FILE) if r.tag == 'INDI']
+        self.assertTrue(robert.gedcom_file is None)
+        self.assertEqual((robert.families, robert.spouses, robert.children), ([], [], []))
+        self.assertEqual((bobby_jo.siblings, bobby_jo.half_siblings, bobby_jo.parents), ([], [], []))
+        self.assertEqual(bobby_jo.father, None)
+
+
+# I1 has children with I2 and I4, whose children I3 and I5 (half siblings) have I6
+INBRED_GEDCOM_FILE = "\n".join([
+    "0 @I1@ INDI", "1 SEX M", "0 @I2@ INDI", "1 SEX F", "0 @I4@ INDI", "1 SEX F",
+    "0 @I3@ INDI", "1 SEX M", "1 FAMC @F1@", "0 @I5@ INDI", "1 SEX F", "1 FAMC @F2@", "0 @I6@ INDI", "1 FAMC @F3@",
+    "0 @F1@ FAM", "1 HUSB @I1@", "1 WIFE @I2@", "0 @F2@ FAM", "1 HUSB @I1@", "1 WIFE @I4@", "0 @F3@ FAM", "1 HUSB @I3@", "1 WIFE @I5@"])
+
+
+class PedigreeTestCase(unittest.TestCase):
+
+    def testLayers(self):
+        from gedcom.pedigree import Pedigree
+        pedigree = Pedigree(gedcom.parse_string(INBRED_GEDCOM_FILE))
+        self.assertEqual([[pedigree.ids[n] for n in layer] for layer in pedigree.layers()], [['@I1@', '@I2@', '@I4@'], ['@I3@', '@I5@'], ['@I6@']])
+        self.assertEqual(sorted(pedigree.ids[n] for n in pedigree.ancestors(pedigree.to_indexes(['@I3@']))), ['@I1@', '@I2@', '@I3@'])
+
+    def testCycle(self):
+        from gedcom.pedigree import Pedigree, PedigreeCycleError
+        gedcomfile = gedcom.parse_string("0 @I1@ INDI\n1 FAMC @F1@\n0 @I2@ INDI\n1 FAMC @F2@\n0 @F1@ FAM\n1 HUSB @I2@\n0 @F2@ FAM\n1 HUSB @I1@")
+        with self.assertRaises(PedigreeCycleError) as context:
+            Pedigree(gedcomfile).layers()
+        self.assertEqual(context.exception.ids, ['@I1@', '@I2@'])
+
+    def testFindCycles(self):
+        from gedcom.pedigree import Pedigree
+        gedcomfile = gedcom.parse_string("0 @I1@ INDI\n1 FAMC @F1@\n0 @I2@ INDI\n1 FAMC @F2@\n0 @I3@ INDI\n1 FAMC @F2@\n0 @I4@ INDI\n1 FAMC @F4@\n0 @I5@ INDI\n"
+                                         "0 @F1@ FAM\n1 HUSB @I2@\n0 @F2@ FAM\n1 HUSB @I1@\n0 @F4@ FAM\n1 WIFE @I4@")
+        pedigree = Pedigree(gedcomfile)
+        self.assertEqual(pedigree.cycles(), [['@I1@', '@I2@'], ['@I4@']])
+        self.assertEqual(pedigree.generations(ignore_cycles=True), {'@I5@': 0})
+        self.assertEqual([i.code for i in gedcomfile.validate()].count('ancestor-cycle'), 3)
+
+    def testGenerations(self):
+        from gedcom.pedigree import Pedigree
+        pedigree = Pedigree(gedcom.parse_string(INBRED_GEDCOM_FILE))
+        self.assertEqual(pedigree.generations(), {'@I1@': 0, '@I2@': 0, '@I4@': 0, '@I3@': 1, '@I5@': 1, '@I6@': 2})
+        self.assertEqual(pedigree.cycles(), [])
+
+    def testAhnentafelAndDAboville(self):
+        from gedcom.pedigree import Pedigree
+        pedigree = Pedigree(gedcom.parse_string(INBRED_GEDCOM_FILE))
+        self.assertEqual(list(pedigree.ahnentafel('@I6@').items()), [(1, '@I6@'), (2, '@I3@'), (3, '@I5@'), (4, '@I1@'), (5, '@I2@'), (6, '@I1@'), (7, '@I4@')])
+        self.assertEqual(list(pedigree.ahnentafel('@I6@', generations=1).values()), ['@I6@', '@I3@', '@I5@'])
+        self.assertEqual(list(pedigree.daboville('@I1@').items()), [('1', '@I1@'), ('1.1', '@I3@'), ('1.1.1', '@I6@'), ('1.2', '@I5@'), ('1.2.1', '@I6@')])
+
+    def testRelationships(self):
+        from gedcom.relationships import RelationshipCalculator, relationship_name
+        calculator = RelationshipCalculator(gedcom.parse_string(INBRED_GEDCOM_FILE))
+        self.assertEqual(calculator.relationship('@I3@', '@I5@'), ('half-sibling', (1, 1), ['@I1@']))
+        self.assertEqual([r.name for r in calculator.relationships_to('@I6@', ['@I6@', '@I3@', '@I1@', '@I4@'])], ['self', 'parent', 'grandparent', 'grandparent'])
+        self.assertEqual([r and r.name for r in calculator.relationships([('@I1@', '@I6@'), ('@I1@', '@I2@')])], ['grandchild', None])
+        self.assertEqual(calculator.relationship('@I6@', '@I1@').generations, (2, 0))
+        self.assertEqual([relationship_name(*generations) for generations in [(1, 1), (3, 1), (4, 1), (1, 2), (2, 2), (3, 4), (5, 3), (5, 0), (2, 13)]], [
+            'sibling', 'great-aunt/uncle', '2nd great-aunt/uncle', 'niece/nephew', '1st cousin', '2nd cousin once removed', '2nd cousin twice removed',
+            '3rd great-grandparent', '1st cousin 11 times removed'])
+
+    @unittest.skipIf(numpy is None, "numpy not installed")
+    def testKinship(self):
+        from gedcom import kinship
+        gedcomfile = gedcom.parse_string(INBRED_GEDCOM_FILE)
+        ids, matrix = kinship.kinship_matrix(gedcomfile, ['@I6@', '@I3@', '@I2@'])
+        self.assertEqual(ids, ['@I6@', '@I3@', '@I2@'])
+        self.assertEqual(matrix.tolist(), [[0.5625, 0.3125, 0.125], [0.3125, 0.5, 0.25], [0.125, 0.25, 0.5]])
+        self.assertEqual(kinship.inbreeding_coefficients(gedcomfile)['@I6@'], 0.125)
+        self.assertEqual(kinship.relationship_degrees(matrix).tolist(), [[0, 1, 2], [1, 0, 1], [2, 1, 0]])
+
+    @unittest.skipIf(numpy is None, "numpy not installed")
+    def testSparseKinshipMatchesDense(self):
+        from gedcom import kinship
+        try:
+            import scipy
+        except ImportError:
+            raise unittest.SkipTest("scipy not installed")
+        from benchmarks import synthetic
+        gedcomfile = gedcom.parse_string(synthetic.generate_string(individuals=300, seed=5))
+        ids, dense = kinship.kinship_matrix(gedcomfile)
+        sparse_ids, sparse = kinship.kinship_matrix(gedcomfile, sparse=True)
+        self.assertEqual(ids, sparse_ids)
+        self.assertTrue(numpy.allclose(dense, sparse.toarray()))
+
+
+class TablesTestCase(unittest.TestCase):
+
+    def testToTables(self):
+        gedcomfile = gedcom.parse_string(GEDCOM_FILE.replace("1 MARR\n", "1 MARR\n2 DATE 1 JAN 1970\n2 PLAC London\n").replace("1 NAME Joann /Para/\n", "1 NAME Joann /Para\n1 BIRT\n2 DATE 1950\n"))
+        tables = gedcomfile.to_tables()
+        self.assertEqual(list(tables.individuals.rows()), [
+            ('@I1@', 'Robert', 'Cox', 'M', None, None, None, None, None),
+            ('@I2@', None, None, 'F', '1950', None, None, None, None),
+            ('@I3@', 'Bobby Jo', 'Cox', 'M', None, None, None, None, '@F1@')])
+        self.assertEqual(list(tables.families.rows()), [('@F1@', '@I1@', '@I2@', '1 JAN 1970', 'London', 1)])
+        self.assertEqual(list(tables.children.rows()), [('@F1@', '@I3@')])
+        self.assertEqual(list(tables.events.rows()), [('@I2@', 'INDI', 'BIRT', '1950', None), ('@F1@', 'FAM', 'MARR', '1 JAN 1970', 'London')])
+
+    def testTablesWriteCSV(self):
+        tables = gedcom.parse_string(GEDCOM_FILE).to_tables()
+        output = six.StringIO()
+        tables.families.write_csv(output)
+        self.assertEqual(output.getvalue(), "id,husband,wife,marriage_date,marriage_place,children\r\n@F1@,@I1@,@I2@,,,1\r\n")
+
+
+class PipelineTestCase(unittest.TestCase):
+
+    def testIterRecords(self):
+        records = list(gedcom.iter_records(six.StringIO(GEDCOM_FILE)))
+        self.assertEqual([r.tag for r in records], ['HEAD', 'INDI', 'INDI', 'INDI', 'FAM', 'TRLR'])
+        self.assertEqual(records[3].name, ("Bobby Jo", "Cox"))
+        self.assertEqual("\n".join(line for r in records for line in r.gedcom_lines()) + "\n", GEDCOM_FILE)
+
+    def testPipelineStages(self):
+        from gedcom.pipelines import drop_tags, rewrite_values
+        result = gedcom.pipeline(GEDCOM_FILE).filter(lambda r: r.tag != 'FAM').map(drop_tags('CHAN', 'NAME')).map(rewrite_values('SEX', {'M': 'U'}))
+        self.assertEqual(list(result.lines()), [
+            "0 HEAD", "1 SOUR Reunion", "2 VERS V8.0", "2 CORP Leister Productions", "1 DEST Reunion", "1 DATE 11 FEB 2006", "1 FILE test", "1 GEDC", "2 VERS 5.5", "1 CHAR MACINTOSH",
+            "0 @I1@ INDI", "1 SEX U", "1 FAMS @F1@", "0 @I2@ INDI", "1 SEX F", "1 FAMS @F1@", "0 @I3@ INDI", "1 SEX U", "1 FAMC @F1@", "0 TRLR"])
+
+    def testRedactLiving(self):
+        from gedcom.pipelines import redact_living
+        source = "0 @I1@ INDI\n1 NAME Bob /Cox/\n1 BIRT\n2 DATE 1 JAN 1990\n1 FAMS @F1@\n0 @I2@ INDI\n1 NAME Joann /Para/\n1 BIRT\n2 DATE 1890\n0 @I3@ INDI\n1 NAME Rob /Cox/\n1 DEAT Y"
+        lines = list(gedcom.pipeline(source).map(redact_living()).lines())
+        self.assertEqual(lines, ["0 @I1@ INDI", "1 NAME Living /Cox/", "1 FAMS @F1@", "0 @I2@ INDI", "1 NAME Joann /Para/", "1 BIRT", "2 DATE 1890", "0 @I3@ INDI", "1 NAME Rob /Cox/", "1 DEAT Y"])
+
+    def testPipelineOverwritesSource(self):
+        from gedcom.pipelines import drop_tags
+        outputfile = tempfile.NamedTemporaryFile(delete=False)
+        outputfile.write(GEDCOM_FILE.encode("utf8"))
+        outputfile.close()
+        self.assertRaises(Exception, gedcom.pipeline(outputfile.name).write, outputfile.name)
+        gedcom.pipeline(outputfile.name).map(drop_tags('CHAN')).write(outputfile.name, overwrite=True)
+        with open(outputfile.name) as output:
+            text = output.read()
+        self.assertEqual(text, GEDCOM_FILE.replace("1 CHAN\n2 DATE 11 FEB 2006\n", ""))
+        remove(outputfile.name)
+
+    def testMerge(self):
+        output = six.BytesIO()
+        other = "0 @I1@ INDI\n1 NAME Ann /Smith/\n1 FAMS @F1@\n0 @F1@ FAM\n1 WIFE @I1@\n1 NOTE @N1@\n0 @N1@ NOTE Hi\n0 TRLR"
+        renamed = gedcom.merge([GEDCOM_FILE, gedcom.parse(other)], output)
+        self.assertEqual(renamed, [{}, {'@I1@': '@I4@', '@F1@': '@F2@'}])
+        merged = gedcom.parse(output.getvalue().decode("utf8"))
+        self.assertEqual([r.tag for r in merged.root_elements], ['HEAD', 'INDI', 'INDI', 'INDI', 'FAM', 'INDI', 'FAM', 'NOTE', 'TRLR'])
+        self.assertEqual(merged['@I4@'].name, ("Ann", "Smith"))
+        self.assertEqual(merged['@F2@']['WIFE'].value, '@I4@')
+        self.assertEqual(merged['@I3@'].father.name, ("Robert", "Cox"))
+        self.assertEqual(merged.validate(), [])
+
+    def testMapReduce(self):
+        from gedcom import mapreduce
+        expected = {'Cox': 2, 'Para': 1}
+        for workers in (0, 2):
+            self.assertEqual(dict(mapreduce.surname_frequency(GEDCOM_FILE, workers=workers)), expected)
+        self.assertEqual(dict(gedcom.map_reduce(GEDCOM_FILE, mapreduce.surnames, mapreduce.merge_counts, workers=2, batch_size=1)), expected)
+        histogram = mapreduce.tag_histogram(GEDCOM_FILE, workers=0)
+        self.assertEqual((histogram['INDI'], histogram['NAME'], histogram['DATE']), tuple(GEDCOM_FILE.count(" {0}".format(tag)) for tag in ('INDI', 'NAME', 'DATE')))
+        source = "0 @I1@ INDI\n1 BIRT\n2 DATE 1 JAN 1893\n1 DEAT\n2 DATE 1970\n0 @F1@ FAM\n1 MARR\n2 DATE ABT 1898"
+        self.assertEqual(dict(mapreduce.events_per_decade(source, workers=0)), {('BIRT', 1890): 1, ('DEAT', 1970): 1, ('MARR', 1890): 1})
+        self.assertEqual(gedcom.map_reduce("0 HEAD\n0 TRLR", mapreduce.surnames, mapreduce.merge_counts, workers=0), None)
+
+
+class NDJSONTestCase(unittest.TestCase):
+
+    def testRoundTrip(self):
+        from gedcom import ndjson
+        output = six.BytesIO()
+        ndjson.dump(GEDCOM_FILE, output)
+        lines = output.getvalue().decode("utf8").split("\n")
+        self.assertEqual(len(lines), 7)
+        self.assertEqual(lines[3], '{"tag":"INDI","id":"@I3@","children":[{"tag":"NAME","value":"Bobby Jo /Cox/"},{"tag":"SEX","value":"M"},{"tag":"FAMC","value":"@F1@"},'
+                                   '{"tag":"CHAN","children":[{"tag":"DATE","value":"11 FEB 2006"}]}]}')
+
+        output.seek(0)
+        loaded = ndjson.load(output)
+        self.assertEqual(loaded.gedcom_lines_as_string() + "\n", GEDCOM_FILE)
+        self.assertEqual(loaded['@I3@'].father, loaded['@I1@'])
+
+    def testDumpGedcomFile(self):
+        from gedcom import ndjson
+        gedcomfile = gedcom.parse_string(GEDCOM_FILE)
+        self.assertEqual(list(ndjson.iter_dump(gedcomfile)), list(ndjson.iter_dump(six.StringIO(GEDCOM_FILE))))
+        records = list(ndjson.iter_load(six.StringIO("\n".join(ndjson.iter_dump(gedcomfile)))))
+        self.assertEqual([r.__class__ for r in records[1:5]], [gedcom.Individual] * 3 + [gedcom.Family])
+
+
+class CommandLineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "tree.ged")
+        with open(self.filename, "wb") as fp:
+            fp.write(GEDCOM_FILE.encode("mac_roman"))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_main(self, *argv):
+        from gedcom import cli
+        output, stdout = six.StringIO(), cli.sys.stdout
+        cli.sys.stdout = output
+        try:
+            status = cli.main(list(argv))
+        finally:
+            cli.sys.stdout = stdout
+        return status, output.getvalue()
+
+    def testStatsAndValidate(self):
+        status, output = self.run_main("stats", self.filename)
+        self.assertEqual(status, 0)
+        self.assertEqual(output.split("\n")[:2], [self.filename + ": 6 records, 40 elements", "  INDI   3"])
+        self.assertEqual(self.run_main("stats", "--jobs", "2", self.filename, self.filename)[1], output * 2)
+        self.assertEqual(self.run_main("validate", "--jobs", "2", self.filename, self.filename), (0, ""))
+
+        broken = os.path.join(self.directory, "broken.ged")
+        with open(broken, "w") as fp:
+            fp.write("0 @I1@ INDI\n1 FAMC @F9@\n")
+        self.assertEqual(self.run_main("validate", self.filename, broken), (1, broken + ": @I1@: dangling-pointer: FAMC points to @F9@, which isn't in this file\n"))
+
+    def testStatsOfSavedFile(self):
+        from gedcom import cli
+        gedcomfile = gedcom.GedcomFile()
+        gedcomfile.individual().add_child_element(gedcomfile.element("NAME", value=u"Zo\xeb /Cox/"))
+        saved = os.path.join(self.directory, "saved.ged")
+        gedcomfile.save(saved)
+        self.assertTrue("1 CHAR UNICODE" in gedcomfile.gedcom_lines_as_string())
+        self.assertEqual(cli.detect_encoding(saved), 'utf-8')
+        status, output = self.run_main("stats", saved)
+        self.assertEqual((status, output.split("\n")[0]), (0, saved + ": 3 records, 11 elements"))
+        self.assertEqual(self.run_main("validate", saved), (0, ""))
+
+        utf16 = os.path.join(self.directory, "utf16.ged")
+        with open(utf16, "wb") as fp:
+            fp.write(GEDCOM_FILE.encode("utf-16-le"))
+        self.assertEqual(cli.detect_encoding(utf16), 'utf-16-le')
+
+    def testConvertAndSplit(self):
+        from gedcom import cli
+        self.assertEqual(cli.detect_encoding(self.filename), 'mac_roman')
+        jsonl = os.path.join(self.directory, "tree.jsonl")
+        self.assertEqual(self.run_main("convert", self.filename, jsonl)[0], 0)
+        back = os.path.join(self.directory, "back.ged.gz")
+        self.assertEqual(self.run_main("convert", jsonl, back)[0], 0)
+        self.assertEqual(gedcom.parse(back).gedcom_lines_as_string() + "\n", GEDCOM_FILE.replace("CHAR MACINTOSH", "CHAR UTF-8"))
+
+        status, output = self.run_main("split", "--records", "2", "--output-dir", self.directory, back)
+        parts = output.split()
+        self.assertEqual(parts, [os.path.join(self.directory, "back-00{0}.ged.gz".format(i)) for i in (1, 2)])
+        self.assertEqual([[r.tag for r in gedcom.iter_records(part)] for part in parts], [['HEAD', 'INDI', 'INDI', 'TRLR'], ['HEAD', 'INDI', 'FAM', 'TRLR']])
+
+    def testExtract(self):
+        output = os.path.join(self.directory, "extracted.ged")
+        self.assertEqual(self.run_main("extract", "--id", "@I3@", "--ancestors", "all", "--no-spouses", self.filename, output)[0], 0)
+        extracted = gedcom.parse(output)
+        self.assertEqual([r.id for r in extracted.individuals], ['@I1@', '@I2@', '@I3@'])
+        self.assertEqual(extracted['@I3@'].father.name, ("Robert", "Cox"))
+
+
+class SyntheticBenchmarkTestCase(unittest.TestCase):
+
+    def testSyntheticFileIsConsistent(self):
+        from benchmarks import synthetic
+        parsed = gedcom.parse_string(synthetic.generate_string(individuals=200, seed=3))
+        people = list(parsed.individuals)
+        self.assertEqual(len(people), 200)
+        self.assertTrue(len(list(parsed.families)) > 0)
+        for person in people:
+            self.assertEqual(len(person.name), 2)
+            for parent in person.parents:
+                self.assertTrue(any(f.value == person['FAMC'].value for f in parent.get_list('FAMS')))
+
+    def testSyntheticFileIsDeterministic(self):
+        from benchmarks import synthetic
+        self.assertEqual(synthetic.generate_string(individuals=50, seed=1), synthetic.generate_string(individuals=50, seed=1))
+        self.assertNotEqual(synthetic.generate_string(individuals=50, seed=1), synthetic.generate_string(individuals=50, seed=2))
+
+    def testBenchmarksRun(self):
+        from benchmarks import run
+        results = run.run(names=['parse_string', 'father'], repeat=1, memory=False, individuals=30)
+        self.assertEqual([r[0] for r in results], ['parse_string', 'father'])
+
+
 if __name__ == '__main__':
     unittest.main()